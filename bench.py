@@ -0,0 +1,689 @@
+import argparse
+import json
+import os
+import random
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from sc import TCASSimpleScraper
+
+
+# ----- ตัวดึงข้อมูลแบบเดิม (ก่อน compile แพทเทิร์น) ใช้เป็นค่าอ้างอิงว่าผลลัพธ์ต้องเหมือนเดิม -----
+
+def legacy_find_university_name(text):
+    patterns = [
+        r'มหาวิทยาลัย[^\n\r]{1,80}',
+        r'สถาบัน[^\n\r]{1,50}มหาวิทยาลัย',
+        r'สถาบันเทคโนโลยี[^\n\r]{1,50}',
+        r'จุฬาลงกรณ์มหาวิทยาลัย',
+        r'มหาวิทยาลัยเกษตรศาสตร์[^\n\r]{0,20}',
+        r'มหาวิทยาลัยเทคโนโลยีพระจอมเกล้า[^\n\r]{1,50}',
+        r'มหาวิทยาลัยสงขลานครินทร์[^\n\r]{0,20}',
+        r'มหาวิทยาลัยมหิดล[^\n\r]{0,20}',
+        r'มหาวิทยาลัยธรรมศาสตร์[^\n\r]{0,20}',
+        r'มหาวิทยาลัยเชียงใหม่[^\n\r]{0,20}',
+        r'มหาวิทยาลัยขอนแก่น[^\n\r]{0,20}'
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            name = match.group(0).strip()
+            if len(name) < 100:
+                return name
+
+
+def legacy_find_campus_name(text):
+    patterns = [
+        r'วิทยาเขต[^\n\r]{1,50}',
+        r'campus[^\n\r]{1,30}',
+        r'วิทยาเขตรังสิต', r'วิทยาเขตศาลายา', r'วิทยาเขตหาดใหญ่', r'วิทยาเขตปัตตานี',
+        r'วิทยาเขตสุราษฎร์ธานี', r'วิทยาเขตภูเก็ต', r'วิทยาเขตกรุงเทพฯ', r'วิทยาเขตเชียงใหม่',
+        r'วิทยาเขตขอนแก่น', r'วิทยาเขตอุบลราชธานี', r'วิทยาเขตนครราชสีมา', r'วิทยาเขตสกลนคร',
+        r'วิทยาเขตกำแพงแสน', r'วิทยาเขตจันทบุรี', r'วิทยาเขตปราจีนบุรี', r'วิทยาเขตสระแก้ว',
+        r'วิทยาเขตราชบุรี', r'วิทยาเขตเพชรบุรี', r'วิทยาเขตนครปฐม', r'วิทยาเขตลำปาง',
+        r'วิทยาเขตพิษณุโลก', r'วิทยาเขตอุดรธานี', r'วิทยาเขตยะลา', r'วิทยาเขตสงขลา',
+        r'วิทยาเขตตรัง', r'วิทยาเขตชุมพร',
+        r'ที่ตั้ง[^\n\r]*?([ก-๙]+)[^\n\r]{0,20}',
+        r'สถานที่[^\n\r]*?([ก-๙]+)[^\n\r]{0,20}',
+        r'(ตั้งอยู่ที่|อยู่ที่|ณ\s+)([ก-๙\s]{3,30})',
+    ]
+    for pattern in patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            campus = match.group(0).strip()
+            campus = re.sub(r'^(วิทยาเขต|campus|ที่ตั้ง|สถานที่|ตั้งอยู่ที่|อยู่ที่|ณ\s*)', '', campus, flags=re.IGNORECASE)
+            campus = campus.strip()
+            if len(campus) > 2 and len(campus) < 50:
+                campus = re.sub(r'(จังหวัด|อำเภอ|ตำบล|แขวง|เขต)', '', campus)
+                campus = campus.strip()
+                if campus:
+                    return campus
+    uni_campus_patterns = [
+        r'มหาวิทยาลัยเทคโนโลยีพระจอมเกล้า[^\n\r]*?(พระนคร|ธนบุรี|พระนครเหนือ|เจ้าคุณทหารลาดกระบัง)',
+        r'มหาวิทยาลัยราชภัฏ[^\n\r]*?([ก-๙]{3,20})',
+        r'มหาวิทยาลัยเทคโนโลยีราชมงคล[^\n\r]*?([ก-๙]{3,20})',
+    ]
+    for pattern in uni_campus_patterns:
+        match = re.search(pattern, text, re.IGNORECASE)
+        if match:
+            if len(match.groups()) > 0:
+                campus = match.group(1).strip()
+                if len(campus) > 2 and len(campus) < 30:
+                    return campus
+    return 'ไม่ระบุ'
+
+
+def legacy_find_tuition_cost(text):
+    patterns = [
+        r'ค่าใช้จ่าย[^\d]*([0-9,]+)[^\d]*บาท',
+        r'อัตราค่าเล่าเรียน[^\d]*([0-9,]+)[^\d]*บาท',
+        r'ค่าเล่าเรียน[^\d]*([0-9,]+)[^\d]*บาท',
+        r'ค่าธรรมเนียมการศึกษา[^\d]*([0-9,]+)[^\d]*บาท',
+        r'อัตราค่าเล่าเรียน\s*([0-9,]+)\s*บาท[^\d]*ภาค',
+        r'([0-9,]+)\s*บาท[^\d]*ภาคการศึกษา',
+        r'([0-9,]+)\s*บาท[^\d]*ต่อภาค',
+        r'([0-9,]+)\.-[^\d]*ภาค',
+        r'([0-9,]{4,})\s*บาท',
+        r'([1-9][0-9]{3,5})\s*บาท',
+        r'เรียน\s*([0-9,]+)\s*บาท',
+        r'ค่า[^\d]*([0-9,]+)\s*บาท',
+    ]
+    for pattern in patterns:
+        matches = re.findall(pattern, text, re.IGNORECASE)
+        for match in matches:
+            if isinstance(match, tuple):
+                match = match[0] if match[0] else match[1] if len(match) > 1 else ''
+            clean_number = str(match).replace(',', '')
+            if clean_number.isdigit():
+                amount = int(clean_number)
+                if 3000 <= amount <= 200000:
+                    return {'amount': amount, 'text': f"{amount:,} บาท/ภาค"}
+    url_match = re.search(r'(https?://[^\s]+(?:tuition|fee)[^\s]*)', text, re.IGNORECASE)
+    if url_match:
+        return {'amount': 0, 'text': f"ดูที่: {url_match.group(1)}"}
+    return {'amount': 0, 'text': 'ไม่ระบุ'}
+
+
+# ----- ชุดข้อความทดสอบ -----
+
+UNIVERSITY_LINES = [
+    'มหาวิทยาลัยเกษตรศาสตร์', 'มหาวิทยาลัยเทคโนโลยีพระจอมเกล้าธนบุรี',
+    'สถาบันเทคโนโลยีพระจอมเกล้าเจ้าคุณทหารลาดกระบัง', 'จุฬาลงกรณ์มหาวิทยาลัย',
+    'มหาวิทยาลัยราชภัฏเชียงใหม่', 'มหาวิทยาลัยเทคโนโลยีราชมงคลธัญบุรี',
+    'มหาวิทยาลัยสงขลานครินทร์ วิทยาเขตหาดใหญ่', 'มหาวิทยาลัย', 'สถาบันการบิน มหาวิทยาลัย',
+]
+CAMPUS_LINES = [
+    'วิทยาเขตศรีราชา', 'วิทยาเขต', 'Campus: Rangsit', 'CAMPUS', 'ที่ตั้ง จังหวัดชลบุรี',
+    'สถานที่เรียน อำเภอเมือง', 'ตั้งอยู่ที่ กรุงเทพมหานคร', 'ณ  อาคารเรียนรวม', 'วิทยาเขตสกลนคร',
+]
+TUITION_LINES = [
+    'ค่าใช้จ่าย', 'ค่าใช้จ่าย 21,000 บาท', 'อัตราค่าเล่าเรียน 45,000 บาท ต่อภาคการศึกษา',
+    'ค่าเล่าเรียน 1,500 บาท', '19,000.- ต่อภาค', '250,000 บาท', 'ค่าธรรมเนียมการศึกษา 16000 บาท',
+    'เรียน 30000 บาท', 'ค่าบำรุง 2,000 บาท', 'https://admission.example.ac.th/tuition-fee.pdf',
+    '35,500 บาท/ภาคการศึกษา', 'ตลอดหลักสูตร 400,000 บาท',
+]
+NOISE_LINES = [
+    'รายละเอียดหลักสูตร', 'วิศวกรรมศาสตรบัณฑิต สาขาวิชาวิศวกรรมคอมพิวเตอร์', 'รอบที่ 1 Portfolio',
+    'จำนวนรับ 40 คน', 'เกณฑ์การคัดเลือก GPAX 2.75', 'ติดต่อ 02-123-4567', 'TCAS68', 'ภาษาไทย',
+]
+
+
+def synthetic_corpus(size, seed=0):
+    """สร้างข้อความหน้าหลักสูตรจำลองแบบสุ่ม ครอบคลุมกรณีต่างๆ ของแพทเทิร์น"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        lines = rng.sample(NOISE_LINES, rng.randint(2, len(NOISE_LINES)))
+        for pool, chance in ((UNIVERSITY_LINES, 0.9), (CAMPUS_LINES, 0.7), (TUITION_LINES, 0.85)):
+            for _ in range(rng.randint(1, 3)):
+                if rng.random() < chance:
+                    lines.insert(rng.randrange(len(lines) + 1), rng.choice(pool))
+        # บางหน้าเอาหลายบรรทัดมาต่อกัน ให้แพทเทิร์นที่ข้ามบรรทัดได้ถูกทดสอบ
+        separator = rng.choice(['\n', '\n', ' ', '\n\n'])
+        corpus.append(separator.join(lines) * rng.randint(1, 40))
+    return corpus
+
+
+def load_cached_texts(cache_path):
+    """โหลดข้อความหน้าหลักสูตรจริงจาก PageCache"""
+    from page_cache import PageCache
+    cache = PageCache(cache_path)
+    texts = [text for _, text in cache.items('http')]
+    cache.close()
+    return texts
+
+
+def _best_time(func, corpus, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_extract(corpus, repeat=5):
+    """เทียบผลและความเร็วระหว่างตัวดึงข้อมูลเดิมกับแบบ compile ครั้งเดียว"""
+    scraper = TCASSimpleScraper()
+
+    def legacy_all(text):
+        return {
+            'university': legacy_find_university_name(text),
+            'campus': legacy_find_campus_name(text),
+            'tuition': legacy_find_tuition_cost(text),
+        }
+
+    mismatches = [text for text in corpus if legacy_all(text) != scraper.extract_program_fields(text)]
+
+    results = {'pages': len(corpus), 'mismatches': len(mismatches)}
+    pairs = [
+        ('university', legacy_find_university_name, scraper._find_university_name),
+        ('campus', legacy_find_campus_name, scraper._find_campus_name),
+        ('tuition', legacy_find_tuition_cost, scraper._find_tuition_cost),
+        ('all', legacy_all, scraper.extract_program_fields),
+    ]
+    for name, old, new in pairs:
+        old_time = _best_time(old, corpus, repeat)
+        new_time = _best_time(new, corpus, repeat)
+        results[name] = {
+            'legacy_us_per_page': old_time / len(corpus) * 1e6,
+            'new_us_per_page': new_time / len(corpus) * 1e6,
+            'speedup': old_time / new_time if new_time else float('inf'),
+        }
+    return results
+
+
+def print_extract_results(results):
+    print(f"📄 {results['pages']} หน้า, ผลไม่ตรงกับแบบเดิม: {results['mismatches']}")
+    for name in ('university', 'campus', 'tuition', 'all'):
+        r = results[name]
+        print(f"   {name:10s} เดิม {r['legacy_us_per_page']:8.1f} µs/หน้า  "
+              f"ใหม่ {r['new_us_per_page']:8.1f} µs/หน้า  เร็วขึ้น {r['speedup']:.2f}x")
+
+
+# ----- benchmark การส่งออกไฟล์ -----
+
+def synthetic_rows(count, seed=0):
+    """สร้างแถวผลลัพธ์จำลองตามคอลัมน์ของไฟล์ Excel"""
+    rng = random.Random(seed)
+    categories = ['วิศวกรรม คอมพิวเตอร์', 'วิศวกรรมปัญญาประดิษฐ์']
+    rows = []
+    for i in range(count):
+        amount = rng.choice([0, rng.randrange(3000, 200000, 500)])
+        rows.append({
+            'ชื่อหลักสูตร': f"วิศวกรรมศาสตรบัณฑิต สาขาวิชาวิศวกรรมคอมพิวเตอร์ หลักสูตรที่ {i}",
+            'มหาวิทยาลัย': rng.choice(UNIVERSITY_LINES),
+            'วิทยาเขต': rng.choice(['ไม่ระบุ', 'ศรีราชา', 'หาดใหญ่', 'รังสิต']),
+            'ค่าใช้จ่าย (บาท/ภาค)': amount,
+            'ค่าใช้จ่าย (ข้อความเต็ม)': f"{amount:,} บาท/ภาค" if amount else 'ไม่ระบุ',
+            'URL': f"https://course.mytcas.com/programs/{i:015d}",
+            'ประเภทหลักสูตร': rng.choice(categories),
+        })
+    return rows
+
+
+def legacy_export_xlsx(rows, path):
+    """การเขียน Excel แบบเดิมของ save_to_excel (DataFrame + copy + concat + openpyxl ปกติ)"""
+    import pandas as pd
+    df = pd.DataFrame(rows)
+    df_computer = df[df['ประเภทหลักสูตร'] == 'วิศวกรรม คอมพิวเตอร์'].copy()
+    df_ai = df[df['ประเภทหลักสูตร'] == 'วิศวกรรมปัญญาประดิษฐ์'].copy()
+    df_final = pd.concat([df_computer, df_ai], ignore_index=True)
+    df_final = df_final.sort_values(['ประเภทหลักสูตร', 'ค่าใช้จ่าย (บาท/ภาค)'], ascending=[True, True])
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        df_final.to_excel(writer, sheet_name='รวมทั้งหมด', index=False)
+        if len(df_computer) > 0:
+            df_computer.to_excel(writer, sheet_name='💻 วิศวกรรมคอมพิวเตอร์', index=False)
+        if len(df_ai) > 0:
+            df_ai.to_excel(writer, sheet_name='🤖 วิศวกรรมปัญญาประดิษฐ์', index=False)
+        for sheet_name in writer.sheets:
+            worksheet = writer.sheets[sheet_name]
+            for column, width in {'A': 50, 'B': 35, 'C': 20, 'D': 15, 'E': 25, 'F': 60, 'G': 25}.items():
+                worksheet.column_dimensions[column].width = width
+
+
+def _max_rss_mb():
+    # ru_maxrss เป็น KB บน Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _export_child(variant, count, fmt):
+    """วัดเวลาและหน่วยความจำสูงสุดของการส่งออกหนึ่งครั้ง (รันใน process แยก)"""
+    from export import export_rows
+    rows = synthetic_rows(count)
+    rss_before = _max_rss_mb()
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        if variant == 'legacy':
+            legacy_export_xlsx(rows, os.path.join(tmp, 'legacy.xlsx'))
+        else:
+            export_rows(rows, os.path.join(tmp, 'fast'), formats=[fmt])
+        seconds = time.perf_counter() - start
+    print(json.dumps({'seconds': seconds, 'rss_before_mb': rss_before, 'peak_rss_mb': _max_rss_mb()}))
+
+
+def bench_export(sizes, formats):
+    """เทียบเวลาและ peak RSS ของการส่งออกแบบเดิมกับแบบใหม่ในแต่ละขนาดข้อมูล"""
+    variants = [('legacy', 'xlsx')] + [('fast', fmt) for fmt in formats]
+    results = []
+    for count in sizes:
+        for variant, fmt in variants:
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '_export_child', variant, str(count), fmt],
+                capture_output=True, text=True)
+            if output.returncode != 0:
+                print(f"   ❌ {variant}/{fmt} {count:,} แถว: {output.stderr.strip().splitlines()[-1]}")
+                continue
+            result = json.loads(output.stdout.strip().splitlines()[-1])
+            result.update({'variant': variant, 'format': fmt, 'rows': count})
+            results.append(result)
+            print(f"   {count:>7,} แถว  {variant:6s} {fmt:7s} {result['seconds']:8.2f} s  "
+                  f"peak RSS {result['peak_rss_mb']:7.1f} MB "
+                  f"(+{result['peak_rss_mb'] - result['rss_before_mb']:.1f} MB จากก่อนส่งออก)")
+    return results
+
+
+# ----- benchmark เวลาเริ่มต้นของ CLI -----
+
+# ค่าอ้างอิง: sc.py เดิม import playwright และ pandas ทุกครั้งก่อนทำอะไร
+STARTUP_BASELINE = 'import playwright.async_api, pandas'
+
+
+def _startup_seconds(argv, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def bench_startup(repeat=5):
+    """เวลาเริ่มต้น (process ใหม่ถึงพร้อมรับตัวเลือก) ของแต่ละคำสั่งใน tcas.py เทียบกับค่าอ้างอิง
+
+    วัดจาก `tcas.py <คำสั่ง> --help` ซึ่ง import module ของคำสั่งนั้นแล้วจบทันที
+    """
+    from tcas import COMMANDS
+
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tcas.py')
+    cases = [('python (เปล่า)', [sys.executable, '-c', 'pass']),
+             ('sc.py เดิม (playwright+pandas)', [sys.executable, '-c', STARTUP_BASELINE])]
+    cases += [(f'tcas.py {command}', [sys.executable, script, command, '--help']) for command in COMMANDS]
+    results = {}
+    for name, argv in cases:
+        times = _startup_seconds(argv, repeat)
+        results[name] = {'min_ms': round(min(times) * 1000, 1),
+                         'median_ms': round(statistics.median(times) * 1000, 1)}
+        print(f"   {name:32s} min {results[name]['min_ms']:7.1f} ms  median {results[name]['median_ms']:7.1f} ms")
+    return results
+
+
+# ----- ชุด benchmark แบบครบวงจรกับ server จำลอง -----
+
+# ข้อมูลสำหรับสร้างหน้าหลักสูตรจำลองที่รู้คำตอบที่ถูกต้อง
+FIXTURE_UNIVERSITIES = [
+    'มหาวิทยาลัยเกษตรศาสตร์', 'มหาวิทยาลัยขอนแก่น', 'มหาวิทยาลัยเชียงใหม่', 'มหาวิทยาลัยมหิดล',
+    'มหาวิทยาลัยสงขลานครินทร์', 'มหาวิทยาลัยธรรมศาสตร์', 'จุฬาลงกรณ์มหาวิทยาลัย',
+    'สถาบันเทคโนโลยีพระจอมเกล้าเจ้าคุณทหารลาดกระบัง',
+]
+FIXTURE_CAMPUSES = ['บางเขน', 'ศรีราชา', 'กำแพงแสน', 'หาดใหญ่', 'ภูเก็ต', 'ศาลายา', 'ไม่ระบุ']
+FIXTURE_CATEGORIES = ['วิศวกรรม คอมพิวเตอร์', 'วิศวกรรมปัญญาประดิษฐ์']
+
+PROGRAMS_FILE = 'programs.json'
+EXPECTED_FILE = 'expected.json'
+
+
+def write_program_fixtures(directory, count, seed=0):
+    """สร้างหน้าหลักสูตรจำลอง count หน้า พร้อม programs.json (ผลการค้นหา) และ expected.json (คำตอบ)"""
+    rng = random.Random(seed)
+    programs = []
+    expected = {}
+    os.makedirs(os.path.join(directory, 'programs'), exist_ok=True)
+    for i in range(count):
+        program_id = f"{10000000000000 + i}"
+        url = f"https://course.mytcas.com/programs/{program_id}"
+        category = rng.choice(FIXTURE_CATEGORIES)
+        title = f"วิศวกรรมศาสตรบัณฑิต สาขาวิชา{category.replace(' ', '')} ({i})"
+        university = rng.choice(FIXTURE_UNIVERSITIES)
+        campus = rng.choice(FIXTURE_CAMPUSES)
+        amount = rng.choice([0, rng.randrange(10000, 150000, 500)])
+
+        lines = [title, university]
+        if campus != 'ไม่ระบุ':
+            lines.append(f"วิทยาเขต{campus}")
+        lines += rng.sample(NOISE_LINES[2:], 4)
+        if amount:
+            lines += ['ค่าใช้จ่าย', f"{amount:,} บาท/ภาคการศึกษา"]
+        body = ''.join(f"<div>{line}</div>" for line in lines)
+        html = (f"<html><head><title>{title}</title><style>div{{margin:0}}</style></head>"
+                f"<body><nav>mytcas</nav>{body}<script>window.__x = 1</script></body></html>")
+        with open(os.path.join(directory, 'programs', f"{program_id}.html"), 'w', encoding='utf-8') as f:
+            f.write(html)
+
+        programs.append({'url': url, 'title': title, 'search_term': category})
+        expected[url] = {'university': university, 'campus': campus, 'tuition': amount}
+
+    with open(os.path.join(directory, PROGRAMS_FILE), 'w', encoding='utf-8') as f:
+        json.dump(programs, f, ensure_ascii=False)
+    with open(os.path.join(directory, EXPECTED_FILE), 'w', encoding='utf-8') as f:
+        json.dump(expected, f, ensure_ascii=False)
+    return programs, expected
+
+
+def load_program_fixtures(directory):
+    """อ่าน fixture ที่บันทึกไว้ (เช่นจาก fixture_server.py record)
+
+    programs.json: [{"url", "title", "search_term"}] ถ้าไม่มีจะใช้ทุกไฟล์ใน programs/
+    expected.json: {url: {"university", "campus", "tuition"}} (ไม่มี = ไม่วัดความถูกต้อง)
+    """
+    programs_path = os.path.join(directory, PROGRAMS_FILE)
+    if os.path.exists(programs_path):
+        with open(programs_path, encoding='utf-8') as f:
+            programs = json.load(f)
+    else:
+        programs = []
+        for filename in sorted(os.listdir(os.path.join(directory, 'programs'))):
+            program_id = os.path.splitext(filename)[0]
+            programs.append({'url': f"https://course.mytcas.com/programs/{program_id}",
+                             'title': program_id, 'search_term': 'fixture'})
+
+    expected = None
+    expected_path = os.path.join(directory, EXPECTED_FILE)
+    if os.path.exists(expected_path):
+        with open(expected_path, encoding='utf-8') as f:
+            expected = json.load(f)
+    return programs, expected
+
+
+def write_expected(directory):
+    """บันทึกผลการดึงข้อมูลปัจจุบันของ fixture เป็นคำตอบอ้างอิง (ใช้ตรวจว่าการแก้ไขถัดไปไม่ทำให้ผลเปลี่ยน)"""
+    from metrics import NullMetrics
+    programs, _ = load_program_fixtures(directory)
+    scraper = TCASSimpleScraper(metrics=NullMetrics())
+    expected = {}
+    for program, text in zip(programs, fixture_texts(directory, programs)):
+        fields = scraper.extract_program_fields(text)
+        expected[program['url']] = {'university': fields['university'], 'campus': fields['campus'],
+                                    'tuition': fields['tuition']['amount']}
+    with open(os.path.join(directory, EXPECTED_FILE), 'w', encoding='utf-8') as f:
+        json.dump(expected, f, ensure_ascii=False, indent=2)
+    print(f"💾 บันทึก {len(expected):,} คำตอบลง {os.path.join(directory, EXPECTED_FILE)}")
+
+
+def fixture_texts(directory, programs):
+    """ข้อความของหน้าหลักสูตรใน fixture (แปลง HTML แบบเดียวกับโหมด http)"""
+    from http_fetch import html_to_text
+    texts = []
+    for program in programs:
+        program_id = program['url'].rstrip('/').rsplit('/', 1)[-1]
+        path = os.path.join(directory, 'programs', f"{program_id}.html")
+        if os.path.exists(path):
+            with open(path, encoding='utf-8', errors='replace') as f:
+                texts.append(html_to_text(f.read()))
+    return texts
+
+
+def extraction_accuracy(rows, expected):
+    """สัดส่วนฟิลด์ที่ดึงได้ตรงกับ expected (ต่อฟิลด์ และทั้งแถว)"""
+    fields = {'university': 'มหาวิทยาลัย', 'campus': 'วิทยาเขต', 'tuition': 'ค่าใช้จ่าย (บาท/ภาค)'}
+    correct = {name: 0 for name in fields}
+    all_correct = 0
+    checked = 0
+    for row in rows:
+        truth = expected.get(row['URL'])
+        if truth is None:
+            continue
+        checked += 1
+        row_ok = True
+        for name, column in fields.items():
+            if row[column] == truth[name]:
+                correct[name] += 1
+            else:
+                row_ok = False
+        all_correct += row_ok
+    if not checked:
+        return None
+    accuracy = {name: round(count / checked, 4) for name, count in correct.items()}
+    accuracy['row'] = round(all_correct / checked, 4)
+    accuracy['checked'] = checked
+    return accuracy
+
+
+def run_e2e(directory, programs, expected=None, concurrency=8):
+    """รัน run_simple_scraping ทั้งกระบวนการกับ server จำลอง (โหมด http)
+
+    ผลการค้นหามาจาก programs.json (ใส่ไว้ใน cache แทนการพิมพ์ค้นหาใน browser)
+    หน้าหลักสูตรทุกหน้าดึงผ่าน HTTP จาก server จำลอง
+    """
+    import asyncio
+    import contextlib
+    import io
+    from fixture_server import start_fixture_server
+    from metrics import Metrics
+    from page_cache import PageCache
+    from search_config import SearchTerm
+
+    server, base_url = start_fixture_server(directory)
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = PageCache(os.path.join(tmp, 'cache.sqlite'))
+            by_category = {}
+            for program in programs:
+                by_category.setdefault(program['search_term'], []).append(program)
+            for category, category_programs in by_category.items():
+                cache.put(f"search:{category}", json.dumps(category_programs, ensure_ascii=False))
+
+            metrics = Metrics()
+            scraper = TCASSimpleScraper(concurrency=concurrency, request_interval=0,
+                                        fetch_mode='http', http_base_url=base_url, cache=cache,
+                                        search_terms=[SearchTerm(category) for category in by_category],
+                                        metrics=metrics)
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                asyncio.run(scraper.run_simple_scraping())
+            seconds = time.perf_counter() - start
+            cache.close()
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    report = metrics.report()
+    detail = report['stages'].get('detail_fetch', {})
+    rows = scraper.programs_data
+    return {
+        'programs': len(programs),
+        'scraped': len(rows),
+        'seconds': round(seconds, 3),
+        'programs_per_min': round(len(rows) / seconds * 60, 1) if seconds else 0.0,
+        'detail_p50_ms': detail.get('p50_ms'),
+        'detail_p95_ms': detail.get('p95_ms'),
+        'detail_max_ms': detail.get('max_ms'),
+        'accuracy': extraction_accuracy(rows, expected) if expected else None,
+    }
+
+
+def bench_extractors(texts, repeat=5, min_pages=5000):
+    """microbenchmark _find_* แต่ละตัวบนข้อความหน้าหลักสูตร (µs/หน้า)
+
+    วนข้อความซ้ำให้ได้อย่างน้อย min_pages หน้าต่อรอบ เพื่อไม่ให้ผลแกว่งเมื่อ corpus เล็ก
+    """
+    from metrics import NullMetrics
+    scraper = TCASSimpleScraper(metrics=NullMetrics())
+    results = {'pages': len(texts)}
+    if texts:
+        texts = texts * -(-min_pages // len(texts))
+    for name, func in (('university', scraper._find_university_name),
+                       ('campus', scraper._find_campus_name),
+                       ('tuition', scraper._find_tuition_cost),
+                       ('all', scraper.extract_program_fields)):
+        results[name] = round(_best_time(func, texts, repeat) / len(texts) * 1e6, 2) if texts else None
+    return results
+
+
+def _git_commit():
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        return output.stdout.strip() or None
+    except OSError:
+        return None
+
+
+# ประวัติผล benchmark ของเครื่องนี้ (ไม่ commit เข้า repo)
+BENCH_HISTORY = os.path.join('bench', 'bench_history.jsonl')
+
+
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def find_regressions(history, current, tolerance=0.3, baseline_runs=5):
+    """เทียบผลรอบนี้กับค่ามัธยฐานของ baseline_runs รอบล่าสุด (corpus และขนาดเดียวกัน)
+
+    ใช้มัธยฐานแทนรอบก่อนหน้ารอบเดียว เพื่อไม่ให้ความแกว่งของเครื่องทำให้แจ้งเตือนผิด
+    """
+    recent = history[-baseline_runs:]
+    if not recent:
+        return []
+    problems = []
+    for run in current['e2e']:
+        previous = [r for record in recent for r in record['e2e'] if r['programs'] == run['programs']]
+        if not previous:
+            continue
+        baseline = statistics.median(r['programs_per_min'] for r in previous)
+        if baseline and run['programs_per_min'] < baseline * (1 - tolerance):
+            problems.append(f"{run['programs']} หลักสูตร: {baseline:,.0f} -> "
+                            f"{run['programs_per_min']:,.0f} หลักสูตร/นาที")
+        accuracies = [r['accuracy']['row'] for r in previous if r.get('accuracy')]
+        if accuracies and run.get('accuracy') and run['accuracy']['row'] < max(accuracies):
+            problems.append(f"{run['programs']} หลักสูตร: ความถูกต้อง {max(accuracies):.2%} -> "
+                            f"{run['accuracy']['row']:.2%}")
+    for name in ('university', 'campus', 'tuition', 'all'):
+        previous = [record['extract'][name] for record in recent if record['extract'].get(name)]
+        new = current['extract'].get(name)
+        if previous and new:
+            baseline = statistics.median(previous)
+            if new > baseline * (1 + tolerance):
+                problems.append(f"_find {name}: {baseline:.1f} -> {new:.1f} µs/หน้า")
+    return problems
+
+
+def bench_suite(sizes, fixtures=None, concurrency=8, repeat=5, history_path=BENCH_HISTORY,
+                tolerance=0.3):
+    """benchmark ครบวงจรแต่ละขนาด + microbenchmark ตัวดึงข้อมูล แล้วบันทึกต่อท้าย history"""
+    record = {
+        'timestamp': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'commit': _git_commit(),
+        'corpus': os.path.abspath(fixtures) if fixtures else 'synthetic',
+        'concurrency': concurrency,
+        'sizes': list(sizes),
+        'e2e': [],
+    }
+    texts = []
+    with tempfile.TemporaryDirectory() as tmp:
+        if fixtures:
+            all_programs, expected = load_program_fixtures(fixtures)
+        else:
+            all_programs, expected = write_program_fixtures(tmp, max(sizes))
+        directory = fixtures or tmp
+
+        for size in sizes:
+            programs = all_programs[:size]
+            result = run_e2e(directory, programs, expected, concurrency=concurrency)
+            record['e2e'].append(result)
+            accuracy = result['accuracy']
+            accuracy_text = f", ถูกต้อง {accuracy['row']:.2%}" if accuracy else ""
+            print(f"   {result['programs']:>6,} หลักสูตร  {result['seconds']:8.2f} s  "
+                  f"{result['programs_per_min']:>10,.0f} หลักสูตร/นาที  "
+                  f"detail p50 {result['detail_p50_ms'] or 0:.1f} / p95 {result['detail_p95_ms'] or 0:.1f} ms"
+                  f"{accuracy_text}")
+        texts = fixture_texts(directory, all_programs)
+
+    record['extract'] = bench_extractors(texts, repeat=repeat)
+    e = record['extract']
+    if texts:
+        print(f"   _find_* บน {e['pages']:,} หน้า: university {e['university']:.1f}, campus {e['campus']:.1f}, "
+              f"tuition {e['tuition']:.1f}, ทั้งหมด {e['all']:.1f} µs/หน้า")
+
+    same_corpus = [r for r in load_history(history_path)
+                   if (r['corpus'], r['concurrency'], r.get('sizes')) ==
+                   (record['corpus'], concurrency, record['sizes'])]
+    record['regressions'] = find_regressions(same_corpus, record, tolerance)
+    os.makedirs(os.path.dirname(history_path) or '.', exist_ok=True)
+    with open(history_path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    print(f"📝 บันทึกผลลง {history_path}")
+    return record
+
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark ของ TCAS scraper')
+    sub = parser.add_subparsers(dest='command', required=True)
+    extract_parser = sub.add_parser('extract', help='microbenchmark ตัวดึงข้อมูล _find_*')
+    extract_parser.add_argument('--pages', type=int, default=2000, help='จำนวนหน้าจำลอง')
+    extract_parser.add_argument('--cache', default=None, help='ใช้ข้อความจริงจาก PageCache ด้วย')
+    extract_parser.add_argument('--repeat', type=int, default=5)
+    export_parser = sub.add_parser('export', help='เวลาและ peak RSS ของการส่งออกไฟล์')
+    export_parser.add_argument('--sizes', default='1000,10000,100000')
+    export_parser.add_argument('--formats', default='xlsx,csv,parquet')
+    suite_parser = sub.add_parser('suite', help='benchmark ครบวงจรกับ server จำลอง แล้วบันทึกผลเทียบรอบก่อน')
+    suite_parser.add_argument('--sizes', default='10,100,1000', help='จำนวนหลักสูตรแต่ละรอบ')
+    suite_parser.add_argument('--fixtures', default=None,
+                              help='ไดเรกทอรี fixture ที่บันทึกไว้ (ค่าเริ่มต้น = สร้างหน้าจำลอง)')
+    suite_parser.add_argument('--concurrency', type=int, default=8)
+    suite_parser.add_argument('--repeat', type=int, default=5)
+    suite_parser.add_argument('--history', default=BENCH_HISTORY, help='ไฟล์ประวัติผล benchmark')
+    suite_parser.add_argument('--tolerance', type=float, default=0.3,
+                              help='ช้าลงเกินสัดส่วนนี้จากรอบก่อนถือว่า regression')
+    suite_parser.add_argument('--write-expected', action='store_true',
+                              help='บันทึกผลการดึงข้อมูลปัจจุบันเป็น expected.json ของ --fixtures')
+    startup_parser = sub.add_parser('startup', help='เวลาเริ่มต้นของแต่ละคำสั่งใน tcas.py')
+    startup_parser.add_argument('--repeat', type=int, default=5)
+    child_parser = sub.add_parser('_export_child')
+    child_parser.add_argument('variant')
+    child_parser.add_argument('count', type=int)
+    child_parser.add_argument('format')
+    args = parser.parse_args()
+
+    if args.command == 'extract':
+        corpus = synthetic_corpus(args.pages)
+        if args.cache:
+            corpus += load_cached_texts(args.cache)
+        results = bench_extract(corpus, repeat=args.repeat)
+        print_extract_results(results)
+        if results['mismatches']:
+            raise SystemExit(1)
+    elif args.command == 'export':
+        sizes = [int(size) for size in args.sizes.split(',')]
+        bench_export(sizes, [fmt.strip() for fmt in args.formats.split(',')])
+    elif args.command == 'suite':
+        sizes = [int(size) for size in args.sizes.split(',')]
+        if args.write_expected:
+            if not args.fixtures:
+                parser.error('--write-expected ต้องใช้กับ --fixtures')
+            write_expected(args.fixtures)
+            return
+        record = bench_suite(sizes, fixtures=args.fixtures, concurrency=args.concurrency,
+                             repeat=args.repeat, history_path=args.history, tolerance=args.tolerance)
+        if record['regressions']:
+            print("❌ ช้าลงหรือความถูกต้องลดลงจากรอบก่อน:")
+            for problem in record['regressions']:
+                print(f"   {problem}")
+            raise SystemExit(1)
+    elif args.command == 'startup':
+        bench_startup(repeat=args.repeat)
+    elif args.command == '_export_child':
+        _export_child(args.variant, args.count, args.format)
+
+
+if __name__ == "__main__":
+    main()
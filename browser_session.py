@@ -0,0 +1,179 @@
+import asyncio
+from collections import Counter
+from urllib.parse import urlsplit
+
+# ชนิดคำขอที่ยอมให้โหลดในโหมด lean (เราอ่านแค่ inner_text('body'))
+# ต้องรวม script ด้วยเพราะหน้าเว็บสร้างเนื้อหาด้วย JavaScript (SPA)
+ALLOWED_RESOURCE_TYPES = ('document', 'script', 'xhr', 'fetch')
+
+# โดเมนภายนอกที่ไม่เกี่ยวกับเนื้อหา (สถิติ โฆษณา แชท ฟอนต์) บล็อกทุกชนิดคำขอ
+BLOCKED_HOSTS = (
+    'google-analytics.com',
+    'googletagmanager.com',
+    'doubleclick.net',
+    'googlesyndication.com',
+    'googleadservices.com',
+    'facebook.net',
+    'facebook.com',
+    'hotjar.com',
+    'clarity.ms',
+    'tiktok.com',
+    'line-scdn.net',
+    'fonts.googleapis.com',
+    'fonts.gstatic.com',
+)
+
+
+def block_reason(resource_type, url, allowed_types=ALLOWED_RESOURCE_TYPES, blocked_hosts=BLOCKED_HOSTS):
+    """เหตุผลที่ควรบล็อกคำขอ (ชนิดคำขอ หรือ 'third_party') หรือ None ถ้าให้โหลดได้"""
+    host = (urlsplit(url).hostname or '').lower()
+    if any(host == blocked or host.endswith('.' + blocked) for blocked in blocked_hosts):
+        return 'third_party'
+    if resource_type not in allowed_types:
+        return resource_type
+    return None
+
+
+class BrowserSession:
+    """เปิด browser context สำหรับ scraping พร้อมนับคำขอและจำนวน byte ที่รับส่งจริง
+
+    headless: ไม่แสดงหน้าต่าง browser (ค่าเริ่มต้น)
+    lean: บล็อกรูป ฟอนต์ stylesheet สื่อ และโดเมนภายนอกใน BLOCKED_HOSTS ด้วย context.route
+    profile_dir: ใช้ persistent context ในไดเรกทอรีนี้ซ้ำข้ามรอบ (cookie, storage) None = context ใหม่ทุกครั้ง
+    """
+
+    def __init__(self, headless=True, lean=True, profile_dir=None,
+                 allowed_types=ALLOWED_RESOURCE_TYPES, blocked_hosts=BLOCKED_HOSTS,
+                 locale='th-TH',
+                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'):
+        self.headless = headless
+        self.lean = lean
+        self.profile_dir = profile_dir
+        self.allowed_types = tuple(allowed_types)
+        self.blocked_hosts = tuple(blocked_hosts)
+        self.context_options = {'locale': locale, 'user_agent': user_agent}
+        self.requests = 0
+        self.bytes = 0
+        self.blocked = Counter()
+        self._browser = None
+        self._context = None
+
+    async def start(self, playwright):
+        """เปิด browser และคืนค่า context ที่ตั้งค่าแล้ว"""
+        if self.profile_dir:
+            self._context = await playwright.chromium.launch_persistent_context(
+                self.profile_dir, headless=self.headless, **self.context_options)
+        else:
+            self._browser = await playwright.chromium.launch(headless=self.headless)
+            self._context = await self._browser.new_context(**self.context_options)
+
+        if self.lean:
+            await self._context.route('**/*', self._route)
+        self._context.on('requestfinished', self._on_request_finished)
+        return self._context
+
+    def lazy_context(self, playwright):
+        """context ที่เปิด browser เมื่อมีการใช้หน้าเว็บครั้งแรกเท่านั้น
+
+        ถ้าทุกหน้าได้จาก cache หรือ HTTP จะไม่ต้องเปิด browser เลย
+        """
+        return LazyContext(self, playwright)
+
+    @property
+    def started(self):
+        return self._context is not None
+
+    async def close(self):
+        if self._context:
+            await self._context.close()
+        if self._browser:
+            await self._browser.close()
+        self._context = None
+        self._browser = None
+
+    async def _route(self, route):
+        request = route.request
+        reason = block_reason(request.resource_type, request.url, self.allowed_types, self.blocked_hosts)
+        if reason:
+            self.blocked[reason] += 1
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def _on_request_finished(self, request):
+        self.requests += 1
+        try:
+            sizes = await request.sizes()
+        except Exception:
+            return
+        self.bytes += sum(max(0, sizes.get(key, 0)) for key in (
+            'requestHeadersSize', 'requestBodySize', 'responseHeadersSize', 'responseBodySize'))
+
+    def report(self):
+        return {
+            'lean': self.lean,
+            'headless': self.headless,
+            'requests': self.requests,
+            'bytes': self.bytes,
+            'blocked': sum(self.blocked.values()),
+            'blocked_by_type': dict(self.blocked),
+        }
+
+    def print_report(self):
+        if not self.started and not self.requests:
+            print("\n🌐 ไม่ได้เปิด browser (ทุกหน้าได้จาก cache หรือ HTTP)")
+            return
+        report = self.report()
+        mode = 'lean' if self.lean else 'โหลดครบ'
+        print(f"\n🌐 Browser ({mode}): {report['requests']:,} คำขอ, "
+              f"รับส่ง {report['bytes'] / 1024 / 1024:,.2f} MB, บล็อก {report['blocked']:,} คำขอ")
+        if self.blocked:
+            detail = ', '.join(f"{name} {count:,}" for name, count in self.blocked.most_common())
+            print(f"   🚫 {detail}")
+
+
+class LazyContext:
+    """แทน browser context: new_page() คืน LazyPage และเปิด browser เมื่อหน้าแรกถูกใช้งานจริง"""
+
+    def __init__(self, session, playwright):
+        self.session = session
+        self.playwright = playwright
+        self._context = None
+        self._lock = asyncio.Lock()
+
+    async def get(self):
+        async with self._lock:
+            if self._context is None:
+                self._context = await self.session.start(self.playwright)
+        return self._context
+
+    async def new_page(self):
+        return LazyPage(self)
+
+
+class LazyPage:
+    """หน้าเว็บที่สร้างจริงเมื่อเรียก method แรก (เช่น goto) หลังจากนั้นส่งต่อทุกอย่างให้หน้าจริง"""
+
+    def __init__(self, lazy_context):
+        self._lazy_context = lazy_context
+        self._page = None
+
+    async def _ensure(self):
+        if self._page is None:
+            context = await self._lazy_context.get()
+            self._page = await context.new_page()
+        return self._page
+
+    def __getattr__(self, name):
+        if self._page is not None:
+            return getattr(self._page, name)
+
+        async def call(*args, **kwargs):
+            page = await self._ensure()
+            return await getattr(page, name)(*args, **kwargs)
+        return call
+
+    async def close(self):
+        if self._page is not None:
+            await self._page.close()
+            self._page = None
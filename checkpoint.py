@@ -0,0 +1,96 @@
+import glob
+import json
+import os
+import time
+
+
+class CrawlCheckpoint:
+    """บันทึกความคืบหน้าของการดึงข้อมูล เพื่อทำงานต่อได้หลังหยุดกลางคัน
+
+    เก็บรายการหลักสูตรที่ค้นพบ (frontier), URL ที่ดึงเสร็จแล้ว, URL ที่ดึงไม่สำเร็จ
+    และไฟล์ sink ที่ใช้เก็บผลลัพธ์ เขียนไฟล์แบบ atomic (เขียนไฟล์ชั่วคราวแล้ว rename)
+    """
+
+    def __init__(self, path='tcas_checkpoint.json', save_interval=2.0):
+        self.path = path
+        self.save_interval = save_interval
+        self.programs = []
+        self.completed = set()
+        self.failed = set()
+        self.sink_path = None
+        self.finished = False
+        self._last_save = 0.0
+
+    @classmethod
+    def load(cls, path='tcas_checkpoint.json', **kwargs):
+        """โหลด checkpoint เดิม (ถ้าไม่มีไฟล์จะได้ checkpoint ว่าง)"""
+        checkpoint = cls(path, **kwargs)
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            checkpoint.programs = data.get('programs', [])
+            checkpoint.completed = set(data.get('completed', []))
+            checkpoint.failed = set(data.get('failed', []))
+            checkpoint.sink_path = data.get('sink_path')
+            checkpoint.finished = data.get('finished', False)
+        return checkpoint
+
+    def set_frontier(self, programs):
+        """บันทึกรายการหลักสูตรทั้งหมดที่ค้นพบ"""
+        self.programs = list(programs)
+        self.save(force=True)
+
+    def mark_done(self, url):
+        self.completed.add(url)
+        self.failed.discard(url)
+        self.save()
+
+    def mark_failed(self, url):
+        self.failed.add(url)
+        self.save()
+
+    def pending(self):
+        """หลักสูตรที่ยังไม่เสร็จ (ยังไม่เคยดึง หรือดึงไม่สำเร็จ) ตามลำดับเดิม"""
+        return [p for p in self.programs if p['url'] not in self.completed]
+
+    def save(self, force=False):
+        """เขียนไฟล์ checkpoint (ไม่บ่อยกว่า save_interval วินาที ยกเว้น force)"""
+        now = time.monotonic()
+        if not force and now - self._last_save < self.save_interval:
+            return
+        self._last_save = now
+
+        data = {
+            'updated_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'sink_path': self.sink_path,
+            'finished': self.finished,
+            'programs': self.programs,
+            'completed': sorted(self.completed),
+            'failed': sorted(self.failed),
+        }
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+
+
+def unfinished_sinks(directory='.', pattern='*checkpoint*.json'):
+    """path เต็มของไฟล์ sink ที่ checkpoint ในโฟลเดอร์ยังไม่จบงาน (กำลังดึงข้อมูลอยู่หรือหยุดกลางคัน)
+
+    sink_path แบบ relative ถูกตีความทั้งจากโฟลเดอร์ของ checkpoint และโฟลเดอร์ปัจจุบัน
+    """
+    sinks = set()
+    for path in glob.glob(os.path.join(directory, pattern)):
+        try:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if not isinstance(data, dict) or data.get('finished') or not data.get('sink_path'):
+            continue
+        sink_path = data['sink_path']
+        sinks.add(os.path.abspath(os.path.join(os.path.dirname(path), sink_path)))
+        sinks.add(os.path.abspath(sink_path))
+    return sinks
@@ -0,0 +1,115 @@
+import hashlib
+import json
+import sqlite3
+import time
+
+
+def content_hash(text):
+    """hash ของข้อความหน้าเว็บ ใช้ตรวจว่าหน้าเปลี่ยนหรือไม่"""
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+class CrawlState:
+    """เก็บสถานะหลักสูตรที่เคยดึงมาแล้วข้ามรอบการทำงาน (SQLite)
+
+    แต่ละ URL เก็บ hash ของหน้า, เวลาที่ดึงล่าสุด และแถวข้อมูลที่ได้
+    ใช้ตัดสินว่าหลักสูตรใดต้องดึงใหม่ และสรุปสิ่งที่เปลี่ยนไปจากรอบก่อน
+    """
+
+    def __init__(self, path='tcas_state.sqlite', refresh_after=7 * 24 * 3600):
+        self.path = path
+        self.refresh_after = refresh_after
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS programs (
+                url TEXT PRIMARY KEY,
+                search_term TEXT,
+                content_hash TEXT,
+                last_fetched REAL NOT NULL,
+                row_json TEXT NOT NULL
+            )
+        ''')
+        self._conn.commit()
+        self.previous = self._load()
+
+    def _load(self):
+        rows = self._conn.execute(
+            'SELECT url, search_term, content_hash, last_fetched, row_json FROM programs').fetchall()
+        return {
+            url: {
+                'search_term': search_term,
+                'content_hash': hash_,
+                'last_fetched': last_fetched,
+                'row': json.loads(row_json),
+            }
+            for url, search_term, hash_, last_fetched, row_json in rows
+        }
+
+    def needs_fetch(self, url, now=None):
+        """ต้องดึงใหม่ถ้าไม่เคยเห็น URL นี้ หรือดึงครั้งล่าสุดนานเกิน refresh_after"""
+        record = self.previous.get(url)
+        if record is None:
+            return True
+        now = now or time.time()
+        return now - record['last_fetched'] >= self.refresh_after
+
+    def cached_row(self, url):
+        record = self.previous.get(url)
+        return dict(record['row']) if record else None
+
+    def update(self, url, search_term, row, page_hash):
+        """บันทึกผลการดึงล่าสุดของหลักสูตร"""
+        self._conn.execute(
+            'INSERT OR REPLACE INTO programs (url, search_term, content_hash, last_fetched, row_json) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (url, search_term, page_hash, time.time(), json.dumps(row, ensure_ascii=False)))
+
+    def remove(self, urls):
+        self._conn.executemany('DELETE FROM programs WHERE url = ?', [(url,) for url in urls])
+
+    def commit(self):
+        self._conn.commit()
+
+    def close(self):
+        self._conn.commit()
+        self._conn.close()
+
+    def compute_delta(self, rows, page_hashes, searched_terms):
+        """เทียบผลรอบนี้กับรอบก่อน: หลักสูตรใหม่ / หายไป / ค่าใช้จ่ายเปลี่ยน / หน้าเปลี่ยน
+
+        หลักสูตรจะถือว่า "หายไป" เฉพาะเมื่อคำค้นหาของมันได้ผลลัพธ์ในรอบนี้
+        (กันกรณีค้นหาล้มเหลวชั่วคราวแล้วทุกอย่างหายหมด)
+        """
+        current_urls = {row['URL'] for row in rows}
+        added = [row for row in rows if row['URL'] not in self.previous]
+        removed = [
+            record['row'] for url, record in self.previous.items()
+            if url not in current_urls and record['search_term'] in searched_terms
+        ]
+
+        tuition_changed = []
+        content_changed = []
+        for row in rows:
+            record = self.previous.get(row['URL'])
+            if record is None:
+                continue
+            old_amount = record['row'].get('ค่าใช้จ่าย (บาท/ภาค)', 0)
+            new_amount = row.get('ค่าใช้จ่าย (บาท/ภาค)', 0)
+            if old_amount != new_amount:
+                tuition_changed.append({
+                    'URL': row['URL'],
+                    'ชื่อหลักสูตร': row['ชื่อหลักสูตร'],
+                    'มหาวิทยาลัย': row['มหาวิทยาลัย'],
+                    'ค่าใช้จ่ายเดิม': old_amount,
+                    'ค่าใช้จ่ายใหม่': new_amount,
+                })
+            new_hash = page_hashes.get(row['URL'])
+            if new_hash and record['content_hash'] and new_hash != record['content_hash']:
+                content_changed.append(row['URL'])
+
+        return {
+            'added': added,
+            'removed': removed,
+            'tuition_changed': tuition_changed,
+            'content_changed': content_changed,
+        }
@@ -0,0 +1,220 @@
+import argparse
+import csv
+import os
+from datetime import datetime
+
+from report import SUMMARY_HEADERS, summary_rows, write_report_csv, write_report_json
+from sinks import COLUMNS, TUITION_COLUMN, open_sink, read_rows
+
+CATEGORY_COLUMN = 'ประเภทหลักสูตร'
+
+# ความกว้างคอลัมน์ใน Excel ตามลำดับ COLUMNS
+COLUMN_WIDTHS = {
+    'A': 50,  # ชื่อหลักสูตร
+    'B': 35,  # มหาวิทยาลัย
+    'C': 20,  # วิทยาเขต
+    'D': 15,  # ค่าใช้จ่าย (ตัวเลข)
+    'E': 25,  # ค่าใช้จ่าย (ข้อความ)
+    'F': 60,  # URL
+    'G': 25,  # ประเภทหลักสูตร
+    'H': 15,  # รหัสมหาวิทยาลัย
+    'I': 25,  # รหัสวิทยาเขต
+}
+
+# sheet สรุปสถิติ (มิติ, กลุ่ม แล้วตามด้วยคอลัมน์ตัวเลข)
+SUMMARY_SHEET = 'สรุป'
+SUMMARY_COLUMN_WIDTHS = {'A': 15, 'B': 50}
+
+EXPORT_FORMATS = ('xlsx', 'csv', 'parquet')
+
+
+# อักขระที่ใช้ในชื่อ sheet ของ Excel ไม่ได้ และความยาวสูงสุด
+_INVALID_SHEET_CHARS = '[]:*?/\\'
+_MAX_SHEET_LENGTH = 31
+
+
+def sheet_title(name):
+    """ชื่อ sheet ที่ Excel ยอมรับ"""
+    for char in _INVALID_SHEET_CHARS:
+        name = name.replace(char, ' ')
+    return name[:_MAX_SHEET_LENGTH]
+
+
+def default_categories(rows):
+    """(ประเภท, ชื่อ sheet) ของทุกประเภทที่มีในแถว เมื่อไม่ได้ระบุ categories"""
+    names = sorted({row.get(CATEGORY_COLUMN) or '' for row in rows})
+    return [(name, name or 'ไม่ระบุประเภท') for name in names]
+
+
+def sort_rows(rows, categories=None):
+    """เลือกเฉพาะประเภทที่ส่งออก (None = ทุกประเภท) แล้วเรียงตามประเภทและค่าใช้จ่ายครั้งเดียว"""
+    if categories is None:
+        selected = list(rows)
+    else:
+        wanted = {category for category, _ in categories}
+        selected = [row for row in rows if row.get(CATEGORY_COLUMN) in wanted]
+    selected.sort(key=lambda row: (row.get(CATEGORY_COLUMN) or '', row.get(TUITION_COLUMN) or 0))
+    return selected
+
+
+def _category_runs(sorted_rows):
+    """แบ่งแถวที่เรียงแล้วเป็นช่วงของแต่ละประเภท (ไม่คัดลอกแถว)"""
+    runs = {}
+    start = 0
+    for index in range(1, len(sorted_rows) + 1):
+        if index == len(sorted_rows) or \
+                sorted_rows[index].get(CATEGORY_COLUMN) != sorted_rows[start].get(CATEGORY_COLUMN):
+            runs[sorted_rows[start].get(CATEGORY_COLUMN) or ''] = (start, index)
+            start = index
+    return runs
+
+
+def write_xlsx(sorted_rows, path, categories=None, summary=None):
+    """เขียน Excel แบบ write-only (ใช้หน่วยความจำคงที่ ไม่สร้าง DataFrame)
+
+    summary: ผลของ report.build_report (ถ้ามี จะเพิ่ม sheet สรุปต่อท้าย)
+    คืนค่า dict ของจำนวนแถวในแต่ละ sheet ประเภท
+    """
+    from openpyxl import Workbook
+
+    categories = categories if categories is not None else default_categories(sorted_rows)
+    workbook = Workbook(write_only=True)
+    runs = _category_runs(sorted_rows)
+
+    def add_sheet(title, start, end):
+        sheet = workbook.create_sheet(title)
+        for column, width in COLUMN_WIDTHS.items():
+            sheet.column_dimensions[column].width = width
+        sheet.append(COLUMNS)
+        for index in range(start, end):
+            row = sorted_rows[index]
+            sheet.append([row.get(column) for column in COLUMNS])
+
+    # Sheet รวม
+    add_sheet('รวมทั้งหมด', 0, len(sorted_rows))
+
+    # Sheet แยก (ช่วงของแต่ละประเภทใน list ที่เรียงแล้ว)
+    counts = {}
+    for category, sheet_name in categories:
+        start, end = runs.get(category, (0, 0))
+        counts[category] = end - start
+        if end > start:
+            add_sheet(sheet_title(sheet_name), start, end)
+
+    if summary is not None:
+        sheet = workbook.create_sheet(SUMMARY_SHEET)
+        for column, width in SUMMARY_COLUMN_WIDTHS.items():
+            sheet.column_dimensions[column].width = width
+        sheet.append(list(SUMMARY_HEADERS.values()))
+        for row in summary_rows(summary):
+            sheet.append([row.get(field) for field in SUMMARY_HEADERS])
+
+    workbook.save(path)
+    return counts
+
+
+def read_xlsx_rows(path, sheet='รวมทั้งหมด'):
+    """อ่านแถวจาก sheet รวมของไฟล์ Excel ที่ write_xlsx เขียน (รวมถึงไฟล์รุ่นก่อนที่มีคอลัมน์น้อยกว่า)"""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet in workbook.sheetnames else workbook.worksheets[0]
+        values = worksheet.iter_rows(values_only=True)
+        header = next(values, None) or ()
+        rows = []
+        for record in values:
+            row = {name: value for name, value in zip(header, record) if name}
+            row[TUITION_COLUMN] = int(row.get(TUITION_COLUMN) or 0)
+            rows.append(row)
+        return rows
+    finally:
+        workbook.close()
+
+
+def load_rows(path):
+    """อ่านแถวจากไฟล์ Excel ที่ save_to_excel เขียน หรือไฟล์ sink (.jsonl/.csv/.sqlite/.parquet)"""
+    if path.lower().endswith('.xlsx'):
+        return read_xlsx_rows(path)
+    return read_rows(path)
+
+
+def write_csv(sorted_rows, path):
+    """เขียน CSV (utf-8 มี BOM เพื่อให้ Excel เปิดภาษาไทยได้)"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(sorted_rows)
+
+
+def write_parquet(sorted_rows, path):
+    """เขียน Parquet ผ่าน ParquetSink (ต้องติดตั้ง pyarrow)"""
+    if os.path.exists(path):
+        os.remove(path)
+    sink = open_sink(path, flush_every=50000)
+    for row in sorted_rows:
+        sink.write(row)
+    sink.close()
+
+
+def export_rows(rows, filename, formats=('xlsx',), categories=None, summary=None):
+    """ส่งออกแถวผลลัพธ์เป็นไฟล์ตามรูปแบบที่เลือก คืนค่า (แถวที่เรียงแล้ว, {รูปแบบ: ไฟล์}, จำนวนต่อประเภท)
+
+    categories: รายการ (ประเภท, ชื่อ sheet) เช่นจาก search_config.category_sheets (None = ทุกประเภทในแถว)
+    summary: ผลของ report.build_report ถ้าให้มา จะเขียน <filename>_summary.json
+             เพิ่ม sheet สรุปใน xlsx และเขียน <filename>_summary.csv เมื่อส่งออก csv
+    """
+    for fmt in formats:
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"ไม่รู้จักรูปแบบไฟล์: {fmt} (รองรับ {', '.join(EXPORT_FORMATS)})")
+    sorted_rows = sort_rows(rows, categories)
+    paths = {}
+    counts = {}
+    for fmt in formats:
+        path = f"{filename}.{fmt}"
+        if fmt == 'xlsx':
+            counts = write_xlsx(sorted_rows, path, categories, summary)
+        elif fmt == 'csv':
+            write_csv(sorted_rows, path)
+        else:
+            write_parquet(sorted_rows, path)
+        paths[fmt] = path
+    if summary is not None:
+        paths['summary_json'] = f"{filename}_summary.json"
+        write_report_json(summary, paths['summary_json'])
+        if 'csv' in formats:
+            paths['summary_csv'] = f"{filename}_summary.csv"
+            write_report_csv(summary, paths['summary_csv'])
+    return sorted_rows, paths, counts
+
+
+def main(argv=None):
+    from report import build_report
+    from search_config import category_sheets, load_search_terms
+
+    parser = argparse.ArgumentParser(description='ส่งออกไฟล์ผลลัพธ์เป็น Excel/CSV/Parquet พร้อมสรุปสถิติ')
+    parser.add_argument('source', help='ไฟล์ผลลัพธ์ (.jsonl/.csv/.sqlite/.parquet) หรือไฟล์ Excel ที่ส่งออก')
+    parser.add_argument('--formats', default='xlsx', help=f"คั่นด้วยจุลภาค ({', '.join(EXPORT_FORMATS)})")
+    parser.add_argument('--output', default=None,
+                        help='ชื่อไฟล์ (ไม่รวมนามสกุล) ค่าเริ่มต้น TCAS_วิศวกรรม_แยกประเภท_<เวลา>')
+    parser.add_argument('--search-config', default=None,
+                        help='ส่งออกเฉพาะประเภทใน search config และตั้งชื่อ sheet ตามนั้น (ค่าเริ่มต้น = ทุกประเภทในไฟล์)')
+    parser.add_argument('--no-summary', action='store_true', help='ไม่เพิ่มสรุปสถิติ')
+    args = parser.parse_args(argv)
+
+    rows = load_rows(args.source)
+    if not rows:
+        print(f"❌ ไม่มีข้อมูลใน {args.source}")
+        return
+    categories = category_sheets(load_search_terms(args.search_config)) if args.search_config else None
+    filename = args.output or f"TCAS_วิศวกรรม_แยกประเภท_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    formats = [f.strip() for f in args.formats.split(',') if f.strip()]
+    summary = None if args.no_summary else build_report(rows)
+    sorted_rows, paths, _ = export_rows(rows, filename, formats=formats, categories=categories, summary=summary)
+    print(f"📄 {len(sorted_rows):,} หลักสูตรจาก {args.source}")
+    for path in paths.values():
+        print(f"💾 บันทึกเรียบร้อย: {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+import argparse
+import json
+import os
+import tarfile
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+
+from sinks import open_sink
+from metrics import NullMetrics
+
+# นามสกุลไฟล์ที่อ่านได้: ข้อความล้วน, HTML ที่บันทึกไว้, หรือ JSON ที่มีข้อมูลหลักสูตร
+PAGE_EXTENSIONS = ('.txt', '.html', '.htm', '.json')
+
+_worker_scraper = None
+
+
+def _init_worker():
+    """สร้าง scraper หนึ่งตัวต่อ process (แพทเทิร์น compile ไว้แล้วที่ระดับ class)"""
+    from sc import TCASSimpleScraper
+
+    global _worker_scraper
+    _worker_scraper = TCASSimpleScraper(metrics=NullMetrics())
+
+
+def _extract_batch(batch):
+    """แปลงข้อความหลายหน้าเป็นแถวข้อมูล (ทำงานใน worker process)"""
+    from http_fetch import html_to_text
+
+    rows = []
+    for program_info, content, kind in batch:
+        text = html_to_text(content) if kind == 'html' else content
+        rows.append(_worker_scraper.build_program_row(program_info, text))
+    return rows
+
+
+def _program_from_name(name, source):
+    """ข้อมูลหลักสูตรจากชื่อไฟล์: ชื่อไฟล์เป็นชื่อหลักสูตร ชื่อโฟลเดอร์เป็นประเภทหลักสูตร"""
+    stem = os.path.splitext(os.path.basename(name))[0]
+    folder = os.path.basename(os.path.dirname(name))
+    return {'url': f"{source}:{name}", 'title': stem, 'search_term': folder}
+
+
+def _parse_file(name, raw, source):
+    """แปลงไฟล์หนึ่งไฟล์เป็น (program_info, content, kind)"""
+    content = raw.decode('utf-8', errors='replace')
+    extension = os.path.splitext(name)[1].lower()
+    if extension == '.json':
+        # {"program": {"url", "title", "search_term"}, "text": "..."} หรือ {"url", ..., "text"}
+        data = json.loads(content)
+        program_info = data.get('program') or {k: data.get(k, '') for k in ('url', 'title', 'search_term')}
+        return program_info, data.get('text', ''), 'text'
+    kind = 'html' if extension in ('.html', '.htm') else 'text'
+    return _program_from_name(name, source), content, kind
+
+
+def iter_page_texts(path):
+    """วนอ่านหน้าที่บันทึกไว้จากไดเรกทอรี, zip, tar หรือไฟล์ cache (SQLite) ทีละหน้า"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"ไม่พบไฟล์หรือไดเรกทอรี: {path}")
+    source = os.path.basename(path.rstrip('/'))
+
+    if os.path.isdir(path):
+        for root, _, files in sorted(os.walk(path)):
+            for filename in sorted(files):
+                if filename.lower().endswith(PAGE_EXTENSIONS):
+                    full_path = os.path.join(root, filename)
+                    with open(full_path, 'rb') as f:
+                        yield _parse_file(os.path.relpath(full_path, path), f.read(), source)
+
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.lower().endswith(PAGE_EXTENSIONS):
+                    yield _parse_file(name, archive.read(name), source)
+
+    elif tarfile.is_tarfile(path):
+        with tarfile.open(path) as archive:
+            for member in archive:
+                if member.isfile() and member.name.lower().endswith(PAGE_EXTENSIONS):
+                    yield _parse_file(member.name, archive.extractfile(member).read(), source)
+
+    else:
+        yield from _iter_cache_pages(path)
+
+
+def _iter_cache_pages(path):
+    """อ่านหน้าหลักสูตรจาก PageCache พร้อมชื่อและประเภทจากผลการค้นหาที่ cache ไว้"""
+    from page_cache import PageCache
+    cache = PageCache(path)
+    programs = {}
+    for _, text in cache.items('search:'):
+        for program_info in json.loads(text):
+            programs.setdefault(program_info['url'], program_info)
+
+    for url, text in cache.items('http'):
+        program_info = programs.get(url) or {'url': url, 'title': '', 'search_term': ''}
+        yield program_info, text, 'text'
+    cache.close()
+
+
+def _batched(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def extract_rows(pages, workers=None, batch_size=64):
+    """ดึงข้อมูลจากหน้าทั้งหมดด้วย process pool คืนแถวตามลำดับเดิมทีละแถว
+
+    ส่งงานเข้า pool ทีละ batch และรอไม่เกิน workers x 4 batch เพื่อไม่ให้หน่วยความจำโตตามจำนวนหน้า
+    """
+    workers = workers or os.cpu_count() or 1
+    max_in_flight = workers * 4
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = deque()
+        for batch in _batched(pages, batch_size):
+            pending.append(executor.submit(_extract_batch, batch))
+            if len(pending) >= max_in_flight:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ดึงข้อมูลหลักสูตรใหม่จากหน้าที่บันทึกไว้ (ไม่ต้องเปิด browser)')
+    parser.add_argument('inputs', nargs='+',
+                        help='ไดเรกทอรี, ไฟล์ zip/tar หรือไฟล์ cache (SQLite) ของหน้าที่บันทึกไว้')
+    parser.add_argument('--output', default=None,
+                        help='ไฟล์ผลลัพธ์ (.csv/.jsonl/.sqlite/.parquet) ค่าเริ่มต้น TCAS_extract_<เวลา>.csv')
+    parser.add_argument('--excel', action='store_true', help='บันทึกเป็น Excel ด้วย save_to_excel')
+    parser.add_argument('--workers', type=int, default=None, help='จำนวน process (ค่าเริ่มต้น = จำนวน core)')
+    parser.add_argument('--batch-size', type=int, default=64)
+    args = parser.parse_args(argv)
+    # ตรวจก่อนเริ่ม ไม่ให้ path ที่พิมพ์ผิดกลายเป็น cache ว่างที่ได้ 0 หน้า
+    missing = [path for path in args.inputs if not os.path.exists(path)]
+    if missing:
+        parser.error(f"ไม่พบไฟล์หรือไดเรกทอรี: {', '.join(missing)}")
+
+    output = args.output or f"TCAS_extract_{time.strftime('%Y%m%d_%H%M%S')}.csv"
+    start = time.perf_counter()
+    count = 0
+    rows = []
+
+    def all_pages():
+        for path in args.inputs:
+            print(f"📂 อ่าน: {path}")
+            yield from iter_page_texts(path)
+
+    sink = open_sink(output, flush_every=1000)
+    try:
+        for row in extract_rows(all_pages(), workers=args.workers, batch_size=args.batch_size):
+            sink.write(row)
+            count += 1
+            if args.excel:
+                rows.append(row)
+            if count % 1000 == 0:
+                print(f"   ... {count:,} หน้า")
+    finally:
+        sink.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"\n✅ ดึงข้อมูล {count:,} หน้าใน {elapsed:,.1f} วินาที ({count / elapsed if elapsed else 0:,.0f} หน้า/วินาที)")
+    print(f"💾 บันทึกผลลัพธ์: {output}")
+
+    if args.excel:
+        # import sc เฉพาะเมื่อบันทึก Excel (process หลักไม่ต้องใช้ sc ในการดึงข้อมูล)
+        from export import default_categories
+        from sc import TCASSimpleScraper
+
+        scraper = TCASSimpleScraper()
+        scraper.programs_data = rows
+        # sheet ตามประเภทที่พบจริง (ประเภทจากชื่อโฟลเดอร์อาจไม่อยู่ใน search config) ใช้ชื่อ sheet จาก config ถ้ามี
+        configured = dict(scraper.category_sheets)
+        scraper.category_sheets = [(category, configured.get(category, sheet_name))
+                                   for category, sheet_name in default_categories(scraper.programs_data)]
+        scraper.save_to_excel()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import argparse
+import os
+import threading
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+
+import requests
+
+
+class FixtureRequestHandler(SimpleHTTPRequestHandler):
+    """เสิร์ฟหน้าที่บันทึกไว้: /programs/<id> -> <directory>/programs/<id>.html"""
+
+    def translate_path(self, path):
+        local_path = super().translate_path(path)
+        if not os.path.exists(local_path) and os.path.exists(local_path + '.html'):
+            return local_path + '.html'
+        return local_path
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_fixture_server(directory, host='127.0.0.1', port=0):
+    """เปิด server จำลองใน thread แยก คืนค่า (server, base_url)"""
+    def handler(*args, **kwargs):
+        return FixtureRequestHandler(*args, directory=directory, **kwargs)
+
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def record_fixtures(urls, directory):
+    """บันทึก HTML ของหน้าจริงลงไดเรกทอรี ตามโครงสร้าง path ของ URL"""
+    session = requests.Session()
+    for url in urls:
+        path = url.split('://', 1)[-1]
+        path = path[path.find('/'):].strip('/') if '/' in path else 'index'
+        target = os.path.join(directory, (path or 'index') + '.html')
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        response = session.get(url, timeout=30)
+        with open(target, 'wb') as f:
+            f.write(response.content)
+        print(f"💾 {url} -> {target} ({len(response.content):,} bytes)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='server จำลองสำหรับหน้าเว็บ mytcas ที่บันทึกไว้')
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve_parser = sub.add_parser('serve', help='เสิร์ฟไดเรกทอรี fixture')
+    serve_parser.add_argument('directory')
+    serve_parser.add_argument('--port', type=int, default=8765)
+    record_parser = sub.add_parser('record', help='บันทึกหน้าเว็บจริงเป็น fixture')
+    record_parser.add_argument('directory')
+    record_parser.add_argument('urls', nargs='+')
+    args = parser.parse_args()
+
+    if args.command == 'record':
+        record_fixtures(args.urls, args.directory)
+    else:
+        server, base_url = start_fixture_server(args.directory, port=args.port)
+        print(f"🌐 เสิร์ฟ {args.directory} ที่ {base_url} (Ctrl+C เพื่อหยุด)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
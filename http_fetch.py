@@ -0,0 +1,163 @@
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+import lxml.html
+from lxml import etree
+
+# ข้อความที่ต้องมีในหน้าหลักสูตรถึงจะถือว่า HTML ที่ได้มีข้อมูลจริง (ไม่ใช่แค่โครงหน้า SPA)
+CONTENT_MARKERS = ('มหาวิทยาลัย', 'สถาบัน', 'บาท')
+
+# tag ที่ไม่ใช่ข้อความบนหน้าเว็บ
+NON_TEXT_TAGS = ('script', 'style', 'noscript', 'template', 'svg')
+
+
+class HTTPProgramFetcher:
+    """ดึงข้อความหน้าหลักสูตรผ่าน HTTP โดยตรง (ไม่ต้องเปิด browser)
+
+    ใช้ requests.Session ที่มี connection pool แบบ keep-alive
+    ถ้ากำหนด api_url_template (เช่น "https://.../api/programs/{program_id}")
+    จะดึง JSON จาก endpoint นั้นก่อน ถ้าไม่มีจะดึง HTML แล้วแปลงเป็นข้อความด้วย lxml
+    ถ้ามี cache (PageCache) จะบันทึกข้อความพร้อม ETag/Last-Modified และตรวจซ้ำแบบมีเงื่อนไข
+    """
+
+    def __init__(self, base_url="https://course.mytcas.com", api_url_template=None,
+                 pool_size=8, timeout=15, cache=None,
+                 user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'):
+        self.base_url = base_url.rstrip('/')
+        self.api_url_template = api_url_template
+        self.timeout = timeout
+        self.cache = cache
+        self._local = threading.local()
+        # session ของทุก thread เพื่อให้ close() ปิดได้ครบ (thread-local เข้าถึงข้าม thread ไม่ได้)
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        # จำนวน byte ของ body ที่ได้รับ (รวมทุก thread)
+        self.bytes_received = 0
+        self._bytes_lock = threading.Lock()
+        self.pool_size = pool_size
+        self.headers = {
+            'User-Agent': user_agent,
+            'Accept-Language': 'th-TH,th;q=0.9',
+        }
+
+    @property
+    def session(self):
+        """Session แยกต่อ thread (requests.Session ไม่ thread-safe) แต่ละตัวมี pool ของตัวเอง"""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size)
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            session.headers.update(self.headers)
+            self._local.session = session
+            with self._sessions_lock:
+                self._sessions.append(session)
+        return session
+
+    def resolve_url(self, url):
+        """แปลง URL ของเว็บจริงให้ชี้ไปที่ base_url (ใช้กับ server จำลองตอนทดสอบ)"""
+        path = url.split('://', 1)[-1]
+        path = path[path.find('/'):] if '/' in path else '/'
+        return f"{self.base_url}{path}"
+
+    def fetch_text(self, url, cached=None):
+        """คืนข้อความของหน้าหลักสูตร หรือ None ถ้าดึงไม่ได้/ไม่มีข้อมูล (ให้ใช้ browser แทน)
+
+        cached คือรายการเดิมจาก PageCache.get() ที่หมดอายุแล้ว ใช้ส่ง If-None-Match/If-Modified-Since
+        """
+        if self.api_url_template:
+            text = self._fetch_api_text(url)
+            if text:
+                if self.cache:
+                    self.cache.put(url, text)
+                return text
+
+        headers = {}
+        if cached:
+            if cached.get('etag'):
+                headers['If-None-Match'] = cached['etag']
+            if cached.get('last_modified'):
+                headers['If-Modified-Since'] = cached['last_modified']
+
+        response = self.session.get(self.resolve_url(url), headers=headers, timeout=self.timeout)
+        self._count_bytes(response)
+        if response.status_code == 304 and cached:
+            if self.cache:
+                self.cache.refresh(url)
+            return cached['text']
+        if response.status_code != 200:
+            return None
+
+        # ถ้า server ไม่ระบุ charset ให้ถือเป็น UTF-8 (requests จะเดาเป็น ISO-8859-1)
+        if 'charset' not in response.headers.get('Content-Type', '').lower():
+            response.encoding = 'utf-8'
+        text = html_to_text(response.text)
+        if not any(marker in text for marker in CONTENT_MARKERS):
+            return None
+        if self.cache:
+            self.cache.put(url, text, etag=response.headers.get('ETag'),
+                           last_modified=response.headers.get('Last-Modified'))
+        return text
+
+    def _fetch_api_text(self, url):
+        """ดึง JSON จาก API แล้วแปลงเป็นข้อความบรรทัดละค่า"""
+        program_id = url.rstrip('/').rsplit('/', 1)[-1]
+        try:
+            response = self.session.get(self.api_url_template.format(program_id=program_id),
+                                        timeout=self.timeout)
+            self._count_bytes(response)
+            if response.status_code != 200:
+                return None
+            return json_to_text(response.json())
+        except (requests.RequestException, ValueError):
+            return None
+
+    def _count_bytes(self, response):
+        with self._bytes_lock:
+            self.bytes_received += len(response.content)
+
+    def close(self):
+        """ปิด session ของทุก thread ที่เคยสร้าง"""
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for session in sessions:
+            session.close()
+        # thread ที่ใช้ fetcher ต่อหลังปิดจะได้ session ใหม่
+        self._local = threading.local()
+
+
+def html_to_text(html):
+    """แปลง HTML เป็นข้อความแบบเดียวกับ inner_text('body') (หนึ่ง text node ต่อบรรทัด)"""
+    if not html:
+        return ''
+    tree = lxml.html.fromstring(html)
+    etree.strip_elements(tree, *NON_TEXT_TAGS, with_tail=False)
+    body = tree.find('.//body')
+    root = body if body is not None else tree
+    lines = []
+    for chunk in root.itertext():
+        chunk = chunk.strip()
+        if chunk:
+            lines.append(chunk)
+    return '\n'.join(lines)
+
+
+def json_to_text(data):
+    """แปลง JSON เป็นข้อความ โดย "key: value" หนึ่งบรรทัดต่อค่า เพื่อให้ regex เดิมใช้ได้"""
+    lines = []
+
+    def walk(value, key=''):
+        if isinstance(value, dict):
+            for k, v in value.items():
+                walk(v, k)
+        elif isinstance(value, list):
+            for v in value:
+                walk(v, key)
+        elif value is not None and value != '':
+            lines.append(f"{key}: {value}" if key else str(value))
+
+    walk(data)
+    return '\n'.join(lines)
+
@@ -0,0 +1,165 @@
+import json
+import os
+
+DEFAULT_REGISTRY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'institutions.json')
+
+
+class AhoCorasick:
+    """ค้นหาหลายคำพร้อมกันในการอ่านข้อความรอบเดียว (trie + failure link)
+
+    patterns: (คำ, ค่า) ตรวจแบบไม่สนตัวพิมพ์ คำภาษาอังกฤษต้องอยู่ครบทั้งคำ (ไม่ใช่ส่วนหนึ่งของคำอื่น)
+    """
+
+    def __init__(self, patterns):
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [[]]
+        for pattern, value in patterns:
+            folded = pattern.casefold()
+            if not folded:
+                continue
+            node = 0
+            for char in folded:
+                next_node = self._goto[node].get(char)
+                if next_node is None:
+                    next_node = self._goto[node][char] = len(self._goto)
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                node = next_node
+            self._output[node].append((len(folded), value, folded.isascii()))
+
+        # failure link แบบ BFS: โหนดลึกกว่าใช้ของโหนดที่ตื้นกว่าที่คำนวณไว้แล้ว
+        queue = list(self._goto[0].values())
+        for node in queue:
+            for char, child in self._goto[node].items():
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] = self._output[child] + self._output[self._fail[child]]
+                queue.append(child)
+
+    def iter_matches(self, text):
+        """คืนค่า (start, end, value) ของทุกคำที่พบ (start/end เป็นตำแหน่งในข้อความที่ casefold แล้ว)"""
+        folded = text.casefold()
+        goto, fail, output = self._goto, self._fail, self._output
+        node = 0
+        for index, char in enumerate(folded):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for length, value, ascii_word in output[node]:
+                start = index + 1 - length
+                if ascii_word and not _word_bounded(folded, start, index + 1):
+                    continue
+                yield start, index + 1, value
+
+    def longest(self, text, accept=None):
+        """(start, end, value) ของคำที่ยาวที่สุดที่พบ (เท่ากันเลือกตัวที่พบก่อน) หรือ None"""
+        best = None
+        for start, end, value in self.iter_matches(text):
+            if (best is None or end - start > best[1] - best[0]) and (accept is None or accept(value)):
+                best = (start, end, value)
+        return best
+
+
+def _word_bounded(text, start, end):
+    before = text[start - 1] if start > 0 else ' '
+    after = text[end] if end < len(text) else ' '
+    return not (before.isascii() and before.isalnum()) and not (after.isascii() and after.isalnum())
+
+
+class University:
+    def __init__(self, id, name, aliases=(), campuses=()):
+        self.id = id
+        self.name = name
+        self.aliases = list(aliases)
+        self.campuses = list(campuses)
+
+
+class Campus:
+    def __init__(self, id, name, university_id, aliases=()):
+        self.id = id
+        self.name = name
+        self.university_id = university_id
+        self.aliases = list(aliases)
+
+
+class InstitutionRegistry:
+    """รายชื่อมหาวิทยาลัยและวิทยาเขตมาตรฐาน พร้อมรหัสคงที่ (จาก institutions.json)
+
+    resolve() แปลงชื่อที่ดึงได้จากหน้าเว็บ (สะกดต่างกันได้) เป็น University / Campus
+    ผลของข้อความดิบแต่ละคู่ถูกจำไว้ ข้อความที่ซ้ำกันหลายหมื่นแถวจึงค้นหาครั้งเดียว
+    """
+
+    def __init__(self, universities):
+        self.universities = {university.id: university for university in universities}
+        self.campuses = {campus.id: campus for university in universities for campus in university.campuses}
+        self._university_matcher = AhoCorasick(
+            (alias, university) for university in universities
+            for alias in [university.name] + university.aliases)
+        self._campus_matcher = AhoCorasick(
+            (alias, campus) for campus in self.campuses.values()
+            for alias in [campus.name] + campus.aliases)
+        self._memo = {}
+
+    @classmethod
+    def load(cls, path=None):
+        with open(path or DEFAULT_REGISTRY_PATH, encoding='utf-8') as f:
+            data = json.load(f)
+        universities = []
+        for entry in data['universities']:
+            campuses = [Campus(campus['id'], campus['name'], entry['id'], campus.get('aliases', ()))
+                        for campus in entry.get('campuses', [])]
+            universities.append(University(entry['id'], entry['name'], entry.get('aliases', ()), campuses))
+        return cls(universities)
+
+    def match_university(self, text):
+        """(University, ข้อความส่วนที่เหลือหลังตัดชื่อมหาวิทยาลัยออก) หรือ (None, text)"""
+        match = self._university_matcher.longest(text) if text else None
+        if match is None:
+            return None, text
+        start, end, university = match
+        folded = text.casefold()
+        # ไม่ให้คำในชื่อมหาวิทยาลัยเอง (เช่น "ขอนแก่น") ถูกนับเป็นวิทยาเขต
+        return university, f"{folded[:start]} {folded[end:]}"
+
+    def match_campus(self, university, *texts):
+        """วิทยาเขตของ university ที่พบในข้อความแรกที่มี (ไม่รับวิทยาเขตของมหาวิทยาลัยอื่น)"""
+        if university is None or not university.campuses:
+            return None
+        for text in texts:
+            if text:
+                match = self._campus_matcher.longest(
+                    text, accept=lambda campus: campus.university_id == university.id)
+                if match:
+                    return match[2]
+        return None
+
+    def resolve(self, university_raw, campus_raw, text=None):
+        """(University, Campus) ของชื่อที่ดึงได้ (None ถ้าไม่รู้จัก)
+
+        ถ้าชื่อมหาวิทยาลัยที่ดึงได้ไม่ตรงกับรายชื่อ และให้ text มาด้วย จะค้นหาจากข้อความทั้งหน้าแทน
+        """
+        key = (university_raw, campus_raw)
+        result = self._memo.get(key)
+        if result is None:
+            university, rest = self.match_university(university_raw)
+            result = self._memo[key] = (university, self.match_campus(university, campus_raw, rest))
+        if result[0] is None and text:
+            university, _ = self.match_university(text)
+            if university:
+                return university, self.match_campus(university, campus_raw)
+        return result
+
+
+_default_registry = None
+
+
+def default_registry():
+    """registry จาก institutions.json (โหลดครั้งเดียวต่อ process)"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = InstitutionRegistry.load()
+    return _default_registry
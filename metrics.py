@@ -0,0 +1,154 @@
+import json
+import time
+from collections import Counter
+
+
+def percentile(sorted_values, q):
+    """ค่าที่ตำแหน่ง q (0-1) ของ list ที่เรียงแล้ว (แบบ nearest-rank เหมือน readiness.report)"""
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+class _StageTimer:
+    """context manager จับเวลาหนึ่งขั้นตอน (ใช้ได้ทั้งในโค้ดปกติและ async)"""
+
+    __slots__ = ('metrics', 'stage', 'fields', 'start')
+
+    def __init__(self, metrics, stage, fields):
+        self.metrics = metrics
+        self.stage = stage
+        self.fields = fields
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed_ms = (time.perf_counter() - self.start) * 1000
+        self.metrics.record(self.stage, elapsed_ms, ok=exc_type is None, **self.fields)
+        return False
+
+
+class Metrics:
+    """เก็บเวลาที่ใช้ของแต่ละขั้นตอนและตัวนับ พร้อมเขียน log เป็น JSON หนึ่งบรรทัดต่อเหตุการณ์
+
+    log_path: ไฟล์ JSON Lines (None = ไม่เขียน log เก็บไว้ในหน่วยความจำสำหรับรายงานอย่างเดียว)
+    """
+
+    def __init__(self, log_path=None):
+        self.log_path = log_path
+        self.samples = {}
+        self.failures = Counter()
+        self.counters = Counter()
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._log = open(log_path, 'a', encoding='utf-8') if log_path else None
+
+    def timer(self, stage, **fields):
+        """with metrics.timer('detail_fetch', url=url): ..."""
+        return _StageTimer(self, stage, fields)
+
+    def record(self, stage, elapsed_ms, ok=True, **fields):
+        """บันทึกเวลาของขั้นตอน stage (ms)"""
+        self.samples.setdefault(stage, []).append(elapsed_ms)
+        if not ok:
+            self.failures[stage] += 1
+        if self._log:
+            self.log('stage', stage=stage, ms=round(elapsed_ms, 3), ok=ok, **fields)
+
+    def incr(self, counter, amount=1):
+        self.counters[counter] += amount
+
+    def event(self, event, message, counter=None, amount=1, **fields):
+        """เหตุการณ์ระหว่างทำงาน: เพิ่มตัวนับ (ถ้ามี) เขียนลง log แล้วแสดง message บนหน้าจอ
+
+        ใช้แทน incr คู่กับ print เพื่อให้ log JSON มีทุกเหตุการณ์ที่แสดงบนหน้าจอพร้อมรายละเอียด
+        """
+        if counter:
+            self.incr(counter, amount)
+        self.log(event, **fields)
+        print(message)
+
+    def log(self, event, **fields):
+        """เขียนเหตุการณ์หนึ่งบรรทัดลง log (JSON)"""
+        if self._log:
+            entry = {'ts': round(time.time(), 3), 'event': event}
+            entry.update(fields)
+            self._log.write(json.dumps(entry, ensure_ascii=False) + '\n')
+
+    def report(self):
+        """สรุปต่อขั้นตอน (count, total, p50, p95, max ms), ตัวนับ และจำนวนหลักสูตรต่อนาที"""
+        elapsed = time.perf_counter() - self._start
+        stages = {}
+        for stage, values in self.samples.items():
+            durations = sorted(values)
+            stages[stage] = {
+                'count': len(durations),
+                'failures': self.failures[stage],
+                'total_ms': round(sum(durations), 1),
+                'p50_ms': round(percentile(durations, 0.5), 2),
+                'p95_ms': round(percentile(durations, 0.95), 2),
+                'max_ms': round(durations[-1], 2),
+            }
+        programs = self.counters['programs_scraped']
+        return {
+            'started_at': round(self.started_at, 3),
+            'elapsed_s': round(elapsed, 2),
+            'programs_per_min': round(programs / elapsed * 60, 1) if elapsed else 0.0,
+            'stages': stages,
+            'counters': dict(self.counters),
+        }
+
+    def print_report(self):
+        """แสดงรายงานท้ายการทำงาน และเขียนลง log ด้วย"""
+        report = self.report()
+        self.log('report', **report)
+        print("\n" + "=" * 70)
+        print("⏱️ เวลาที่ใช้แต่ละขั้นตอน (ms)")
+        print("=" * 70)
+        print(f"   {'ขั้นตอน':<24}{'ครั้ง':>8}{'รวม':>12}{'p50':>10}{'p95':>10}{'max':>10}")
+        for stage, s in report['stages'].items():
+            failed = f"  (ล้มเหลว {s['failures']})" if s['failures'] else ""
+            print(f"   {stage:<24}{s['count']:>8,}{s['total_ms']:>12,.0f}"
+                  f"{s['p50_ms']:>10,.1f}{s['p95_ms']:>10,.1f}{s['max_ms']:>10,.1f}{failed}")
+        if report['counters']:
+            print("\n🔢 " + ", ".join(f"{name} {count:,}" for name, count in sorted(report['counters'].items())))
+        print(f"\n📈 {self.counters['programs_scraped']:,} หลักสูตรใน {report['elapsed_s']:,.1f} วินาที "
+              f"({report['programs_per_min']:,.1f} หลักสูตร/นาที)")
+        if self.log_path:
+            print(f"📝 log: {self.log_path}")
+        return report
+
+    def close(self):
+        if self._log:
+            self._log.close()
+            self._log = None
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+class NullMetrics(Metrics):
+    """Metrics ที่ไม่เก็บอะไรเลย (ใช้ใน worker process ของ extract_offline ที่ดึงหลายแสนหน้า)"""
+
+    _timer = _NullTimer()
+
+    def __init__(self):
+        super().__init__(log_path=None)
+
+    def timer(self, stage, **fields):
+        return self._timer
+
+    def record(self, stage, elapsed_ms, ok=True, **fields):
+        pass
+
+    def incr(self, counter, amount=1):
+        pass
@@ -0,0 +1,188 @@
+import sqlite3
+import threading
+import time
+
+# จำนวนเวลาใช้งาน (last_access) ที่สะสมจาก get() ก่อนเขียนลงฐานข้อมูลครั้งเดียว
+ACCESS_FLUSH_EVERY = 256
+
+
+class PageCache:
+    """cache ข้อความหน้าเว็บบนดิสก์ (SQLite) โดยใช้ URL เป็น key
+
+    - แต่ละรายการมีอายุ (TTL) ของตัวเอง
+    - เก็บ ETag / Last-Modified ไว้ตรวจสอบซ้ำกับ server แบบมีเงื่อนไข
+    - ลบรายการที่ใช้ล่าสุดนานที่สุดออกเมื่อขนาดรวมเกิน max_bytes (LRU)
+      ขนาดรวมเก็บในตาราง cache_meta (trigger อัปเดตให้) จึงถูกต้องแม้หลาย process ใช้ไฟล์เดียวกัน
+    - เวลาใช้งานจาก get() สะสมไว้แล้วเขียนเป็นชุด ไม่ commit ทุกครั้งที่อ่าน
+    - โหมด offline ใช้เฉพาะข้อมูลใน cache ไม่เชื่อมต่อเครือข่าย
+    """
+
+    def __init__(self, path='tcas_cache.sqlite', ttl=7 * 24 * 3600, max_bytes=500 * 1024 * 1024,
+                 offline=False):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.stats = {'hits': 0, 'misses': 0, 'stale': 0, 'revalidated': 0, 'stored': 0, 'evicted': 0}
+        self._lock = threading.Lock()
+        # url -> เวลาใช้งานล่าสุดที่ยังไม่ได้เขียนลงฐานข้อมูล
+        self._accessed = {}
+        # timeout เท่ากับ WorkQueue เพราะ coordinator และ worker หลาย process เขียนไฟล์เดียวกัน
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            BEGIN IMMEDIATE;
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL,
+                size INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_pages_last_access ON pages(last_access);
+            CREATE TABLE IF NOT EXISTS cache_meta (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                total_bytes INTEGER NOT NULL
+            );
+            INSERT OR IGNORE INTO cache_meta (id, total_bytes) SELECT 1, COALESCE(SUM(size), 0) FROM pages;
+            CREATE TRIGGER IF NOT EXISTS pages_size_insert AFTER INSERT ON pages BEGIN
+                UPDATE cache_meta SET total_bytes = total_bytes + NEW.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS pages_size_delete AFTER DELETE ON pages BEGIN
+                UPDATE cache_meta SET total_bytes = total_bytes - OLD.size WHERE id = 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS pages_size_update AFTER UPDATE OF size ON pages BEGIN
+                UPDATE cache_meta SET total_bytes = total_bytes + NEW.size - OLD.size WHERE id = 1;
+            END;
+            COMMIT;
+        ''')
+
+    def get(self, url):
+        """คืนรายการใน cache (dict) พร้อม key 'fresh' หรือ None ถ้าไม่มี"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT text, etag, last_modified, fetched_at, expires_at FROM pages WHERE url = ?',
+                (url,)).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+            self._accessed[url] = now
+            if len(self._accessed) >= ACCESS_FLUSH_EVERY:
+                self._flush_access_locked()
+                self._conn.commit()
+
+        entry = {
+            'url': url,
+            'text': row[0],
+            'etag': row[1],
+            'last_modified': row[2],
+            'fetched_at': row[3],
+            'expires_at': row[4],
+            'fresh': row[4] > now,
+        }
+        self.stats['hits' if entry['fresh'] else 'stale'] += 1
+        return entry
+
+    def get_text(self, url):
+        """คืนข้อความที่ยังไม่หมดอายุ (หรือข้อความใดก็ได้ในโหมด offline)"""
+        entry = self.get(url)
+        if entry and (entry['fresh'] or self.offline):
+            return entry['text']
+        return None
+
+    def put(self, url, text, etag=None, last_modified=None, ttl=None):
+        """บันทึกข้อความหน้าเว็บลง cache"""
+        now = time.time()
+        size = len(text.encode('utf-8'))
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            # upsert (ไม่ใช่ REPLACE) เพื่อให้ trigger ปรับขนาดรวมตามขนาดเดิมของรายการ
+            self._conn.execute(
+                'INSERT INTO pages (url, text, etag, last_modified, fetched_at, expires_at, last_access, size) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?) '
+                'ON CONFLICT(url) DO UPDATE SET text = excluded.text, etag = excluded.etag, '
+                'last_modified = excluded.last_modified, fetched_at = excluded.fetched_at, '
+                'expires_at = excluded.expires_at, last_access = excluded.last_access, size = excluded.size',
+                (url, text, etag, last_modified, now, expires_at, now, size))
+            self._accessed.pop(url, None)
+            self.stats['stored'] += 1
+            # เขียนเวลาใช้งานที่ค้างก่อนเลือกรายการที่จะลบ ให้ LRU เห็นการอ่านล่าสุด
+            self._flush_access_locked()
+            self._evict_locked()
+            self._conn.commit()
+
+    def refresh(self, url, ttl=None):
+        """ต่ออายุรายการเมื่อ server ตอบ 304 Not Modified"""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._conn.execute('UPDATE pages SET expires_at = ?, last_access = ? WHERE url = ?',
+                               (expires_at, now, url))
+            self._accessed.pop(url, None)
+            self._conn.commit()
+        self.stats['revalidated'] += 1
+
+    def _flush_access_locked(self):
+        """เขียนเวลาใช้งานที่สะสมจาก get() ลงฐานข้อมูลในคำสั่งเดียว (ยังไม่ commit)"""
+        if self._accessed:
+            self._conn.executemany('UPDATE pages SET last_access = ? WHERE url = ?',
+                                   [(accessed_at, url) for url, accessed_at in self._accessed.items()])
+            self._accessed.clear()
+
+    def _total_bytes_locked(self):
+        return self._conn.execute('SELECT total_bytes FROM cache_meta WHERE id = 1').fetchone()[0]
+
+    def _evict_locked(self, batch_size=256):
+        """ลบรายการที่ไม่ได้ใช้นานที่สุดจนขนาดรวม (ของทุก process) ไม่เกิน max_bytes"""
+        if not self.max_bytes:
+            return
+        total = self._total_bytes_locked()
+        while total > self.max_bytes:
+            rows = self._conn.execute('SELECT url, size FROM pages ORDER BY last_access ASC LIMIT ?',
+                                      (batch_size,)).fetchall()
+            if not rows:
+                break
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute('DELETE FROM pages WHERE url = ?', (url,))
+                total -= size
+                self.stats['evicted'] += 1
+
+    def total_bytes(self):
+        """ขนาดรวมของข้อความใน cache (byte)"""
+        with self._lock:
+            return self._total_bytes_locked()
+
+    def urls(self, prefix=''):
+        """รายการ URL ทั้งหมดใน cache (ใช้ดึงข้อความกลับมาประมวลผลใหม่)"""
+        with self._lock:
+            rows = self._conn.execute('SELECT url FROM pages WHERE url LIKE ? ORDER BY url',
+                                      (prefix + '%',)).fetchall()
+        return [row[0] for row in rows]
+
+    def items(self, prefix=''):
+        """วนอ่าน (url, text) ทุกรายการโดยไม่แตะเวลาใช้งาน (สำหรับประมวลผลแบบ offline)"""
+        # ใช้ connection แยกเพื่ออ่านทีละแถว ไม่ต้องโหลดทั้งหมดเข้าหน่วยความจำ
+        conn = sqlite3.connect(self.path)
+        try:
+            yield from conn.execute('SELECT url, text FROM pages WHERE url LIKE ? ORDER BY url',
+                                    (prefix + '%',))
+        finally:
+            conn.close()
+
+    def close(self):
+        with self._lock:
+            self._flush_access_locked()
+            self._conn.commit()
+            self._conn.close()
+
+    def print_stats(self):
+        s = self.stats
+        print(f"\n🗄️ Cache: hit {s['hits']}, หมดอายุ {s['stale']}, ไม่มี {s['misses']}, "
+              f"ตรวจซ้ำ (304) {s['revalidated']}, บันทึก {s['stored']}, ลบ (LRU) {s['evicted']} "
+              f"- ขนาด {self.total_bytes() / 1024 / 1024:,.1f} MB")
@@ -0,0 +1,118 @@
+import time
+from collections import deque
+
+# JavaScript สำหรับรอให้ DOM หยุดเปลี่ยนแปลงครบ quietMs (คืนค่า false ถ้าหมดเวลา)
+DOM_QUIET_SCRIPT = """
+([quietMs, timeoutMs]) => new Promise(resolve => {
+    let timer = null;
+    let hardTimer = null;
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(() => done(true), quietMs);
+    });
+    const done = (quiet) => {
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(hardTimer);
+        resolve(quiet);
+    };
+    observer.observe(document, {childList: true, subtree: true, characterData: true, attributes: true});
+    timer = setTimeout(() => done(true), quietMs);
+    hardTimer = setTimeout(() => done(false), timeoutMs);
+})
+"""
+
+
+class PageReadiness:
+    """รอให้หน้าเว็บพร้อมด้วยเงื่อนไขจริง แทนการรอเวลาคงที่ พร้อมจับเวลาแต่ละการรอ"""
+
+    def __init__(self, min_timeout=1500, max_timeout=15000, factor=3.0, history=20):
+        # timeout ปรับตามเวลาที่เคยใช้จริง: factor x ค่าสูงสุดล่าสุด แต่อยู่ในช่วง min-max (ms)
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.factor = factor
+        self.history = history
+        self.stats = {}
+
+    def _entry(self, name):
+        if name not in self.stats:
+            self.stats[name] = {
+                'count': 0,
+                'timeouts': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'recent': deque(maxlen=self.history),
+                'all': [],
+            }
+        return self.stats[name]
+
+    def timeout_for(self, name):
+        """คำนวณ timeout (ms) ของการรอชื่อนี้จากประวัติ"""
+        recent = self._entry(name)['recent']
+        if not recent:
+            return self.max_timeout
+        timeout = max(recent) * self.factor
+        return int(min(self.max_timeout, max(self.min_timeout, timeout)))
+
+    def _record(self, name, elapsed_ms, ok):
+        entry = self._entry(name)
+        entry['count'] += 1
+        entry['total_ms'] += elapsed_ms
+        entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+        entry['all'].append(elapsed_ms)
+        if ok:
+            # นับเฉพาะการรอที่สำเร็จ เพื่อไม่ให้ timeout ดัน timeout รอบถัดไปให้สูงขึ้น
+            entry['recent'].append(elapsed_ms)
+        else:
+            entry['timeouts'] += 1
+
+    async def wait_for_selector(self, page, selector, name=None, state='attached'):
+        """รอจนกว่า selector จะปรากฏ คืนค่า element หรือ None ถ้าหมดเวลา"""
+        name = name or f"selector:{selector}"
+        start = time.perf_counter()
+        element = None
+        try:
+            element = await page.wait_for_selector(selector, state=state, timeout=self.timeout_for(name))
+        except Exception:
+            element = None
+        self._record(name, (time.perf_counter() - start) * 1000, element is not None)
+        return element
+
+    async def wait_for_dom_quiet(self, page, name='dom_quiet', quiet_ms=300):
+        """รอจนกว่า DOM จะไม่เปลี่ยนแปลงต่อเนื่อง quiet_ms"""
+        start = time.perf_counter()
+        try:
+            quiet = await page.evaluate(DOM_QUIET_SCRIPT, [quiet_ms, self.timeout_for(name)])
+        except Exception:
+            quiet = False
+        self._record(name, (time.perf_counter() - start) * 1000, bool(quiet))
+        return bool(quiet)
+
+    def report(self):
+        """สรุปเวลาที่ใช้รอแต่ละประเภท (ms)"""
+        summary = {}
+        for name, entry in self.stats.items():
+            durations = sorted(entry['all'])
+            if not durations:
+                continue
+            summary[name] = {
+                'count': entry['count'],
+                'timeouts': entry['timeouts'],
+                'total_ms': round(entry['total_ms'], 1),
+                'p50_ms': round(durations[len(durations) // 2], 1),
+                'p95_ms': round(durations[min(len(durations) - 1, int(len(durations) * 0.95))], 1),
+                'max_ms': round(entry['max_ms'], 1),
+                'next_timeout_ms': self.timeout_for(name),
+            }
+        return summary
+
+    def print_report(self):
+        """แสดงเวลาที่ใช้รอ เพื่อใช้ปรับค่า"""
+        summary = self.report()
+        if not summary:
+            return
+        print("\n⏱️ เวลาที่ใช้รอหน้าเว็บ:")
+        for name, s in summary.items():
+            print(f"   {name}: {s['count']} ครั้ง, รวม {s['total_ms']:,.0f} ms, "
+                  f"p50 {s['p50_ms']:,.0f} / p95 {s['p95_ms']:,.0f} / max {s['max_ms']:,.0f} ms, "
+                  f"timeout {s['timeouts']} ครั้ง")
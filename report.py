@@ -0,0 +1,150 @@
+import argparse
+import csv
+import json
+
+from sinks import TUITION_COLUMN
+
+UNIVERSITY_COLUMN = 'มหาวิทยาลัย'
+CAMPUS_COLUMN = 'วิทยาเขต'
+CATEGORY_COLUMN = 'ประเภทหลักสูตร'
+
+# มิติที่สรุป -> คอลัมน์ที่จัดกลุ่ม (ชื่อวิทยาเขตซ้ำกันได้ข้ามมหาวิทยาลัย จึงจัดกลุ่มคู่กับมหาวิทยาลัย)
+DIMENSIONS = {
+    'category': [CATEGORY_COLUMN],
+    'university': [UNIVERSITY_COLUMN],
+    'campus': [UNIVERSITY_COLUMN, CAMPUS_COLUMN],
+}
+PERCENTILES = {'p25': 0.25, 'median': 0.5, 'p75': 0.75, 'p90': 0.9}
+
+# หัวตารางของสรุปในไฟล์ CSV และ sheet สรุป
+SUMMARY_HEADERS = {
+    'dimension': 'มิติ',
+    'group': 'กลุ่ม',
+    'count': 'จำนวนหลักสูตร',
+    'with_tuition': 'มีค่าใช้จ่าย',
+    'coverage': 'สัดส่วนที่มีค่าใช้จ่าย',
+    'min': 'ต่ำสุด',
+    'max': 'สูงสุด',
+    'mean': 'เฉลี่ย',
+    'median': 'มัธยฐาน',
+    'p25': 'P25',
+    'p75': 'P75',
+    'p90': 'P90',
+}
+DIMENSION_NAMES = {
+    'overall': 'ทั้งหมด',
+    'category': 'ประเภทหลักสูตร',
+    'university': 'มหาวิทยาลัย',
+    'campus': 'วิทยาเขต',
+}
+
+
+def _number(value):
+    """ค่าสถิติเป็น int (None ถ้าไม่มีหลักสูตรที่มีค่าใช้จ่ายในกลุ่ม)"""
+    return None if value != value or value is None else int(round(value))
+
+
+def _stats(count, with_tuition, low, high, mean, quantiles):
+    count, with_tuition = int(count), int(with_tuition)
+    return {
+        'count': count,
+        'with_tuition': with_tuition,
+        'coverage': round(with_tuition / count, 4) if count else 0.0,
+        'min': _number(low),
+        'max': _number(high),
+        'mean': _number(mean),
+        **{name: _number(quantiles[name]) for name in PERCENTILES},
+    }
+
+
+def build_report(rows):
+    """สถิติค่าใช้จ่ายทั้งหมด และแยกตามประเภท มหาวิทยาลัย วิทยาเขต
+
+    สร้าง DataFrame ครั้งเดียว แต่ละมิติคำนวณทุกสถิติด้วย groupby รอบเดียว (ไม่กรองข้อมูลซ้ำต่อกลุ่ม)
+    ค่าใช้จ่าย 0 (ไม่พบข้อมูล) นับในจำนวนหลักสูตร แต่ไม่นับในสถิติค่าใช้จ่าย
+    กลุ่มเรียงตามจำนวนหลักสูตรจากมากไปน้อย
+    """
+    import pandas as pd
+
+    frame = pd.DataFrame({
+        column: [row.get(column) or '' for row in rows]
+        for column in (CATEGORY_COLUMN, UNIVERSITY_COLUMN, CAMPUS_COLUMN)
+    })
+    tuition = pd.Series([int(row.get(TUITION_COLUMN) or 0) for row in rows], dtype='int64')
+    # NaN = ไม่มีข้อมูลค่าใช้จ่าย (count/min/max/mean/quantile ของ pandas ข้าม NaN)
+    frame['tuition'] = tuition.where(tuition > 0)
+
+    valid = frame['tuition']
+    report = {
+        'overall': _stats(len(frame), valid.count(), valid.min(), valid.max(), valid.mean(),
+                          {name: valid.quantile(q) for name, q in PERCENTILES.items()}),
+        'groups': {},
+    }
+    for dimension, columns in DIMENSIONS.items():
+        groups = []
+        if len(frame):
+            grouped = frame.groupby(columns, sort=False)['tuition']
+            table = grouped.agg(['size', 'count', 'min', 'max', 'mean'])
+            table = table.join(grouped.quantile(list(PERCENTILES.values())).unstack()
+                               .rename(columns={q: name for name, q in PERCENTILES.items()}))
+            table = table.sort_values('size', ascending=False, kind='stable')
+            for key, values in zip(table.index, table.itertuples(index=False)):
+                values = values._asdict()
+                entry = dict(zip(columns, key if isinstance(key, tuple) else (key,)))
+                entry.update(_stats(values['size'], values['count'], values['min'], values['max'],
+                                    values['mean'], values))
+                groups.append(entry)
+        report['groups'][dimension] = groups
+    return report
+
+
+def summary_rows(report):
+    """สรุปเป็นตารางเดียว (หนึ่งแถวต่อกลุ่ม คีย์ตาม SUMMARY_HEADERS) สำหรับ CSV และ sheet สรุป"""
+    rows = [dict(report['overall'], dimension=DIMENSION_NAMES['overall'], group='')]
+    for dimension, groups in report['groups'].items():
+        for entry in groups:
+            group = ' / '.join(entry[column] or '-' for column in DIMENSIONS[dimension])
+            rows.append(dict(entry, dimension=DIMENSION_NAMES[dimension], group=group))
+    return rows
+
+
+def write_report_json(report, path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+
+def write_report_csv(report, path):
+    """เขียนสรุปเป็น CSV (utf-8 มี BOM เพื่อให้ Excel เปิดภาษาไทยได้)"""
+    with open(path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(SUMMARY_HEADERS.values())
+        for row in summary_rows(report):
+            writer.writerow([row.get(field) for field in SUMMARY_HEADERS])
+
+
+def main(argv=None):
+    from export import load_rows
+
+    parser = argparse.ArgumentParser(description='สรุปสถิติค่าใช้จ่ายจากไฟล์ผลลัพธ์')
+    parser.add_argument('source', help='ไฟล์ผลลัพธ์ (.jsonl/.csv/.sqlite/.parquet) หรือไฟล์ Excel ที่ส่งออก')
+    parser.add_argument('--json', default=None, help='บันทึกสรุปเป็น JSON (- = แสดงผล)')
+    parser.add_argument('--csv', default=None, help='บันทึกสรุปเป็น CSV')
+    args = parser.parse_args(argv)
+
+    report = build_report(load_rows(args.source))
+    if args.json == '-':
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    elif args.json:
+        write_report_json(report, args.json)
+        print(f"💾 {args.json}")
+    if args.csv:
+        write_report_csv(report, args.csv)
+        print(f"💾 {args.csv}")
+    if not args.json and not args.csv:
+        for row in summary_rows(report):
+            amount = f"{row['min']:,} - {row['max']:,}  เฉลี่ย {row['mean']:,}" if row['with_tuition'] else '-'
+            print(f"   {row['dimension']:<15} {row['group'][:45]:<45} {row['count']:>6} หลักสูตร  {amount}")
+
+
+if __name__ == "__main__":
+    main()
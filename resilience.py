@@ -0,0 +1,169 @@
+import asyncio
+import random
+import time
+
+
+class RetryPolicy:
+    """จำนวนครั้งที่ลองใหม่และเวลารอแบบ exponential backoff พร้อม jitter
+
+    รอบที่ n รอระหว่าง d/2 ถึง d วินาที โดย d = base_delay x 2^(n-1) แต่ไม่เกิน max_delay
+    (jitter ทำให้ worker ที่ล้มพร้อมกันไม่กลับมายิงเว็บพร้อมกันอีก)
+    """
+
+    def __init__(self, max_attempts=3, base_delay=2.0, max_delay=60.0, rng=None):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._rng = rng or random.Random()
+
+    def delay(self, attempt):
+        """เวลารอ (วินาที) ก่อนลองครั้งที่ attempt + 1"""
+        ceiling = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return ceiling / 2 + self._rng.uniform(0, ceiling / 2)
+
+
+class AIMDLimiter:
+    """จำกัดจำนวนคำขอพร้อมกันต่อ host แบบ AIMD
+
+    สำเร็จและเร็ว: เพิ่มทีละ 1/limit (ประมาณ +1 ต่อรอบที่ทุกช่องสำเร็จ)
+    ผิดพลาดหรือช้ากว่า latency_factor x ค่าเฉลี่ย: ลดลงเหลือ limit x decrease (ไม่บ่อยกว่า cooldown วินาที)
+    ยังไม่ตัดสินว่าช้าจนกว่าจะมีคำขอที่สำเร็จครบ min_samples ครั้ง (ช่วงเริ่มต้นเวลาแกว่งมาก)
+    ใช้ด้วย async with limiter: ... แล้วเรียก record() ก่อนออกจากบล็อก
+    """
+
+    def __init__(self, max_limit, min_limit=1, decrease=0.5, latency_factor=3.0, cooldown=1.0, min_samples=10):
+        self.max_limit = max(min_limit, max_limit)
+        self.min_limit = min_limit
+        self.decrease = decrease
+        self.latency_factor = latency_factor
+        self.cooldown = cooldown
+        self.min_samples = min_samples
+        self.samples = 0
+        self.limit = float(self.max_limit)
+        self.in_flight = 0
+        self.average_ms = None
+        self.decreases = 0
+        self._last_decrease = 0.0
+        self._condition = asyncio.Condition()
+
+    async def __aenter__(self):
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.limit))
+            self.in_flight += 1
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        async with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+        return False
+
+    def record(self, elapsed_ms, ok):
+        """ปรับ limit ตามผลของคำขอหนึ่งครั้ง คืนค่า True ถ้าลด limit"""
+        slow = ok and self.samples >= self.min_samples and elapsed_ms > self.average_ms * self.latency_factor
+        if ok:
+            self.samples += 1
+            # ค่าเฉลี่ยแบบ EWMA ของคำขอที่สำเร็จ
+            self.average_ms = elapsed_ms if self.average_ms is None else \
+                0.9 * self.average_ms + 0.1 * elapsed_ms
+        if ok and not slow:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            return False
+        now = time.monotonic()
+        if now - self._last_decrease < self.cooldown:
+            return False
+        self._last_decrease = now
+        self.limit = max(self.min_limit, self.limit * self.decrease)
+        self.decreases += 1
+        return True
+
+
+class _BreakerPermit:
+    """สิทธิ์ส่งคำขอหนึ่งครั้งจาก CircuitBreaker.wait() ใช้ด้วย with
+
+    ถ้าเป็นคำขอทดลอง (half_open) แล้วออกจากบล็อกโดยไม่ได้บันทึกผล (ถูกยกเลิก หรือผิดพลาดแบบที่ไม่นับ)
+    จะคืน breaker เป็น open ทันที ให้ผู้เรียกรายอื่นทดลองแทน ไม่ค้างรอตลอดไป
+    """
+
+    __slots__ = ('breaker', 'probe')
+
+    def __init__(self, breaker, probe):
+        self.breaker = breaker
+        self.probe = probe
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.probe and self.breaker._probe is self:
+            self.breaker._release_probe()
+        return False
+
+
+class CircuitBreaker:
+    """หยุดการดึงทั้งหมดชั่วคราวเมื่อผิดพลาดติดกันหลายครั้ง
+
+    closed: ทำงานปกติ / open: ทุกคำขอรอ cooldown วินาที /
+    half_open: ปล่อยคำขอทดลองหนึ่งคำขอ สำเร็จ = closed, ล้มเหลว = open อีกรอบ
+    ใช้ด้วย with await breaker.wait(): ... แล้วเรียก record_success/record_failure ภายในบล็อก
+    """
+
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = 'closed'
+        self.failures = 0
+        self.trips = 0
+        self.opened_until = 0.0
+        self._changed = asyncio.Event()
+        self._probe = None
+        self._pass = _BreakerPermit(self, False)
+
+    def _notify(self):
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def wait(self):
+        """รอจนกว่าจะส่งคำขอได้ (คืนทันทีถ้า closed) คืนค่า permit สำหรับใช้กับ with"""
+        while self.state != 'closed':
+            if self.state == 'open':
+                delay = self.opened_until - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                    continue
+                # หมดเวลาพักแล้ว ผู้เรียกรายนี้เป็นคำขอทดลอง
+                self.state = 'half_open'
+                self._probe = _BreakerPermit(self, True)
+                return self._probe
+            # half_open: รอผลของคำขอทดลอง
+            await self._changed.wait()
+        return self._pass
+
+    def _release_probe(self):
+        """คำขอทดลองจบโดยไม่มีผล: กลับเป็น open (หมดเวลาพักแล้ว) ให้ผู้ที่รออยู่ทดลองใหม่"""
+        self._probe = None
+        self.state = 'open'
+        self._notify()
+
+    def record_success(self):
+        """บันทึกคำขอที่สำเร็จ คืนค่า True ถ้า breaker กลับมาเป็น closed (ให้ผู้เรียกแจ้งเหตุการณ์)"""
+        self.failures = 0
+        self._probe = None
+        if self.state == 'closed':
+            return False
+        self.state = 'closed'
+        self._notify()
+        return True
+
+    def record_failure(self):
+        """บันทึกข้อผิดพลาดชั่วคราว คืนค่า True ถ้า breaker เปิด (พักการดึง cooldown วินาที)"""
+        self.failures += 1
+        self._probe = None
+        if not (self.state == 'half_open' or
+                (self.state == 'closed' and self.failures >= self.failure_threshold)):
+            return False
+        self.state = 'open'
+        self.trips += 1
+        self.opened_until = time.monotonic() + self.cooldown
+        self._notify()
+        return True
@@ -1,350 +1,827 @@
 import asyncio
-from playwright.async_api import async_playwright
-import pandas as pd
 import re
 from datetime import datetime
 import time
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+from urllib.parse import urlsplit
+from readiness import PageReadiness
+from page_cache import PageCache
+from crawl_state import CrawlState, content_hash
+from sinks import open_sink, read_rows
+from checkpoint import CrawlCheckpoint
+from browser_session import BrowserSession
+from metrics import Metrics
+from resilience import RetryPolicy, AIMDLimiter, CircuitBreaker
+from export import export_rows, EXPORT_FORMATS
+from report import build_report
+from search_config import load_search_terms, category_sheets, category_emojis, DEFAULT_EMOJI
+from selector_cache import SelectorCache, layout_fingerprint
+from work_queue import WorkQueue
+from institutions import default_registry
+from tuition_history import TuitionHistory
+
+class RateLimiter:
+    """จำกัดอัตราการเข้าหน้าเว็บรวมทุก worker (ไม่ยิงเว็บถี่เกินไป)"""
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self._lock = asyncio.Lock()
+        self._next_time = 0.0
+
+    async def wait(self):
+        """รอจนกว่าจะถึงคิวของคำขอถัดไป"""
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_time - now
+            if delay > 0:
+                await asyncio.sleep(delay)
+                now = time.monotonic()
+            self._next_time = now + self.min_interval
+
+# JavaScript สำหรับดึงลิงก์หลักสูตรทั้งหมดในหน้าเดียวด้วย evaluate ครั้งเดียว
+LINK_HARVEST_SCRIPT = """
+() => Array.from(document.querySelectorAll('a[href*="/programs/"]'),
+                 a => [a.getAttribute('href'), a.innerText])
+"""
+
+# เลื่อนไปล่างสุดของหน้า คืนค่า true ถ้าเลื่อนได้จริง (หน้ายาวขึ้นหรือยังไม่ถึงล่างสุด)
+SCROLL_TO_BOTTOM_SCRIPT = """
+() => {
+    const before = window.scrollY;
+    window.scrollTo(0, document.body.scrollHeight);
+    return window.scrollY > before;
+}
+"""
+
+# กดปุ่ม/ลิงก์ "หน้าถัดไป" ของผลการค้นหา คืนค่า true ถ้าพบและกดแล้ว
+CLICK_NEXT_PAGE_SCRIPT = """
+() => {
+    const candidates = document.querySelectorAll(
+        'a[rel="next"], [aria-label*="next" i], [aria-label*="ถัดไป"], .pagination a, .pagination button');
+    const next = Array.from(candidates).find(el => {
+        const label = (el.getAttribute('aria-label') || el.innerText || '').trim().toLowerCase();
+        const disabled = el.disabled || el.getAttribute('aria-disabled') === 'true' ||
+                         String(el.className).includes('disabled');
+        const isNext = el.rel === 'next' || label.includes('ถัดไป') || label.includes('next') ||
+                       label === '›' || label === '»';
+        return isNext && !disabled;
+    });
+    if (!next) return false;
+    next.click();
+    return true;
+}
+"""
+
+# ตรวจ selector ช่องค้นหาและปุ่มค้นหาทุกตัวใน evaluate ครั้งเดียว
+# คืนค่า fingerprint ของ layout (โครงสร้างช่อง input ทั้งหมด) และ index ของ candidate ที่ใช้งานได้
+# element ที่ใช้ได้ถูกทำเครื่องหมาย data-tcas-search / data-tcas-button ไว้ให้เลือกด้วย [attr~="index"]
+SEARCH_INPUT_PROBE_SCRIPT = """
+([inputSelectors, buttonCandidates]) => {
+    for (const name of ['data-tcas-search', 'data-tcas-button']) {
+        document.querySelectorAll('[' + name + ']').forEach(el => el.removeAttribute(name));
+    }
+    const usable = el => {
+        const rect = el.getBoundingClientRect();
+        const style = window.getComputedStyle(el);
+        return rect.width > 0 && rect.height > 0 && style.visibility !== 'hidden' &&
+               style.display !== 'none' && !el.disabled && !el.readOnly;
+    };
+    const mark = (el, name, index) => {
+        const current = el.getAttribute(name);
+        el.setAttribute(name, current ? current + ' ' + index : String(index));
+    };
+    const find = (css, text) => {
+        let elements;
+        try { elements = document.querySelectorAll(css); } catch (e) { return null; }
+        return Array.from(elements).find(el =>
+            usable(el) && (!text || (el.innerText || '').includes(text))) || null;
+    };
+    const inputs = [];
+    inputSelectors.forEach((css, index) => {
+        const el = find(css, null);
+        if (el) { mark(el, 'data-tcas-search', index); inputs.push(index); }
+    });
+    const buttons = [];
+    buttonCandidates.forEach(([css, text], index) => {
+        const el = find(css, text);
+        if (el) { mark(el, 'data-tcas-button', index); buttons.push(index); }
+    });
+    const fingerprint = Array.from(document.querySelectorAll('input'), el =>
+        [el.type, el.name, el.id, el.placeholder, String(el.className)].join('|')).sort().join('\\n');
+    return {fingerprint, inputs, buttons};
+}
+"""
+
+# selector ของช่องค้นหาตามลำดับความน่าจะเป็น (input ทั่วไปเป็นตัวสุดท้าย)
+SEARCH_INPUT_SELECTORS = (
+    'input[placeholder*="ค้นหาข้อมูลหลักสูตร"]',
+    'input[placeholder*="ค้นหา"]',
+    'input[placeholder*="search"]',
+    'input[type="search"]',
+    'input.search-input',
+    'input#search',
+    'input[name="search"]',
+    'input[class*="search"]',
+    '.search-box input',
+    '#search-input',
+    'input',
+)
+
+# ปุ่ม/ลิงก์ที่ต้องกดก่อนช่องค้นหาจะปรากฏ เป็น (css, ข้อความที่ต้องมี) แทน :has-text ของ Playwright
+SEARCH_BUTTON_CANDIDATES = (
+    ('button[class*="search"]', None),
+    ('a[href*="search"]', None),
+    ('.search-btn', None),
+    ('[data-search]', None),
+    ('button', 'ค้นหา'),
+    ('a', 'ค้นหา'),
+)
+
+SEARCH_INPUT_AFTER_CLICK = 'input[type="search"], input[placeholder*="ค้นหา"]'
+
+# รอ element ใดก็ได้ในนี้ก่อนตรวจช่องค้นหา (ไม่รวม input ทั่วไปที่อาจมีอยู่แล้วในโครงหน้า)
+SEARCH_READY_SELECTOR = ', '.join(
+    list(SEARCH_INPUT_SELECTORS[:-1]) +
+    [f'{css}:has-text("{text}")' if text else css for css, text in SEARCH_BUTTON_CANDIDATES])
+
+# ข้อความค่าใช้จ่ายในหน้าหลักสูตร ใช้เป็นสัญญาณว่าเนื้อหา render แล้ว (ไม่ใช่แค่โครงหน้าของ SPA)
+PROGRAM_CONTENT_SELECTOR = ':text-matches("ค่าใช้จ่าย|ค่าเล่าเรียน|ค่าธรรมเนียมการศึกษา")'
+
+def _compile_patterns(specs):
+    """compile แพทเทิร์น (regex, คำที่ต้องมี) ทั้งหมดครั้งเดียว"""
+    return [(re.compile(pattern, re.IGNORECASE), tuple(required)) for pattern, required in specs]
+
+def is_retryable_error(error):
+    """ข้อผิดพลาดชั่วคราวของเครือข่าย/หมดเวลาที่ลองใหม่แล้วอาจสำเร็จ
+
+    ข้อผิดพลาดอื่น (เช่นแปลงข้อมูลจากหน้าไม่ได้) ลองใหม่ก็ได้ผลเดิม
+    ตรวจชนิดของ playwright/requests เฉพาะเมื่อถูก import แล้ว (ไม่ import เพิ่มเพื่อตรวจ)
+    """
+    if isinstance(error, (OSError, asyncio.TimeoutError)):
+        return True
+    requests_module = sys.modules.get('requests')
+    if requests_module and isinstance(error, requests_module.RequestException):
+        return True
+    playwright_module = sys.modules.get('playwright.async_api')
+    if playwright_module:
+        if isinstance(error, playwright_module.TimeoutError):
+            return True
+        # เครือข่ายผิดพลาดระหว่าง goto (net::ERR_CONNECTION_RESET ฯลฯ)
+        if isinstance(error, playwright_module.Error) and 'net::' in str(error):
+            return True
+    return False
+
+class _KeywordPresence:
+    """จำว่าข้อความมีคำสำคัญใดบ้าง (ตรวจคำละครั้งต่อข้อความ)
+
+    คำที่เป็นตัวอักษรอังกฤษตรวจกับข้อความที่ casefold แล้ว ให้ตรงกับ re.IGNORECASE
+    คำที่เป็น tuple หมายถึงมีคำใดคำหนึ่งก็พอ
+    """
+    def __init__(self, text):
+        self.text = text
+        self._folded = None
+        self._seen = {}
+
+    def has(self, keyword):
+        if isinstance(keyword, tuple):
+            return any(self.has(k) for k in keyword)
+        found = self._seen.get(keyword)
+        if found is None:
+            if keyword.isascii() and keyword.isalpha():
+                if self._folded is None:
+                    self._folded = self.text.casefold()
+                found = keyword in self._folded
+            else:
+                found = keyword in self.text
+            self._seen[keyword] = found
+        return found
+
+    def has_all(self, keywords):
+        return all(self.has(k) for k in keywords)
 
 class TCASSimpleScraper:
-    def __init__(self):
+    def __init__(self, concurrency=4, request_interval=0.5, fetch_mode='browser', http_base_url=None,
+                 http_api_url=None, cache=None, state=None, sink=None, checkpoint=None, search_terms=None,
+                 browser_session=None, metrics=None, retry_policy=None, circuit_breaker=None,
+                 requeue_rounds=1, selector_cache=None, work_queue=None, worker_id=None,
+                 worker_command=None, local_workers=0, queue_poll_interval=1.0, institutions=None):
         self.programs_data = []
         self.base_url = "https://course.mytcas.com"
+        # คำค้นหา เงื่อนไขกรอง และประเภทหลักสูตร (SearchTerm จาก search_terms.json)
+        self.search_terms = search_terms if search_terms is not None else load_search_terms()
+        self.category_sheets = category_sheets(self.search_terms)
+        self.category_emojis = category_emojis(self.search_terms)
+        # จำนวนหน้าเว็บที่ดึงข้อมูลพร้อมกัน และระยะห่างขั้นต่ำระหว่างคำขอ (วินาที)
+        self.concurrency = max(1, concurrency)
+        self.request_interval = request_interval
+        self.rate_limiter = None
+        # รอหน้าเว็บด้วยเงื่อนไขจริงแทนการรอเวลาคงที่
+        self.readiness = PageReadiness()
+        # cache ข้อความหน้าเว็บบนดิสก์ (PageCache) ใช้ซ้ำข้ามรอบการทำงาน
+        self.cache = cache
+        # โหมด incremental: CrawlState จำหลักสูตรจากรอบก่อน ดึงใหม่เฉพาะที่ใหม่หรือเก่าเกินไป
+        self.state = state
+        self.page_hashes = {}
+        self.delta = None
+        # URL ที่รอบนี้ใช้แถวจากรอบก่อนโดยไม่ได้ดึงใหม่ (ประวัติค่าใช้จ่ายทำเครื่องหมายแถวเหล่านี้)
+        self.carried_urls = set()
+        # sink (จาก sinks.open_sink) รับผลลัพธ์ทันทีที่แต่ละหลักสูตรดึงเสร็จ
+        self.sink = sink
+        # checkpoint (CrawlCheckpoint) บันทึกความคืบหน้าเพื่อทำงานต่อด้วย --resume
+        self.checkpoint = checkpoint
+        # browser แบบ headless ที่บล็อกรูป ฟอนต์ และโดเมนภายนอก (BrowserSession)
+        self.browser_session = browser_session or BrowserSession()
+        # เวลาที่ใช้แต่ละขั้นตอนและตัวนับ (Metrics) สำหรับ log JSON และรายงานท้ายการทำงาน
+        self.metrics = metrics or Metrics()
+        # ลองใหม่แบบ backoff, จำกัดคำขอพร้อมกันต่อ host แบบ AIMD และพักทั้งหมดเมื่อผิดพลาดติดกัน
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.host_limiters = {}
+        # หลักสูตรที่ดึงไม่สำเร็จจะถูกย้ายไปท้ายคิวเพื่อลองใหม่ได้อีกกี่รอบ
+        self.requeue_rounds = requeue_rounds
+        # วิธีหาช่องค้นหาที่เคยใช้ได้ แยกตาม layout ของหน้าเว็บ (SelectorCache)
+        self.selector_cache = selector_cache
+        # โหมดกระจายงาน (WorkQueue): coordinator ใส่หลักสูตรลงคิว แล้ว worker process แต่ละตัวยืมงานไปดึง
+        # worker_command คือคำสั่งเปิด worker บนเครื่องนี้ local_workers ตัว (0 = รอ worker จากภายนอก)
+        self.work_queue = work_queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.worker_command = worker_command
+        self.local_workers = local_workers
+        self.queue_poll_interval = queue_poll_interval
+        # รายชื่อมหาวิทยาลัย/วิทยาเขตมาตรฐาน (InstitutionRegistry) สำหรับแปลงชื่อที่ดึงได้เป็นรหัสคงที่
+        self.institutions = institutions or default_registry()
+        # โหมด 'http' ดึงหน้าหลักสูตรผ่าน HTTP ก่อน ใช้ browser เฉพาะเมื่อดึงไม่ได้
+        self.http_fetcher = None
+        if fetch_mode == 'http':
+            from http_fetch import HTTPProgramFetcher
+            self.http_fetcher = HTTPProgramFetcher(base_url=http_base_url or self.base_url,
+                                                   api_url_template=http_api_url,
+                                                   pool_size=self.concurrency, cache=cache)
 
-    async def search_and_collect_all_programs(self, page):
-        """ค้นหาและรวบรวมหลักสูตรทั้งหมด - แยกชัดเจน"""
-        all_programs = []
-        
-        # ค้นหาแยกชัดเจน
-        search_terms = [
-            {
-                'term': 'วิศวกรรม คอมพิวเตอร์',
-                'exclude_keywords': ['ปัญญาประดิษฐ์', 'AI', 'Artificial Intelligence']
-            },
-            {
-                'term': 'วิศวกรรมปัญญาประดิษฐ์',
-                'exclude_keywords': []
-            }
-        ]
-        
-        for search_config in search_terms:
-            print(f"\n🔍 ค้นหา: {search_config['term']}")
-            programs = await self._search_single_term(page, search_config)
-            all_programs.extend(programs)
-            await asyncio.sleep(2)
-        
-        # ลบรายการซ้ำ
+    async def search_and_collect_all_programs(self, context):
+        """ค้นหาทุกคำใน search_terms พร้อมกัน (หนึ่งหน้าต่อคำค้น) แล้วรวมผลโดยไม่ซ้ำ URL
+
+        context = None (โหมด offline) ใช้ผลการค้นหาจาก cache อย่างเดียว
+        """
+        if self.rate_limiter is None:
+            self.rate_limiter = RateLimiter(self.request_interval)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        
+        async def search(search_term):
+            async with semaphore:
+                self.metrics.event('search_start', f"\n🔍 ค้นหา: {search_term.term}", term=search_term.term)
+                page = await context.new_page() if context else None
+                try:
+                    with self.metrics.timer('search', term=search_term.term):
+                        return await self._search_single_term(page, search_term)
+                finally:
+                    if page:
+                        await page.close()
+        
+        results = await asyncio.gather(*(search(search_term) for search_term in self.search_terms))
+        
+        # รวมผลตามลำดับคำค้นในไฟล์ตั้งค่า URL ที่พบจากหลายคำค้นเก็บไว้ครั้งแรกครั้งเดียว
         unique_programs = []
         seen_urls = set()
         
-        for program in all_programs:
-            if program['url'] not in seen_urls:
-                unique_programs.append(program)
-                seen_urls.add(program['url'])
+        for programs in results:
+            for program in programs:
+                if program['url'] not in seen_urls:
+                    unique_programs.append(program)
+                    seen_urls.add(program['url'])
         
-        print(f"\n📊 รวมหลักสูตรทั้งหมด: {len(unique_programs)} หลักสูตร")
+        self.metrics.event('programs_collected',
+                           f"\n📊 รวมหลักสูตรทั้งหมด: {len(unique_programs)} หลักสูตร จาก {len(self.search_terms)} คำค้นหา",
+                           programs=len(unique_programs), terms=len(self.search_terms))
         return unique_programs
 
-    async def _search_single_term(self, page, search_config):
-        """ค้นหาหลักสูตรด้วยการกรองที่ชัดเจน"""
+    async def _search_single_term(self, page, search_term):
+        """ค้นหาหลักสูตรของคำค้นหนึ่งคำ (SearchTerm) ด้วยการกรองที่ชัดเจน"""
         try:
-            search_term = search_config['term']
-            exclude_keywords = search_config['exclude_keywords']
+            # ใช้ผลการค้นหาที่เก็บไว้ใน cache ถ้ายังไม่หมดอายุ
+            cache_key = f"search:{search_term.term}"
+            if self.cache:
+                cached_text = self.cache.get_text(cache_key)
+                if cached_text is not None:
+                    programs = json.loads(cached_text)
+                    self.metrics.event('search_cache_hit', f"   🗄️ ใช้ผลการค้นหาจาก cache: {len(programs)} หลักสูตร",
+                                       counter='search_cache_hits', term=search_term.term, programs=len(programs))
+                    return programs
+                if self.cache.offline:
+                    self.metrics.event('search_offline_miss', f"   ❌ ไม่มีผลการค้นหาใน cache (โหมด offline)",
+                                       counter='search_offline_misses', term=search_term.term)
+                    return []
             
-            # ไปหน้าหลัก
-            await page.goto(self.base_url, wait_until='networkidle', timeout=30000)
-            await page.wait_for_timeout(3000)
+            # ค้นหาในเว็บจริง (ลองใหม่แบบ backoff เมื่อผิดพลาด)
+            programs = await self._with_retries(self.base_url, lambda: self._run_search(page, search_term),
+                                                label=f"ค้นหา {search_term.term}")
             
-            # ลองหาช่องค้นหาหลายแบบ
-            search_input = None
-            search_selectors = [
-                'input[placeholder*="ค้นหาข้อมูลหลักสูตร"]',
-                'input[placeholder*="ค้นหา"]',
-                'input[placeholder*="search"]', 
-                'input[type="search"]',
-                'input.search-input',
-                'input#search',
-                'input[name="search"]',
-                'input[class*="search"]',
-                '.search-box input',
-                '#search-input',
-                'input'  # สุดท้ายลอง input ทั่วไป
-            ]
-            
-            for selector in search_selectors:
-                try:
-                    print(f"   🔍 ลองหา selector: {selector}")
-                    search_input = await page.wait_for_selector(selector, timeout=3000)
-                    if search_input:
-                        # ตรวจสอบว่า input นี้สามารถพิมพ์ได้หรือไม่
-                        is_visible = await search_input.is_visible()
-                        is_enabled = await search_input.is_enabled()
-                        if is_visible and is_enabled:
-                            print(f"   ✅ พบช่องค้นหา: {selector}")
-                            break
-                        else:
-                            search_input = None
-                except:
-                    continue
-            
-            if not search_input:
-                print(f"   ❌ ไม่พบช่องค้นหาที่ใช้งานได้")
-                # ลองดูหน้าเว็บและหา element ที่เป็นไปได้
-                page_content = await page.content()
-                print("   🔍 ลองตรวจสอบหน้าเว็บ...")
-                
-                # ลองคลิกปุ่มค้นหาหรือเมนูก่อน
-                search_buttons = [
-                    'button[class*="search"]',
-                    'a[href*="search"]',
-                    '.search-btn',
-                    '[data-search]',
-                    'button:has-text("ค้นหา")',
-                    'a:has-text("ค้นหา")'
-                ]
-                
-                for btn_selector in search_buttons:
-                    try:
-                        btn = await page.wait_for_selector(btn_selector, timeout=2000)
-                        if btn:
-                            await btn.click()
-                            await page.wait_for_timeout(2000)
-                            # ลองหา input อีกครั้ง
-                            search_input = await page.wait_for_selector('input[type="search"], input[placeholder*="ค้นหา"]', timeout=3000)
-                            if search_input:
-                                print(f"   ✅ พบช่องค้นหาหลังคลิกปุ่ม: {btn_selector}")
-                                break
-                    except:
-                        continue
-            
-            if not search_input:
-                print(f"   ❌ ไม่สามารถหาช่องค้นหาได้ กำลังข้าม...")
-                return []
-            
-            # พิมพ์คำค้นหา
-            await search_input.click()
-            await page.wait_for_timeout(500)
-            await page.keyboard.press('Control+a')
-            await page.keyboard.type(search_term)
-            await page.wait_for_timeout(500)
-            await page.keyboard.press('Enter')
-            
-            # รอผลการค้นหา
-            await page.wait_for_timeout(4000)
-            
-            # ดึงลิงก์ทั้งหมด
-            programs = await self._extract_filtered_program_links(page, search_term, exclude_keywords)
-            print(f"   พบ {len(programs)} หลักสูตร")
+            if self.cache and programs:
+                self.cache.put(cache_key, json.dumps(programs, ensure_ascii=False))
             
             return programs
             
         except Exception as e:
-            print(f"❌ ข้อผิดพลาดในการค้นหา {search_term}: {str(e)}")
+            self.metrics.event('search_error', f"❌ ข้อผิดพลาดในการค้นหา {search_term.term}: {str(e)}",
+                               counter='search_errors', term=search_term.term, error=str(e)[:200])
             return []
 
-    async def _extract_filtered_program_links(self, page, search_term, exclude_keywords):
-        """ดึงลิงก์หลักสูตรพร้อมกรองคำที่ไม่ต้องการ"""
+    async def _run_search(self, page, search_term):
+        """เปิดหน้าหลัก พิมพ์คำค้น แล้วดึงลิงก์หลักสูตรจากผลการค้นหา"""
+        # ไปหน้าหลัก
+        with self.metrics.timer('search_page_load', term=search_term.term):
+            await page.goto(self.base_url, wait_until='domcontentloaded', timeout=30000)
+        
+        # หาช่องค้นหา: ลองวิธีที่เคยใช้ได้กับ layout นี้ก่อน ถ้าไม่มีตรวจทุก selector ใน evaluate เดียว
+        with self.metrics.timer('search_input_discovery', term=search_term.term):
+            search_input = await self._find_search_input(page)
+        
+        if not search_input:
+            self.metrics.event('search_input_missing', f"   ❌ ไม่สามารถหาช่องค้นหาได้ กำลังข้าม...",
+                               counter='search_input_missing', term=search_term.term)
+            return []
+        
+        # พิมพ์คำค้นหา
+        await search_input.click()
+        await page.keyboard.press('Control+a')
+        await page.keyboard.type(search_term.term)
+        await page.keyboard.press('Enter')
+        
+        # รอผลการค้นหา: ลิงก์หลักสูตรปรากฏ แล้วรอให้รายการโหลดครบ
+        await self.readiness.wait_for_selector(page, 'a[href*="/programs/"]', name='search_results')
+        await self.readiness.wait_for_dom_quiet(page, name='search_results_settle')
+        
+        # ดึงลิงก์ทั้งหมด
+        programs = await self._extract_filtered_program_links(page, search_term)
+        self.metrics.event('search_done', f"   พบ {len(programs)} หลักสูตร ({search_term.term})",
+                           term=search_term.term, programs=len(programs))
+        return programs
+
+    async def _find_search_input(self, page):
+        """หาช่องค้นหาบนหน้าหลัก คืนค่า element หรือ None
+
+        ตรวจ SEARCH_INPUT_SELECTORS และ SEARCH_BUTTON_CANDIDATES ทั้งหมดด้วย evaluate ครั้งเดียว
+        แล้วเลือกตามลำดับ โดยให้ selector ที่บันทึกไว้ใน selector_cache สำหรับ layout เดียวกันมาก่อน
+        ถ้าไม่มีช่องค้นหาให้กดปุ่มค้นหาก่อนแล้วรอช่องค้นหาปรากฏ
+        ถ้าช่องค้นหาหรือปุ่มค้นหายังไม่ render ภายในเวลา จะ raise TimeoutError ให้ _with_retries ลองใหม่
+        """
+        # รอให้ช่องค้นหาหรือปุ่มค้นหา render ก่อนตรวจ แล้วให้ DOM นิ่งเพื่อให้ fingerprint ของ layout ครบ
+        if not await self.readiness.wait_for_selector(page, SEARCH_READY_SELECTOR, name='search_ready'):
+            raise TimeoutError("ช่องค้นหายังไม่ปรากฏบนหน้าหลัก")
+        await self.readiness.wait_for_dom_quiet(page, name='home')
+        probe = await page.evaluate(SEARCH_INPUT_PROBE_SCRIPT,
+                                    [list(SEARCH_INPUT_SELECTORS), [list(c) for c in SEARCH_BUTTON_CANDIDATES]])
+        key = layout_fingerprint(urlsplit(self.base_url).hostname, probe['fingerprint'])
+        cached = self.selector_cache.get(key) if self.selector_cache else None
+        
+        inputs = probe['inputs']
+        buttons = probe['buttons']
+        if cached:
+            # ย้ายวิธีที่เคยใช้ได้ไปไว้หน้าสุด (ถ้ายังใช้ได้อยู่บนหน้านี้)
+            preferred_input = SEARCH_INPUT_SELECTORS.index(cached['input']) \
+                if cached.get('input') in SEARCH_INPUT_SELECTORS else None
+            preferred_button = tuple(cached['button']) if cached.get('button') else None
+            if preferred_input in inputs:
+                inputs = [preferred_input] + [i for i in inputs if i != preferred_input]
+            elif preferred_button in SEARCH_BUTTON_CANDIDATES:
+                index = SEARCH_BUTTON_CANDIDATES.index(preferred_button)
+                if index in buttons:
+                    inputs = []
+                    buttons = [index] + [i for i in buttons if i != index]
+        
+        strategy = None
+        search_input = None
+        if inputs:
+            search_input = await page.query_selector(f'[data-tcas-search~="{inputs[0]}"]')
+            if search_input:
+                strategy = {'input': SEARCH_INPUT_SELECTORS[inputs[0]], 'button': None}
+                self.metrics.event('search_input_found', f"   ✅ พบช่องค้นหา: {strategy['input']}",
+                                   input=strategy['input'])
+        else:
+            for index in buttons:
+                try:
+                    await page.click(f'[data-tcas-button~="{index}"]', timeout=2000)
+                    search_input = await self.readiness.wait_for_selector(
+                        page, SEARCH_INPUT_AFTER_CLICK, name='search_input_after_click', state='visible')
+                except Exception:
+                    continue
+                if search_input:
+                    strategy = {'input': None, 'button': list(SEARCH_BUTTON_CANDIDATES[index])}
+                    self.metrics.event('search_input_found',
+                                       f"   ✅ พบช่องค้นหาหลังคลิกปุ่ม: {SEARCH_BUTTON_CANDIDATES[index][0]}",
+                                       button=SEARCH_BUTTON_CANDIDATES[index][0])
+                    break
+        
+        if strategy is None:
+            self.metrics.event('search_input_unusable', f"   ❌ ไม่พบช่องค้นหาที่ใช้งานได้")
+            if cached:
+                self.selector_cache.forget(key)
+            return None
+        
+        if cached and cached.get('input') == strategy['input'] and cached.get('button') == strategy['button']:
+            self.metrics.incr('selector_cache_hits')
+        else:
+            self.metrics.incr('selector_cache_misses')
+        if self.selector_cache:
+            self.selector_cache.put(key, strategy)
+        return search_input
+
+    async def _extract_filtered_program_links(self, page, search_term):
+        """ดึงลิงก์หลักสูตรพร้อมกรองตามเงื่อนไขของคำค้น"""
         programs = []
         
         try:
-            # รอให้โหลดเสร็จ
-            await page.wait_for_timeout(2000)
+            # ดึง (href, ข้อความ) ของทุกลิงก์ในครั้งเดียว รวมทุกหน้าของผลการค้นหา
+            with self.metrics.timer('link_extraction', term=search_term.term):
+                links = await self._harvest_program_links(page)
+                programs = self._filter_program_links(links, search_term)
+        except Exception as e:
+            self.metrics.event('link_extraction_error', f"❌ ข้อผิดพลาดในการดึงลิงก์: {str(e)}",
+                               counter='link_extraction_errors', term=search_term.term, error=str(e)[:200])
+        
+        return programs
+
+    async def _harvest_program_links(self, page, max_scroll_rounds=30, max_pages=20):
+        """ดึงลิงก์หลักสูตรทั้งหมดด้วย page.evaluate ครั้งเดียวต่อรอบ (ไม่เรียกทีละ element)
+
+        เลื่อนหน้าลงจนไม่มีลิงก์เพิ่ม (infinite scroll) แล้วกดหน้าถัดไปถ้ามี (pagination)
+        คืนค่า list ของ (href, text) ไม่ซ้ำกันตามลำดับที่พบ
+        """
+        links = {}
+        
+        for _ in range(max_pages):
+            page_start = len(links)
             
-            # หาลิงก์ทั้งหมดที่เป็น programs
-            links = await page.query_selector_all('a[href*="/programs/"]')
+            for scroll_round in range(max_scroll_rounds):
+                before = len(links)
+                for href, text in await page.evaluate(LINK_HARVEST_SCRIPT):
+                    if href and href not in links:
+                        links[href] = text
+                
+                # เลื่อนแล้วไม่มีลิงก์เพิ่ม หรือเลื่อนต่อไม่ได้แล้ว ถือว่าครบหน้านี้
+                if scroll_round > 0 and len(links) == before:
+                    break
+                if not await page.evaluate(SCROLL_TO_BOTTOM_SCRIPT):
+                    break
+                await self.readiness.wait_for_dom_quiet(page, name='scroll_results')
             
-            for link in links:
-                try:
-                    href = await link.get_attribute('href')
-                    text = await link.inner_text()
-                    
-                    if href and text and len(text.strip()) > 10:
-                        text_lower = text.lower()
-                        should_exclude = False
-                        
-                        # กรองสำหรับ "วิศวกรรม คอมพิวเตอร์"
-                        if search_term == "วิศวกรรม คอมพิวเตอร์":
-                            # รวมหลักสูตรทั้งหมดที่ไม่ใช่ปัญญาประดิษฐ์
-                            if any(ai_word in text_lower for ai_word in ["ปัญญาประดิษฐ์", "artificial intelligence"]):
-                                should_exclude = True
-                                print(f"      ❌ ตัดออก (AI): {text.strip()[:60]}...")
-                            else:
-                                # รวมหลักสูตรทั้งหมดที่ไม่ใช่ AI
-                                pass
-                        
-                        # กรองสำหรับ "วิศวกรรมปัญญาประดิษฐ์"  
-                        elif search_term == "วิศวกรรมปัญญาประดิษฐ์":
-                            # เอาเฉพาะที่มีคำเกี่ยวกับ AI
-                            if not any(ai_word in text_lower for ai_word in ["ปัญญาประดิษฐ์", "artificial intelligence", "ai", "intelligent"]):
-                                should_exclude = True
-                        
-                        # กรองคำที่ไม่ต้องการเพิ่มเติม
-                        for exclude_word in exclude_keywords:
-                            if exclude_word.lower() in text_lower:
-                                should_exclude = True
-                                break
-                        
-                        if not should_exclude:
-                            full_url = href if href.startswith('http') else f"{self.base_url}{href}"
-                            programs.append({
-                                'url': full_url,
-                                'title': text.strip(),
-                                'search_term': search_term
-                            })
-                            print(f"      ✅ รวม: {text.strip()[:60]}...")
-                        else:
-                            print(f"      ❌ ตัดออก: {text.strip()[:60]}...")
-                            
-                except:
-                    continue
-                    
-        except Exception as e:
-            print(f"❌ ข้อผิดพลาดในการดึงลิงก์: {str(e)}")
+            # หน้านี้ไม่มีลิงก์ใหม่ (เช่น กดหน้าถัดไปแล้วไม่เปลี่ยน) ก็หยุด
+            if len(links) == page_start and page_start > 0:
+                break
+            
+            # ไปหน้าถัดไปของผลการค้นหา (ถ้ามี)
+            if not await page.evaluate(CLICK_NEXT_PAGE_SCRIPT):
+                break
+            await self.readiness.wait_for_dom_quiet(page, name='next_results_page')
+        
+        return list(links.items())
+
+    def _filter_program_links(self, links, search_term):
+        """กรองลิงก์ (href, text) ตาม include_any / exclude_any ของคำค้น"""
+        programs = []
+        
+        for href, text in links:
+            if href and text and len(text.strip()) > 10:
+                if search_term.matches(text):
+                    full_url = href if href.startswith('http') else f"{self.base_url}{href}"
+                    programs.append({
+                        'url': full_url,
+                        'title': text.strip(),
+                        'search_term': search_term.category
+                    })
+                    self.metrics.event('link_included', f"      ✅ รวม: {text.strip()[:60]}...",
+                                       counter='links_included', term=search_term.term, url=full_url)
+                else:
+                    self.metrics.event('link_excluded', f"      ❌ ตัดออก: {text.strip()[:60]}...",
+                                       counter='links_excluded', term=search_term.term, href=href)
         
         return programs
 
     async def scrape_program_basic_info(self, page, program_info):
         """ดึงข้อมูลพื้นฐานเท่านั้น: ชื่อ มหาลัย ค่าใช้จ่าย"""
+        data, _ = await self._scrape_with_status(page, program_info)
+        return data
+
+    async def _scrape_with_status(self, page, program_info):
+        """คืนค่า (ข้อมูล, ควรลองใหม่ภายหลังหรือไม่) และจับเวลาเป็นขั้นตอน detail_fetch"""
+        start = time.perf_counter()
+        retryable = False
+        try:
+            data = await self._scrape_program_basic_info(page, program_info)
+        except Exception as e:
+            self.metrics.event('program_error', f"   ❌ ข้อผิดพลาด: {str(e)}",
+                               url=program_info['url'], error=str(e)[:200])
+            data = None
+            retryable = is_retryable_error(e)
+        self.metrics.record('detail_fetch', (time.perf_counter() - start) * 1000,
+                            ok=data is not None, url=program_info['url'])
+        self.metrics.incr('programs_scraped' if data else 'programs_failed')
+        return data, retryable
+
+    async def _scrape_program_basic_info(self, page, program_info):
         url = program_info['url']
+        self.metrics.event('program_start', f"📄 กำลังดึง: {program_info['title'][:50]}...", url=url)
         
-        try:
-            print(f"📄 กำลังดึง: {program_info['title'][:50]}...")
-            
+        page_text = None
+        cached = None
+        
+        # ใช้ข้อความจาก cache ถ้ายังไม่หมดอายุ (หรือโหมด offline)
+        if self.cache:
+            cached = self.cache.get(url)
+            if cached and (cached['fresh'] or self.cache.offline):
+                self.metrics.incr('cache_hits')
+                page_text = cached['text']
+            elif self.cache.offline:
+                self.metrics.event('program_offline_miss', f"   ❌ ไม่มีใน cache (โหมด offline)",
+                                   counter='offline_misses', url=url)
+                return None
+        
+        if not page_text:
+            page_text = await self._with_retries(url, lambda: self._fetch_page_text(page, url, cached),
+                                                 label=program_info['title'][:30])
+        
+        return self._build_program_data(program_info, page_text)
+
+    async def _fetch_page_text(self, page, url, cached):
+        """ดึงข้อความหน้าหลักสูตรจากเว็บหนึ่งครั้ง (HTTP ก่อนถ้าเปิดโหมด http แล้วจึงใช้ browser)"""
+        page_text = None
+        
+        # โหมด HTTP: ดึงหน้าโดยตรงไม่ต้อง render
+        if self.http_fetcher:
+            try:
+                with self.metrics.timer('http_fetch', url=url):
+                    page_text = await asyncio.to_thread(self.http_fetcher.fetch_text, url, cached)
+                if page_text:
+                    self.metrics.incr('http_pages')
+            except Exception as e:
+                self.metrics.event('http_fallback', f"   ⚠️ ดึงผ่าน HTTP ไม่ได้ ({str(e)}) ใช้ browser แทน",
+                                   counter='http_fallbacks', url=url, error=str(e)[:200])
+        
+        if not page_text:
             # เข้าหน้าหลักสูตร
-            await page.goto(url, wait_until='networkidle', timeout=30000)
-            await page.wait_for_timeout(2000)
+            with self.metrics.timer('page_goto', url=url):
+                await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+                # รอเนื้อหาหลักสูตรปรากฏ ถ้าไม่พบ (เช่น หลักสูตรที่ไม่มีค่าใช้จ่าย) จึงรอให้ DOM นิ่งแทน
+                if not await self.readiness.wait_for_selector(page, PROGRAM_CONTENT_SELECTOR,
+                                                              name='program_content'):
+                    await self.readiness.wait_for_dom_quiet(page, name='program_detail')
             
             # ดึงข้อความทั้งหมด
-            page_text = await page.inner_text('body')
-            
-            # สร้างข้อมูลพื้นฐาน
-            data = {
-                'ชื่อหลักสูตร': program_info['title'],
-                'มหาวิทยาลัย': '',
-                'วิทยาเขต': '',
-                'ค่าใช้จ่าย (บาท/ภาค)': 0,
-                'ค่าใช้จ่าย (ข้อความเต็ม)': '',
-                'URL': url,
-                'ประเภทหลักสูตร': program_info['search_term']
-            }
-            
-            # ดึงชื่อมหาวิทยาลัย
-            data['มหาวิทยาลัย'] = self._find_university_name(page_text)
-            
-            # ดึงวิทยาเขต
-            data['วิทยาเขต'] = self._find_campus_name(page_text)
-            
-            # ดึงค่าใช้จ่าย
-            tuition_info = self._find_tuition_cost(page_text)
-            data['ค่าใช้จ่าย (บาท/ภาค)'] = tuition_info['amount']
-            data['ค่าใช้จ่าย (ข้อความเต็ม)'] = tuition_info['text']
-            
-            # แสดงประเภทหลักสูตร
-            course_type = "💻" if "คอมพิวเตอร์" in program_info['search_term'] else "🤖"
-            
-            if data['ค่าใช้จ่าย (บาท/ภาค)'] > 0:
-                campus_info = f" ({data['วิทยาเขต']})" if data['วิทยาเขต'] and data['วิทยาเขต'] != 'ไม่ระบุ' else ""
-                print(f"   ✅ {course_type} {data['มหาวิทยาลัย'][:25]}{campus_info} - {data['ค่าใช้จ่าย (บาท/ภาค)']:,} บาท")
-                return data
-            else:
-                campus_info = f" ({data['วิทยาเขต']})" if data['วิทยาเขต'] and data['วิทยาเขต'] != 'ไม่ระบุ' else ""
-                print(f"   ⚠️ {course_type} {data['มหาวิทยาลัย'][:25]}{campus_info} - ไม่พบค่าใช้จ่าย")
-                return data  # ส่งคืนข้อมูลแม้ไม่มีค่าใช้จ่าย
+            with self.metrics.timer('inner_text', url=url):
+                page_text = await page.inner_text('body')
+            self.metrics.incr('browser_pages')
+            if self.cache:
+                self.cache.put(url, page_text)
+        
+        return page_text
+
+    def _host_limiter(self, url):
+        """AIMDLimiter ของ host ของ url (สร้างเมื่อใช้ครั้งแรก เริ่มที่ concurrency)"""
+        host = urlsplit(url).hostname or ''
+        if host not in self.host_limiters:
+            self.host_limiters[host] = AIMDLimiter(self.concurrency)
+        return self.host_limiters[host]
+
+    async def _with_retries(self, url, action, label):
+        """เรียก action() ที่เข้าเว็บจริง ผ่าน circuit breaker, AIMD ต่อ host และ rate limiter
+
+        ผิดพลาดแล้วรอแบบ exponential backoff + jitter แล้วลองใหม่ ครบจำนวนครั้งแล้ว raise ข้อผิดพลาดสุดท้าย
+        """
+        limiter = self._host_limiter(url)
+        for attempt in range(1, self.retry_policy.max_attempts + 1):
+            # permit ของ breaker: ถ้าคำขอทดลองถูกยกเลิกหรือจบโดยไม่มีผล breaker จะให้รายอื่นทดลองแทน
+            with await self.circuit_breaker.wait():
+                error = None
+                async with limiter:
+                    if self.rate_limiter:
+                        await self.rate_limiter.wait()
+                    start = time.perf_counter()
+                    try:
+                        result = await action()
+                    except Exception as e:
+                        error = e
+                    # ข้อผิดพลาดถาวร (เช่น 404 หรือแปลงหน้าไม่ได้) ไม่ได้แปลว่าเว็บมีปัญหา
+                    retryable = error is not None and is_retryable_error(error)
+                    if limiter.record((time.perf_counter() - start) * 1000, not retryable):
+                        self.metrics.event('concurrency_decrease',
+                                           f"   🐢 เว็บช้าหรือผิดพลาด ลดคำขอพร้อมกันเหลือ {int(limiter.limit)}",
+                                           counter='concurrency_decreases', url=url, limit=int(limiter.limit))
                 
-        except Exception as e:
-            print(f"   ❌ ข้อผิดพลาด: {str(e)}")
-            return None
+                if error is None:
+                    if self.circuit_breaker.record_success():
+                        self.metrics.event('breaker_closed', "   ✅ เว็บกลับมาตอบปกติ ทำงานต่อ",
+                                           counter='circuit_breaker_recoveries', url=url)
+                    return result
+                
+                self.metrics.incr('fetch_errors')
+                if not retryable:
+                    raise error
+                # นับเฉพาะข้อผิดพลาดชั่วคราว (เครือข่าย/timeout) ไม่ให้ URL เสียหลายรายการติดกันหยุดการดึงทั้งหมด
+                if self.circuit_breaker.record_failure():
+                    breaker = self.circuit_breaker
+                    self.metrics.event('breaker_open',
+                                       f"   ⛔ ผิดพลาดติดกัน {breaker.failures} ครั้ง พักการดึง {breaker.cooldown:.0f} วินาที",
+                                       counter='circuit_breaker_trips', url=url, failures=breaker.failures,
+                                       cooldown_s=breaker.cooldown, error=str(error)[:200])
+                if attempt == self.retry_policy.max_attempts:
+                    raise error
+            delay = self.retry_policy.delay(attempt)
+            self.metrics.event('retry',
+                               f"   🔁 {label}: {str(error)[:80]} - ลองใหม่ครั้งที่ {attempt + 1} ในอีก {delay:.1f} วินาที",
+                               counter='retries', url=url, attempt=attempt + 1, delay_s=round(delay, 2),
+                               error=str(error)[:200])
+            await asyncio.sleep(delay)
+
+    def build_program_row(self, program_info, page_text):
+        """สร้างแถวข้อมูลหลักสูตร (คอลัมน์ตาม COLUMNS) จากข้อความของหน้า"""
+        # สร้างข้อมูลพื้นฐาน
+        data = {
+            'ชื่อหลักสูตร': program_info['title'],
+            'มหาวิทยาลัย': '',
+            'วิทยาเขต': '',
+            'ค่าใช้จ่าย (บาท/ภาค)': 0,
+            'ค่าใช้จ่าย (ข้อความเต็ม)': '',
+            'URL': program_info['url'],
+            'ประเภทหลักสูตร': program_info['search_term'],
+            'รหัสมหาวิทยาลัย': '',
+            'รหัสวิทยาเขต': '',
+        }
+        
+        # ดึงชื่อมหาวิทยาลัย วิทยาเขต และค่าใช้จ่ายในรอบเดียว
+        fields = self.extract_program_fields(page_text)
+        # ไม่พบชื่อ = ค่าว่าง (แถวยังสร้างได้ ไม่ต้องลองใหม่)
+        data['มหาวิทยาลัย'] = fields['university'] or ''
+        data['วิทยาเขต'] = fields['campus'] or ''
+        
+        # แปลงเป็นชื่อมาตรฐานและรหัสคงที่ (ชื่อที่ไม่รู้จักคงไว้ตามที่ดึงได้)
+        with self.metrics.timer('normalize_institution'):
+            university, campus = self.institutions.resolve(data['มหาวิทยาลัย'], data['วิทยาเขต'], page_text)
+        if university:
+            data['มหาวิทยาลัย'] = university.name
+            data['รหัสมหาวิทยาลัย'] = university.id
+        if campus:
+            data['วิทยาเขต'] = campus.name
+            data['รหัสวิทยาเขต'] = campus.id
+        tuition_info = fields['tuition']
+        data['ค่าใช้จ่าย (บาท/ภาค)'] = tuition_info['amount']
+        data['ค่าใช้จ่าย (ข้อความเต็ม)'] = tuition_info['text']
+        return data
+
+    def _build_program_data(self, program_info, page_text):
+        """สร้างข้อมูลหลักสูตรจากข้อความของหน้า (ใช้ร่วมกันทุกวิธีดึงหน้า)"""
+        self.page_hashes[program_info['url']] = content_hash(page_text)
+        data = self.build_program_row(program_info, page_text)
+        
+        # แสดงประเภทหลักสูตร
+        course_type = self.category_emojis.get(program_info['search_term'], DEFAULT_EMOJI)
+        
+        campus_info = f" ({data['วิทยาเขต']})" if data['วิทยาเขต'] and data['วิทยาเขต'] != 'ไม่ระบุ' else ""
+        tuition = data['ค่าใช้จ่าย (บาท/ภาค)']
+        if tuition > 0:
+            message = f"   ✅ {course_type} {data['มหาวิทยาลัย'][:25]}{campus_info} - {tuition:,} บาท"
+        else:
+            message = f"   ⚠️ {course_type} {data['มหาวิทยาลัย'][:25]}{campus_info} - ไม่พบค่าใช้จ่าย"
+        self.metrics.event('program_parsed', message,
+                           counter='programs_with_tuition' if tuition > 0 else 'programs_without_tuition',
+                           url=program_info['url'], tuition=tuition)
+        return data  # ส่งคืนข้อมูลแม้ไม่มีค่าใช้จ่าย
+
+    # ----- แพทเทิร์นสำหรับดึงข้อมูล (compile ครั้งเดียวตอนโหลด class) -----
+    # แต่ละรายการคือ (regex, คำที่ต้องมีในข้อความ) เรียงตามลำดับความสำคัญเดิม
+    # ถ้าข้อความไม่มีคำที่ต้องมี แพทเทิร์นนั้นไม่มีทาง match จึงข้ามได้โดยผลไม่เปลี่ยน
+
+    UNIVERSITY_PATTERNS = _compile_patterns([
+        (r'มหาวิทยาลัย[^\n\r]{1,80}', ['มหาวิทยาลัย']),
+        (r'สถาบัน[^\n\r]{1,50}มหาวิทยาลัย', ['สถาบัน', 'มหาวิทยาลัย']),
+        (r'สถาบันเทคโนโลยี[^\n\r]{1,50}', ['สถาบันเทคโนโลยี']),
+        (r'จุฬาลงกรณ์มหาวิทยาลัย', ['จุฬาลงกรณ์มหาวิทยาลัย']),
+        (r'มหาวิทยาลัยเกษตรศาสตร์[^\n\r]{0,20}', ['มหาวิทยาลัยเกษตรศาสตร์']),
+        (r'มหาวิทยาลัยเทคโนโลยีพระจอมเกล้า[^\n\r]{1,50}', ['มหาวิทยาลัยเทคโนโลยีพระจอมเกล้า']),
+        (r'มหาวิทยาลัยสงขลานครินทร์[^\n\r]{0,20}', ['มหาวิทยาลัยสงขลานครินทร์']),
+        (r'มหาวิทยาลัยมหิดล[^\n\r]{0,20}', ['มหาวิทยาลัยมหิดล']),
+        (r'มหาวิทยาลัยธรรมศาสตร์[^\n\r]{0,20}', ['มหาวิทยาลัยธรรมศาสตร์']),
+        (r'มหาวิทยาลัยเชียงใหม่[^\n\r]{0,20}', ['มหาวิทยาลัยเชียงใหม่']),
+        (r'มหาวิทยาลัยขอนแก่น[^\n\r]{0,20}', ['มหาวิทยาลัยขอนแก่น']),
+    ])
 
-    def _find_university_name(self, text):
+    CAMPUS_PATTERNS = _compile_patterns([
+        # แพทเทิร์นเฉพาะสำหรับวิทยาเขต
+        (r'วิทยาเขต[^\n\r]{1,50}', ['วิทยาเขต']),
+        (r'campus[^\n\r]{1,30}', ['campus']),
+        
+        # แพทเทิร์นเฉพาะของแต่ละมหาวิทยาลัย
+        *[(f'วิทยาเขต{name}', [f'วิทยาเขต{name}']) for name in [
+            'รังสิต', 'ศาลายา', 'หาดใหญ่', 'ปัตตานี', 'สุราษฎร์ธานี', 'ภูเก็ต', 'กรุงเทพฯ',
+            'เชียงใหม่', 'ขอนแก่น', 'อุบลราชธานี', 'นครราชสีมา', 'สกลนคร', 'กำแพงแสน',
+            'จันทบุรี', 'ปราจีนบุรี', 'สระแก้ว', 'ราชบุรี', 'เพชรบุรี', 'นครปฐม', 'ลำปาง',
+            'พิษณุโลก', 'อุดรธานี', 'ยะลา', 'สงขลา', 'ตรัง', 'ชุมพร',
+        ]],
+        
+        # ชื่อเมืองหลังคำว่า "ที่ตั้ง" หรือ "สถานที่"
+        (r'ที่ตั้ง[^\n\r]*?([ก-๙]+)[^\n\r]{0,20}', ['ที่ตั้ง']),
+        (r'สถานที่[^\n\r]*?([ก-๙]+)[^\n\r]{0,20}', ['สถานที่']),
+        
+        # แพทเทิร์นทั่วไป (ต้องมี "อยู่ที่" หรือ "ณ" อย่างใดอย่างหนึ่ง)
+        (r'(ตั้งอยู่ที่|อยู่ที่|ณ\s+)([ก-๙\s]{3,30})', [('อยู่ที่', 'ณ')]),
+    ])
+
+    # ถ้าไม่เจอ ลองหาจากชื่อมหาวิทยาลัยเอง
+    UNI_CAMPUS_PATTERNS = _compile_patterns([
+        (r'มหาวิทยาลัยเทคโนโลยีพระจอมเกล้า[^\n\r]*?(พระนคร|ธนบุรี|พระนครเหนือ|เจ้าคุณทหารลาดกระบัง)',
+         ['มหาวิทยาลัยเทคโนโลยีพระจอมเกล้า']),
+        (r'มหาวิทยาลัยราชภัฏ[^\n\r]*?([ก-๙]{3,20})', ['มหาวิทยาลัยราชภัฏ']),
+        (r'มหาวิทยาลัยเทคโนโลยีราชมงคล[^\n\r]*?([ก-๙]{3,20})', ['มหาวิทยาลัยเทคโนโลยีราชมงคล']),
+    ])
+
+    CAMPUS_PREFIX_RE = re.compile(r'^(วิทยาเขต|campus|ที่ตั้ง|สถานที่|ตั้งอยู่ที่|อยู่ที่|ณ\s*)', re.IGNORECASE)
+    CAMPUS_ADMIN_WORDS_RE = re.compile(r'(จังหวัด|อำเภอ|ตำบล|แขวง|เขต)')
+
+    TUITION_PATTERNS = _compile_patterns([
+        # แพทเทิร์นที่เฉพาะเจาะจง
+        (r'ค่าใช้จ่าย[^\d]*([0-9,]+)[^\d]*บาท', ['ค่าใช้จ่าย', 'บาท']),
+        (r'อัตราค่าเล่าเรียน[^\d]*([0-9,]+)[^\d]*บาท', ['อัตราค่าเล่าเรียน', 'บาท']),
+        (r'ค่าเล่าเรียน[^\d]*([0-9,]+)[^\d]*บาท', ['ค่าเล่าเรียน', 'บาท']),
+        (r'ค่าธรรมเนียมการศึกษา[^\d]*([0-9,]+)[^\d]*บาท', ['ค่าธรรมเนียมการศึกษา', 'บาท']),
+        
+        # แพทเทิร์นตามรูปแบบในภาพ
+        (r'อัตราค่าเล่าเรียน\s*([0-9,]+)\s*บาท[^\d]*ภาค', ['อัตราค่าเล่าเรียน', 'บาท', 'ภาค']),
+        (r'([0-9,]+)\s*บาท[^\d]*ภาคการศึกษา', ['บาท', 'ภาคการศึกษา']),
+        (r'([0-9,]+)\s*บาท[^\d]*ต่อภาค', ['บาท', 'ต่อภาค']),
+        (r'([0-9,]+)\.-[^\d]*ภาค', ['.-', 'ภาค']),
+        
+        # แพทเทิร์นกว้างๆ
+        (r'([0-9,]{4,})\s*บาท', ['บาท']),  # ตัวเลข 4 หลักขึ้นไป + บาท
+        (r'([1-9][0-9]{3,5})\s*บาท', ['บาท']),  # 4-6 หลัก
+        
+        # สำหรับกรณีพิเศษ
+        (r'เรียน\s*([0-9,]+)\s*บาท', ['เรียน', 'บาท']),
+        (r'ค่า[^\d]*([0-9,]+)\s*บาท', ['ค่า', 'บาท']),
+    ])
+
+    # ถ้าไม่เจอ ลองหาจาก URL ที่มี TUITION
+    TUITION_URL_RE = re.compile(r'(https?://[^\s]+(?:tuition|fee)[^\s]*)', re.IGNORECASE)
+
+    def extract_program_fields(self, text):
+        """ดึงมหาวิทยาลัย วิทยาเขต และค่าใช้จ่ายจากข้อความในรอบเดียว
+
+        ตรวจว่ามีคำสำคัญอะไรในข้อความครั้งเดียว แล้วใช้ร่วมกันทั้งสามฟิลด์
+        ผลลัพธ์เหมือนกับเรียก _find_* แยกกันทุกประการ
+        """
+        timer = self.metrics.timer
+        with timer('keyword_scan'):
+            present = _KeywordPresence(text)
+        with timer('find_university'):
+            university = self._find_university_name(text, present)
+        with timer('find_campus'):
+            campus = self._find_campus_name(text, present)
+        with timer('find_tuition'):
+            tuition = self._find_tuition_cost(text, present)
+        return {'university': university, 'campus': campus, 'tuition': tuition}
+
+    def _find_university_name(self, text, present=None):
         """หาชื่อมหาวิทยาลัย"""
-        patterns = [
-            r'มหาวิทยาลัย[^\n\r]{1,80}',
-            r'สถาบัน[^\n\r]{1,50}มหาวิทยาลัย',
-            r'สถาบันเทคโนโลยี[^\n\r]{1,50}',
-            r'จุฬาลงกรณ์มหาวิทยาลัย',
-            r'มหาวิทยาลัยเกษตรศาสตร์[^\n\r]{0,20}',
-            r'มหาวิทยาลัยเทคโนโลยีพระจอมเกล้า[^\n\r]{1,50}',
-            r'มหาวิทยาลัยสงขลานครินทร์[^\n\r]{0,20}',
-            r'มหาวิทยาลัยมหิดล[^\n\r]{0,20}',
-            r'มหาวิทยาลัยธรรมศาสตร์[^\n\r]{0,20}',
-            r'มหาวิทยาลัยเชียงใหม่[^\n\r]{0,20}',
-            r'มหาวิทยาลัยขอนแก่น[^\n\r]{0,20}'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        present = present or _KeywordPresence(text)
+        
+        for pattern, required in self.UNIVERSITY_PATTERNS:
+            if not present.has_all(required):
+                continue
+            match = pattern.search(text)
             if match:
                 name = match.group(0).strip()
                 if len(name) < 100:
                     return name
         
-    def _find_campus_name(self, text):
+    def _find_campus_name(self, text, present=None):
         """หาชื่อวิทยาเขต"""
-        patterns = [
-            # แพทเทิร์นเฉพาะสำหรับวิทยาเขต
-            r'วิทยาเขต[^\n\r]{1,50}',
-            r'campus[^\n\r]{1,30}',
-            
-            # แพทเทิร์นเฉพาะของแต่ละมหาวิทยาลัย
-            r'วิทยาเขตรังสิต',
-            r'วิทยาเขตศาลายา', 
-            r'วิทยาเขตหาดใหญ่',
-            r'วิทยาเขตปัตตานี',
-            r'วิทยาเขตสุราษฎร์ธานี',
-            r'วิทยาเขตภูเก็ต',
-            r'วิทยาเขตกรุงเทพฯ',
-            r'วิทยาเขตเชียงใหม่',
-            r'วิทยาเขตขอนแก่น',
-            r'วิทยาเขตอุบลราชธานี',
-            r'วิทยาเขตนครราชสีมา',
-            r'วิทยาเขตสกลนคร',
-            r'วิทยาเขตกำแพงแสน',
-            r'วิทยาเขตจันทบุรี',
-            r'วิทยาเขตปราจีนบุรี',
-            r'วิทยาเขตสระแก้ว',
-            r'วิทยาเขตราชบุรี',
-            r'วิทยาเขตเพชรบุรี',
-            r'วิทยาเขตนครปฐม',
-            r'วิทยาเขตลำปาง',
-            r'วิทยาเขตพิษณุโลก',
-            r'วิทยาเขตอุดรธานี',
-            r'วิทยาเขตยะลา',
-            r'วิทยาเขตสงขลา',
-            r'วิทยาเขตตรัง',
-            r'วิทยาเขตชุมพร',
-            
-            # ชื่อเมืองหลังคำว่า "ที่ตั้ง" หรือ "สถานที่"
-            r'ที่ตั้ง[^\n\r]*?([ก-๙]+)[^\n\r]{0,20}',
-            r'สถานที่[^\n\r]*?([ก-๙]+)[^\n\r]{0,20}',
-            
-            # แพทเทิร์นทั่วไป
-            r'(ตั้งอยู่ที่|อยู่ที่|ณ\s+)([ก-๙\s]{3,30})',
-        ]
+        present = present or _KeywordPresence(text)
         
-        for pattern in patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern, required in self.CAMPUS_PATTERNS:
+            if not present.has_all(required):
+                continue
+            match = pattern.search(text)
             if match:
                 campus = match.group(0).strip()
                 # ทำความสะอาดข้อความ
-                campus = re.sub(r'^(วิทยาเขต|campus|ที่ตั้ง|สถานที่|ตั้งอยู่ที่|อยู่ที่|ณ\s*)', '', campus, flags=re.IGNORECASE)
+                campus = self.CAMPUS_PREFIX_RE.sub('', campus)
                 campus = campus.strip()
                 
                 # กรองข้อความที่เหมาะสม
                 if len(campus) > 2 and len(campus) < 50:
                     # ตัดคำที่ไม่จำเป็นออก
-                    campus = re.sub(r'(จังหวัด|อำเภอ|ตำบล|แขวง|เขต)', '', campus)
+                    campus = self.CAMPUS_ADMIN_WORDS_RE.sub('', campus)
                     campus = campus.strip()
                     if campus:
                         return campus
         
         # ถ้าไม่เจอ ลองหาจากชื่อมหาวิทยาลัยเอง
-        uni_campus_patterns = [
-            r'มหาวิทยาลัยเทคโนโลยีพระจอมเกล้า[^\n\r]*?(พระนคร|ธนบุรี|พระนครเหนือ|เจ้าคุณทหารลาดกระบัง)',
-            r'มหาวิทยาลัยราชภัฏ[^\n\r]*?([ก-๙]{3,20})',
-            r'มหาวิทยาลัยเทคโนโลยีราชมงคล[^\n\r]*?([ก-๙]{3,20})',
-        ]
-        
-        for pattern in uni_campus_patterns:
-            match = re.search(pattern, text, re.IGNORECASE)
+        for pattern, required in self.UNI_CAMPUS_PATTERNS:
+            if not present.has_all(required):
+                continue
+            match = pattern.search(text)
             if match:
                 if len(match.groups()) > 0:
                     campus = match.group(1).strip()
@@ -353,40 +830,16 @@ class TCASSimpleScraper:
         
         return 'ไม่ระบุ'
 
-    def _find_tuition_cost(self, text):
+    def _find_tuition_cost(self, text, present=None):
         """หาค่าใช้จ่าย - หลายแพทเทิร์น"""
+        present = present or _KeywordPresence(text)
         
-        # แพทเทิร์นการค้นหาค่าใช้จ่าย
-        patterns = [
-            # แพทเทิร์นที่เฉพาะเจาะจง
-            r'ค่าใช้จ่าย[^\d]*([0-9,]+)[^\d]*บาท',
-            r'อัตราค่าเล่าเรียน[^\d]*([0-9,]+)[^\d]*บาท',
-            r'ค่าเล่าเรียน[^\d]*([0-9,]+)[^\d]*บาท',
-            r'ค่าธรรมเนียมการศึกษา[^\d]*([0-9,]+)[^\d]*บาท',
-            
-            # แพทเทิร์นตามรูปแบบในภาพ
-            r'อัตราค่าเล่าเรียน\s*([0-9,]+)\s*บาท[^\d]*ภาค',
-            r'([0-9,]+)\s*บาท[^\d]*ภาคการศึกษา',
-            r'([0-9,]+)\s*บาท[^\d]*ต่อภาค',
-            r'([0-9,]+)\.-[^\d]*ภาค',
-            
-            # แพทเทิร์นกว้างๆ
-            r'([0-9,]{4,})\s*บาท',  # ตัวเลข 4 หลักขึ้นไป + บาท
-            r'([1-9][0-9]{3,5})\s*บาท',  # 4-6 หลัก
-            
-            # สำหรับกรณีพิเศษ
-            r'เรียน\s*([0-9,]+)\s*บาท',
-            r'ค่า[^\d]*([0-9,]+)\s*บาท',
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            for match in matches:
-                # ทำความสะอาดตัวเลข
-                if isinstance(match, tuple):
-                    match = match[0] if match[0] else match[1] if len(match) > 1 else ''
-                
-                clean_number = str(match).replace(',', '')
+        for pattern, required in self.TUITION_PATTERNS:
+            if not present.has_all(required):
+                continue
+            for match in pattern.finditer(text):
+                # ทำความสะอาดตัวเลข (ทุกแพทเทิร์นมีกลุ่มเดียวคือตัวเลข)
+                clean_number = match.group(1).replace(',', '')
                 if clean_number.isdigit():
                     amount = int(clean_number)
                     # กรองเฉพาะค่าที่สมเหตุสมผล
@@ -397,178 +850,672 @@ class TCASSimpleScraper:
                         }
         
         # ถ้าไม่เจอ ลองหาจาก URL ที่มี TUITION
-        url_pattern = r'(https?://[^\s]+(?:tuition|fee)[^\s]*)'
-        url_match = re.search(url_pattern, text, re.IGNORECASE)
-        if url_match:
-            return {
-                'amount': 0,
-                'text': f"ดูที่: {url_match.group(1)}"
-            }
+        if present.has_all(['http']):
+            url_match = self.TUITION_URL_RE.search(text)
+            if url_match:
+                return {
+                    'amount': 0,
+                    'text': f"ดูที่: {url_match.group(1)}"
+                }
         
         return {'amount': 0, 'text': 'ไม่ระบุ'}
 
     async def run_simple_scraping(self):
         """เรียกใช้การ scraping แบบง่าย"""
-        print("🚀 เริ่ม TCAS Simple Scraper - แยกวิศวกรรมคอมพิวเตอร์และปัญญาประดิษฐ์")
+        print(f"🚀 เริ่ม TCAS Simple Scraper - {len(self.search_terms)} คำค้นหา, {len(self.category_sheets)} ประเภทหลักสูตร")
         print("="*70)
         
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=False)
-            context = await browser.new_context(
-                locale='th-TH',
-                user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-            )
-            page = await context.new_page()
-            
-            try:
-                # ขั้นตอนที่ 1: รวบรวมลิงก์ทั้งหมด
-                all_programs = await self.search_and_collect_all_programs(page)
-                
-                if not all_programs:
-                    print("❌ ไม่พบหลักสูตรใดๆ")
-                    return
-                
-                # ขั้นตอนที่ 2: ดึงข้อมูลแต่ละหลักสูตร
-                print(f"\n📋 เริ่มดึงข้อมูล {len(all_programs)} หลักสูตร...")
+        await self._run_with_browser(self._collect_and_scrape)
+        return self.sink.count if self.sink else len(self.programs_data)
+
+    async def run_worker(self):
+        """โหมด worker: ยืมหลักสูตรจาก work_queue มาดึงจนคิวหมด แล้วส่งผลกลับเข้าคิว"""
+        print(f"👷 worker {self.worker_id} - คิว {self.work_queue.path}, {self.concurrency} หน้าพร้อมกัน")
+        print("="*70)
+        await self._run_with_browser(self._work_from_queue)
+
+    async def _run_with_browser(self, task):
+        """เรียก task(context) พร้อม browser แบบเปิดเมื่อใช้ (context = None ในโหมด offline) แล้วแสดงรายงาน"""
+        if self.cache and self.cache.offline:
+            # โหมด offline: ใช้ข้อมูลจาก cache อย่างเดียว ไม่ต้องเปิด browser
+            self.metrics.event('offline_mode', "🗄️ โหมด offline - ใช้ข้อมูลจาก cache เท่านั้น")
+            await task(None)
+        else:
+            # import playwright เมื่อดึงข้อมูลจริงเท่านั้น (คำสั่งอื่นใน tcas.py ไม่ต้องรอ import)
+            from playwright.async_api import async_playwright
+            async with async_playwright() as p:
+                # เปิด browser เมื่อต้องใช้หน้าเว็บจริงเท่านั้น (หน้าจาก cache/HTTP ไม่ต้องใช้)
+                context = self.browser_session.lazy_context(p)
                 
-                for i, program_info in enumerate(all_programs, 1):
-                    print(f"\n[{i:2d}/{len(all_programs)}]", end=" ")
-                    
-                    data = await self.scrape_program_basic_info(page, program_info)
+                try:
+                    await task(context)
+                finally:
+                    await self.browser_session.close()
+                    if self.http_fetcher:
+                        self.http_fetcher.close()
+            self.browser_session.print_report()
+            self.metrics.incr('browser_requests', self.browser_session.requests)
+            self.metrics.incr('browser_bytes', self.browser_session.bytes)
+        
+        if self.http_fetcher:
+            self.metrics.incr('http_bytes', self.http_fetcher.bytes_received)
+        self.readiness.print_report()
+        if self.cache:
+            self.cache.print_stats()
+
+    @property
+    def keep_rows(self):
+        """เก็บผลลัพธ์ไว้ในหน่วยความจำด้วยหรือไม่ (ไม่ต้องถ้ามี sink ยกเว้นโหมด incremental)"""
+        return self.sink is None or self.state is not None
+
+    async def _collect_and_scrape(self, context):
+        """ค้นหาลิงก์หลักสูตร แล้วดึงข้อมูลแต่ละหลักสูตร"""
+        # ขั้นตอนที่ 1: รวบรวมลิงก์ทั้งหมด (ทำงานต่อจาก checkpoint ไม่ต้องค้นหาใหม่)
+        if self.checkpoint and self.checkpoint.programs:
+            all_programs = self.checkpoint.programs
+            self.metrics.event('resume', f"\n⏯️ ทำงานต่อจาก checkpoint: {len(all_programs)} หลักสูตร, "
+                               f"เสร็จแล้ว {len(self.checkpoint.completed)}, "
+                               f"ไม่สำเร็จ {len(self.checkpoint.failed)}",
+                               programs=len(all_programs), completed=len(self.checkpoint.completed),
+                               failed=len(self.checkpoint.failed))
+        else:
+            all_programs = await self.search_and_collect_all_programs(context)
+            if self.checkpoint and all_programs:
+                self.checkpoint.set_frontier(all_programs)
+        
+        if not all_programs:
+            self.metrics.event('no_programs', "❌ ไม่พบหลักสูตรใดๆ")
+            return
+        
+        to_fetch = all_programs
+        # หลักสูตรที่เสร็จแล้วในรอบที่ถูกขัดจังหวะ (แถวอยู่ใน sink แล้ว)
+        resumed_urls = set()
+        if self.checkpoint:
+            resumed_urls = set(self.checkpoint.completed)
+            to_fetch = self.checkpoint.pending()
+        if self.state:
+            to_fetch = [p for p in to_fetch if self.state.needs_fetch(p['url'])]
+            self.metrics.event('incremental', f"\n♻️ โหมด incremental: ดึงใหม่ {len(to_fetch)} หลักสูตร, "
+                               f"ใช้ข้อมูลเดิม {len(all_programs) - len(to_fetch)} หลักสูตร",
+                               fetch=len(to_fetch), reuse=len(all_programs) - len(to_fetch))
+        
+        # ขั้นตอนที่ 2: ดึงข้อมูลแต่ละหลักสูตร (หลายหน้าพร้อมกัน)
+        if self.work_queue:
+            self.metrics.event('fetch_start', f"\n📋 เริ่มดึงข้อมูล {len(to_fetch)} หลักสูตร ผ่านคิว {self.work_queue.path} "
+                               f"(worker บนเครื่องนี้ {self.local_workers} ตัว)...",
+                               programs=len(to_fetch), queue=self.work_queue.path, workers=self.local_workers)
+        else:
+            self.metrics.event('fetch_start', f"\n📋 เริ่มดึงข้อมูล {len(to_fetch)} หลักสูตร ({self.concurrency} หน้าพร้อมกัน)...",
+                               programs=len(to_fetch), concurrency=self.concurrency)
+        
+        try:
+            if not to_fetch:
+                results = []
+            elif self.work_queue:
+                results = await self._scrape_programs_via_queue(to_fetch)
+            else:
+                results = await self._scrape_programs_concurrently(context, to_fetch)
+        finally:
+            if self.checkpoint:
+                self.checkpoint.finished = not self.checkpoint.failed and not self.checkpoint.pending()
+                self.checkpoint.save(force=True)
+        fetched = {p['url']: data for p, data in zip(to_fetch, results) if data}
+        
+        # แถวของหลักสูตรที่เสร็จก่อนหยุด อ่านจาก sink (ไม่เขียนซ้ำ) เพื่อใช้ในผลลัพธ์และบันทึกลง state
+        resumed = {}
+        if self.state and self.sink and resumed_urls:
+            resumed = {row['URL']: row for row in self.sink.read_rows()
+                       if row['URL'] in resumed_urls and row['URL'] not in fetched}
+        
+        # เก็บผลตามลำดับเดิมของ all_programs
+        if self.keep_rows:
+            for program_info in all_programs:
+                data = fetched.get(program_info['url']) or resumed.get(program_info['url'])
+                if data is None and self.state:
+                    # ไม่ต้องดึงใหม่ หรือดึงไม่สำเร็จ: ใช้ข้อมูลจากรอบก่อน
+                    data = self.state.cached_row(program_info['url'])
                     if data:
-                        self.programs_data.append(data)
+                        self.carried_urls.add(program_info['url'])
+                    if data and self.sink:
+                        self.sink.write(data)
+                if data:
+                    self.programs_data.append(data)
+        
+        if self.state:
+            self._update_state(all_programs, {**resumed, **fetched})
+
+    def _update_state(self, all_programs, fetched):
+        """สรุปความเปลี่ยนแปลงจากรอบก่อน แล้วบันทึกสถานะรอบนี้"""
+        searched_terms = {p['search_term'] for p in all_programs}
+        self.delta = self.state.compute_delta(self.programs_data, self.page_hashes, searched_terms)
+        
+        for program_info in all_programs:
+            data = fetched.get(program_info['url'])
+            if data:
+                self.state.update(program_info['url'], program_info['search_term'], data,
+                                  self.page_hashes.get(program_info['url']))
+        self.state.remove([row['URL'] for row in self.delta['removed']])
+        self.state.commit()
+        
+        print(f"\n♻️ เทียบกับรอบก่อน: ใหม่ {len(self.delta['added'])}, "
+              f"หายไป {len(self.delta['removed'])}, "
+              f"ค่าใช้จ่ายเปลี่ยน {len(self.delta['tuition_changed'])}, "
+              f"หน้าเปลี่ยน {len(self.delta['content_changed'])}")
+        for change in self.delta['tuition_changed']:
+            print(f"   💱 {change['มหาวิทยาลัย'][:25]} - {change['ชื่อหลักสูตร'][:40]}: "
+                  f"{change['ค่าใช้จ่ายเดิม']:,} → {change['ค่าใช้จ่ายใหม่']:,} บาท")
+
+    def save_delta(self, filename='TCAS_delta'):
+        """บันทึกความเปลี่ยนแปลงจากรอบก่อนเป็น JSON"""
+        if self.delta is None:
+            return None
+        
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        delta_filename = f"{filename}_{timestamp}.json"
+        with open(delta_filename, 'w', encoding='utf-8') as f:
+            json.dump(self.delta, f, ensure_ascii=False, indent=2)
+        
+        print(f"💾 บันทึกความเปลี่ยนแปลง: {delta_filename}")
+        return delta_filename
+
+    async def _scrape_programs_concurrently(self, context, all_programs):
+        """ดึงข้อมูลหลักสูตรด้วย worker หลายตัวที่ดึงงานจาก asyncio.Queue"""
+        queue = asyncio.Queue()
+        for index, program_info in enumerate(all_programs):
+            queue.put_nowait((index, program_info, 0))
+        
+        results = [None] * len(all_programs)
+        if self.rate_limiter is None:
+            self.rate_limiter = RateLimiter(self.request_interval)
+        total = len(all_programs)
+        
+        async def worker():
+            page = await context.new_page() if context else None
+            try:
+                while True:
+                    try:
+                        index, program_info, requeued = queue.get_nowait()
+                    except asyncio.QueueEmpty:
+                        return
                     
-                    # หน่วงเวลา
-                    await asyncio.sleep(1.5)
-                
+                    self.metrics.event('program_progress', f"\n[{index + 1:2d}/{total}]" + (" (ลองใหม่)" if requeued else ""),
+                                       index=index + 1, total=total, requeued=requeued)
+                    data, retryable = await self._scrape_with_status(page, program_info)
+                    if data is None and retryable and requeued < self.requeue_rounds:
+                        # ไม่ทิ้งหลักสูตรที่ผิดพลาดชั่วคราว ย้ายไปลองใหม่ท้ายคิว
+                        queue.put_nowait((index, program_info, requeued + 1))
+                        self.metrics.event('requeue', f"   ↩️ ย้ายไปลองใหม่ท้ายคิว", counter='requeued',
+                                           url=program_info['url'], round=requeued + 1)
+                        continue
+                    if data and self.sink:
+                        # เขียนลง sink ทันทีที่ดึงเสร็จ ไม่รอจนจบการทำงาน
+                        self.sink.write(data)
+                    if self.checkpoint:
+                        if data:
+                            self.checkpoint.mark_done(program_info['url'])
+                        else:
+                            self.checkpoint.mark_failed(program_info['url'])
+                    if self.keep_rows:
+                        results[index] = data
             finally:
-                await browser.close()
+                if page:
+                    await page.close()
         
-        return len(self.programs_data)
+        worker_count = min(self.concurrency, total)
+        await asyncio.gather(*(worker() for _ in range(worker_count)))
+        return results
 
-    def save_to_excel(self, filename='TCAS_วิศวกรรม_แยกประเภท'):
-        """บันทึกเป็น Excel แยกตามประเภทหลักสูตร"""
-        if not self.programs_data:
-            print("❌ ไม่มีข้อมูลที่จะบันทึก")
-            return
+    async def _scrape_programs_via_queue(self, all_programs):
+        """coordinator: ใส่หลักสูตรลง work_queue เปิด worker process แล้วรอจนคิวหมด
+
+        ทุกรอบที่ตรวจคิว ผลที่เสร็จตั้งแต่รอบก่อนถูกเขียนลง sink/checkpoint ที่ coordinator ที่เดียวทันที
+        (ถ้า coordinator หยุดกลางคัน ผลที่ได้แล้วยังอยู่ใน sink ให้ --resume ทำงานต่อ)
+        คำสั่ง SQLite ของคิวทำใน thread แยก ไม่บล็อก event loop
+        คืนค่าแบบเดียวกับ _scrape_programs_concurrently
+        """
+        queue = self.work_queue
+        await asyncio.to_thread(queue.enqueue, all_programs)
+        await asyncio.to_thread(queue.seal)
+        
+        processes = []
+        for number in range(self.local_workers):
+            worker_id = f"{self.worker_id}-w{number + 1}"
+            log = open(f"{queue.path}.{worker_id}.log", 'w', encoding='utf-8')
+            processes.append(subprocess.Popen(self.worker_command + ['--worker-id', worker_id],
+                                              stdout=log, stderr=subprocess.STDOUT))
+            log.close()
+        if processes:
+            self.metrics.event('workers_started', f"   👷 เปิด worker {len(processes)} process (log: {queue.path}.<worker>.log)",
+                               workers=len(processes), pids=[process.pid for process in processes])
+        else:
+            self.metrics.event('workers_external', f"   👷 รอ worker จากภายนอก: python sc.py --role worker --queue {queue.path}",
+                               queue=queue.path)
         
-        # สร้าง DataFrame
-        df = pd.DataFrame(self.programs_data)
+        positions = {program_info['url']: index for index, program_info in enumerate(all_programs)}
+        results = [None] * len(all_programs)
+        collected = set()
+        last_seq = 0
         
-        print(f"\n🔍 Debug: ข้อมูลทั้งหมดใน DataFrame = {len(df)} รายการ")
-        print(f"🔍 Debug: ประเภทหลักสูตรที่มี = {df['ประเภทหลักสูตร'].value_counts().to_dict()}")
+        async def collect():
+            """เขียนผลที่เสร็จหลังรอบก่อนลง sink/checkpoint ตามลำดับที่เสร็จ"""
+            nonlocal last_seq
+            for seq, url, data, page_hash in await asyncio.to_thread(queue.results_since, last_seq):
+                last_seq = seq
+                # ข้ามงานที่ไม่ได้อยู่ในรอบนี้ (เช่น งานเก่าในคิวที่เขียนลง sink ไปแล้วก่อน --resume)
+                if url not in positions or url in collected:
+                    continue
+                collected.add(url)
+                self.metrics.incr('programs_scraped')
+                if page_hash:
+                    self.page_hashes[url] = page_hash
+                if self.sink:
+                    self.sink.write(data)
+                if self.checkpoint:
+                    self.checkpoint.mark_done(url)
+                if self.keep_rows:
+                    results[positions[url]] = data
+        
+        last_counts = None
+        try:
+            while True:
+                reclaimed = await asyncio.to_thread(queue.reclaim_expired)
+                if reclaimed:
+                    self.metrics.event('leases_reclaimed', f"   ↩️ lease หมดอายุ {reclaimed} งาน คืนเข้าคิว",
+                                       counter='leases_reclaimed', amount=reclaimed)
+                await collect()
+                counts = await asyncio.to_thread(queue.counts)
+                if counts != last_counts:
+                    self.metrics.event('queue_progress', f"   📦 เสร็จ {counts['done']}, กำลังดึง {counts['leased']}, "
+                                       f"รอ {counts['pending']}, ล้มเหลว {counts['failed']}", **counts)
+                    last_counts = counts
+                if await asyncio.to_thread(queue.drained):
+                    break
+                if processes and all(process.poll() is not None for process in processes):
+                    self.metrics.event('workers_exited', "   ⚠️ worker ทุกตัวหยุดทำงานก่อนคิวหมด",
+                                       exit_codes=[process.returncode for process in processes])
+                    break
+                await asyncio.sleep(self.queue_poll_interval)
+        finally:
+            drained = await asyncio.to_thread(queue.drained)
+            for process in processes:
+                if process.poll() is None and not drained:
+                    process.terminate()
+            for process in processes:
+                await asyncio.to_thread(process.wait)
         
-        # แยกข้อมูลตามประเภท
-        df_computer = df[df['ประเภทหลักสูตร'] == 'วิศวกรรม คอมพิวเตอร์'].copy()
-        df_ai = df[df['ประเภทหลักสูตร'] == 'วิศวกรรมปัญญาประดิษฐ์'].copy()
+        # ผลที่เสร็จหลังการตรวจครั้งสุดท้าย
+        await collect()
+        if self.checkpoint:
+            for program_info in all_programs:
+                if program_info['url'] not in collected:
+                    self.checkpoint.mark_failed(program_info['url'])
+        return results
+
+    async def _work_from_queue(self, context):
+        """worker: งานย่อย concurrency ตัวยืมหลักสูตรจาก work_queue ทีละรายการจนคิวหมด"""
+        queue = self.work_queue
+        if self.rate_limiter is None:
+            self.rate_limiter = RateLimiter(self.request_interval)
+        held = set()
         
-        print(f"🔍 Debug: หลักสูตรคอมพิวเตอร์ = {len(df_computer)} รายการ")
-        print(f"🔍 Debug: หลักสูตรปัญญาประดิษฐ์ = {len(df_ai)} รายการ")
+        async def renew_leases():
+            # ต่ออายุ lease ของงานที่ยังดึงอยู่ ไม่ให้ถูกคืนเข้าคิวระหว่างลองใหม่แบบ backoff
+            while True:
+                await asyncio.sleep(queue.lease_seconds / 3)
+                queue.renew(self.worker_id, list(held))
+        
+        async def worker():
+            page = await context.new_page() if context else None
+            try:
+                while True:
+                    program_info = queue.lease(self.worker_id)
+                    if program_info is None:
+                        if queue.drained():
+                            return
+                        # งานที่เหลือถูก worker อื่นยืมอยู่ รอเผื่อ lease หมดอายุแล้วกลับเข้าคิว
+                        await asyncio.sleep(self.queue_poll_interval)
+                        continue
+                    
+                    url = program_info['url']
+                    held.add(url)
+                    try:
+                        self.metrics.event('program_leased', f"\n[{self.worker_id}] {program_info.get('title', url)[:60]}",
+                                           worker=self.worker_id, url=url)
+                        data, retryable = await self._scrape_with_status(page, program_info)
+                    finally:
+                        held.discard(url)
+                    if data:
+                        queue.complete(url, data, self.page_hashes.get(url))
+                    else:
+                        queue.fail(url, self.worker_id, error='fetch failed', retryable=retryable)
+            finally:
+                if page:
+                    await page.close()
         
-        # รวมและเรียงลำดับ (คอมก่อน แล้วปัญญาประดิษฐ์)
-        df_final = pd.concat([df_computer, df_ai], ignore_index=True)
+        renewer = asyncio.create_task(renew_leases())
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            renewer.cancel()
+
+    def save_to_excel(self, filename='TCAS_วิศวกรรม_แยกประเภท', rows=None, formats=('xlsx',)):
+        """บันทึกเป็น Excel แยกตามประเภทหลักสูตร (rows = แถวที่อ่านจาก sink ถ้าไม่ได้เก็บในหน่วยความจำ)
+
+        formats เลือกได้หลายรูปแบบ: xlsx, csv, parquet
+        คืนค่าสรุปสถิติ (report.build_report) ซึ่งถูกบันทึกเป็น sheet สรุปและไฟล์ _summary.json ด้วย
+        """
+        rows = self.programs_data if rows is None else rows
+        if not rows:
+            print("❌ ไม่มีข้อมูลที่จะบันทึก")
+            return
         
-        # เรียงตามค่าใช้จ่าย
-        df_final = df_final.sort_values(['ประเภทหลักสูตร', 'ค่าใช้จ่าย (บาท/ภาค)'], ascending=[True, True])
+        print(f"\n🔍 Debug: ข้อมูลทั้งหมด = {len(rows)} รายการ")
         
         # สร้างชื่อไฟล์
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        excel_filename = f"{filename}_{timestamp}.xlsx"
         
-        # บันทึกเป็น Excel
-        with pd.ExcelWriter(excel_filename, engine='openpyxl') as writer:
-            # Sheet รวม
-            df_final.to_excel(writer, sheet_name='รวมทั้งหมด', index=False)
-            
-            # Sheet แยก
-            if len(df_computer) > 0:
-                df_computer.to_excel(writer, sheet_name='💻 วิศวกรรมคอมพิวเตอร์', index=False)
-                print(f"✅ สร้าง Sheet วิศวกรรมคอมพิวเตอร์: {len(df_computer)} รายการ")
-            else:
-                print("⚠️ ไม่มีข้อมูลวิศวกรรมคอมพิวเตอร์")
-            
-            if len(df_ai) > 0:
-                df_ai.to_excel(writer, sheet_name='🤖 วิศวกรรมปัญญาประดิษฐ์', index=False)
-                print(f"✅ สร้าง Sheet วิศวกรรมปัญญาประดิษฐ์: {len(df_ai)} รายการ")
-            else:
-                print("⚠️ ไม่มีข้อมูลวิศวกรรมปัญญาประดิษฐ์")
-            
-            # ปรับความกว้างคอลัมน์
-            for sheet_name in writer.sheets:
-                worksheet = writer.sheets[sheet_name]
-                worksheet.column_dimensions['A'].width = 50  # ชื่อหลักสูตร
-                worksheet.column_dimensions['B'].width = 35  # มหาวิทยาลัย
-                worksheet.column_dimensions['C'].width = 20  # วิทยาเขต
-                worksheet.column_dimensions['D'].width = 15  # ค่าใช้จ่าย (ตัวเลข)
-                worksheet.column_dimensions['E'].width = 25  # ค่าใช้จ่าย (ข้อความ)
-                worksheet.column_dimensions['F'].width = 60  # URL
-                worksheet.column_dimensions['G'].width = 25  # ประเภทหลักสูตร
-        
-        print(f"\n💾 บันทึกเรียบร้อย: {excel_filename}")
-        self._show_summary(df_final)
-        
-        return df_final
-
-    def _show_summary(self, df):
-        """แสดงสรุปผลลัพธ์"""
+        # สถิติทั้งหมดคำนวณครั้งเดียว แล้วใช้ทั้งแสดงผล sheet สรุป และไฟล์สรุป JSON/CSV
+        with self.metrics.timer('summary', rows=len(rows)):
+            report = build_report(rows)
+        
+        # เรียงครั้งเดียวแล้วเขียนทุกรูปแบบ (Excel แบบ write-only ไม่สร้าง DataFrame ระหว่างเขียน)
+        with self.metrics.timer('export', rows=len(rows), formats=','.join(formats)):
+            sorted_rows, paths, counts = export_rows(rows, f"{filename}_{timestamp}", formats=formats,
+                                                     categories=self.category_sheets, summary=report)
+        
+        for category, sheet_name in self.category_sheets:
+            if counts.get(category):
+                print(f"✅ สร้าง Sheet {sheet_name}: {counts[category]} รายการ")
+            elif 'xlsx' in paths:
+                print(f"⚠️ ไม่มีข้อมูล{category.replace(' ', '')}")
+        
+        for path in paths.values():
+            print(f"\n💾 บันทึกเรียบร้อย: {path}")
+        
+        self._show_summary(report)
+        
+        return report
+
+    def _show_summary(self, report):
+        """แสดงสรุปผลลัพธ์ (report จาก report.build_report)"""
         print("\n" + "="*70)
         print("📊 สรุปผลการดึงข้อมูล")
         print("="*70)
         
-        total = len(df)
-        with_tuition = len(df[df['ค่าใช้จ่าย (บาท/ภาค)'] > 0])
-        
-        print(f"🎓 จำนวนหลักสูตรทั้งหมด: {total}")
-        print(f"💰 มีข้อมูลค่าใช้จ่าย: {with_tuition}")
-        print(f"❓ ไม่มีข้อมูลค่าใช้จ่าย: {total - with_tuition}")
+        overall = report['overall']
+        print(f"🎓 จำนวนหลักสูตรทั้งหมด: {overall['count']}")
+        print(f"💰 มีข้อมูลค่าใช้จ่าย: {overall['with_tuition']}")
+        print(f"❓ ไม่มีข้อมูลค่าใช้จ่าย: {overall['count'] - overall['with_tuition']}")
         
-        if with_tuition > 0:
-            valid_costs = df[df['ค่าใช้จ่าย (บาท/ภาค)'] > 0]['ค่าใช้จ่าย (บาท/ภาค)']
+        if overall['with_tuition'] > 0:
             print(f"\n💰 สถิติค่าใช้จ่าย:")
-            print(f"   ต่ำสุด: {valid_costs.min():,} บาท")
-            print(f"   สูงสุด: {valid_costs.max():,} บาท")
-            print(f"   เฉลี่ย: {valid_costs.mean():,.0f} บาท")
+            print(f"   ต่ำสุด: {overall['min']:,} บาท")
+            print(f"   สูงสุด: {overall['max']:,} บาท")
+            print(f"   เฉลี่ย: {overall['mean']:,} บาท")
+            print(f"   มัธยฐาน: {overall['median']:,} บาท")
         
         # แสดงตามประเภทหลักสูตร
-        type_summary = df['ประเภทหลักสูตร'].value_counts()
         print(f"\n🔍 แยกตามประเภทหลักสูตร:")
-        for course_type, count in type_summary.items():
-            emoji = "💻" if "คอมพิวเตอร์" in course_type else "🤖"
-            print(f"   {emoji} {course_type}: {count} หลักสูตร")
+        for stats in report['groups']['category']:
+            course_type = stats['ประเภทหลักสูตร']
+            emoji = self.category_emojis.get(course_type, DEFAULT_EMOJI)
+            print(f"   {emoji} {course_type}: {stats['count']} หลักสูตร")
             
             # แสดงสถิติย่อยของแต่ละประเภท
-            subset = df[df['ประเภทหลักสูตร'] == course_type]
-            with_cost = subset[subset['ค่าใช้จ่าย (บาท/ภาค)'] > 0]
-            if len(with_cost) > 0:
-                print(f"      💰 มีค่าใช้จ่าย: {len(with_cost)} หลักสูตร")
-                print(f"      📊 ช่วงค่าใช้จ่าย: {with_cost['ค่าใช้จ่าย (บาท/ภาค)'].min():,} - {with_cost['ค่าใช้จ่าย (บาท/ภาค)'].max():,} บาท")
+            if stats['with_tuition'] > 0:
+                print(f"      💰 มีค่าใช้จ่าย: {stats['with_tuition']} หลักสูตร")
+                print(f"      📊 ช่วงค่าใช้จ่าย: {stats['min']:,} - {stats['max']:,} บาท")
+
+def parse_args(argv=None):
+    """อ่านตัวเลือกจาก command line"""
+    parser = argparse.ArgumentParser(description='TCAS Simple Scraper')
+    parser.add_argument('--concurrency', type=int, default=4,
+                        help='จำนวนหน้าเว็บที่ดึงข้อมูลพร้อมกัน')
+    parser.add_argument('--interval', type=float, default=0.5,
+                        help='ระยะห่างขั้นต่ำระหว่างคำขอ (วินาที) รวมทุกหน้า')
+    parser.add_argument('--fetch-mode', choices=['browser', 'http'], default='browser',
+                        help='วิธีดึงหน้าหลักสูตร: browser หรือ http (ใช้ browser สำรอง)')
+    parser.add_argument('--http-base-url', default=None,
+                        help='base URL สำหรับโหมด http (เช่น server จำลองจาก fixture_server.py)')
+    parser.add_argument('--http-api-url', default=None,
+                        help='URL ของ API ข้อมูลหลักสูตรในโหมด http ใช้ {program_id} แทนรหัสหลักสูตร '
+                             '(เช่น https://.../api/programs/{program_id}) ดึง JSON ก่อน HTML')
+    parser.add_argument('--cache', default='tcas_cache.sqlite',
+                        help='ไฟล์ cache ข้อความหน้าเว็บ (SQLite)')
+    parser.add_argument('--no-cache', action='store_true', help='ไม่ใช้ cache')
+    parser.add_argument('--cache-ttl', type=float, default=7 * 24,
+                        help='อายุของข้อมูลใน cache (ชั่วโมง)')
+    parser.add_argument('--cache-max-mb', type=float, default=500,
+                        help='ขนาด cache สูงสุด (MB) เกินแล้วลบรายการที่ไม่ได้ใช้นานที่สุด')
+    parser.add_argument('--offline', action='store_true',
+                        help='ใช้ข้อมูลจาก cache เท่านั้น ไม่เชื่อมต่อเว็บ')
+    parser.add_argument('--incremental', action='store_true',
+                        help='ดึงใหม่เฉพาะหลักสูตรใหม่หรือเก่าเกิน --refresh-after และบันทึกความเปลี่ยนแปลง')
+    parser.add_argument('--state', default='tcas_state.sqlite',
+                        help='ไฟล์เก็บสถานะสำหรับโหมด incremental')
+    parser.add_argument('--refresh-after', type=float, default=7 * 24,
+                        help='ดึงหลักสูตรที่เคยดึงแล้วใหม่เมื่อเก่ากว่านี้ (ชั่วโมง)')
+    parser.add_argument('--sink', default=None,
+                        help='ไฟล์เก็บผลลัพธ์ระหว่างทำงาน (.jsonl/.csv/.sqlite/.parquet) '
+                             'ค่าเริ่มต้น TCAS_results_<เวลา>.jsonl')
+    parser.add_argument('--flush-every', type=int, default=None,
+                        help='เขียนผลลัพธ์ลงไฟล์ทุกๆ กี่แถว')
+    parser.add_argument('--fsync', action='store_true',
+                        help='fsync ทุกครั้งที่เขียนผลลัพธ์ลงไฟล์')
+    parser.add_argument('--checkpoint', default='tcas_checkpoint.json',
+                        help='ไฟล์บันทึกความคืบหน้า (รายการหลักสูตรที่ค้นพบและที่ดึงเสร็จแล้ว)')
+    parser.add_argument('--resume', action='store_true',
+                        help='ทำงานต่อจาก checkpoint: ข้ามการค้นหาและหลักสูตรที่ดึงเสร็จแล้ว')
+    parser.add_argument('--search-config', default=None,
+                        help='ไฟล์ JSON ของคำค้นหา เงื่อนไขกรอง และประเภทหลักสูตร (ค่าเริ่มต้น search_terms.json)')
+    parser.add_argument('--headed', action='store_true',
+                        help='แสดงหน้าต่าง browser (ค่าเริ่มต้นเป็น headless)')
+    parser.add_argument('--full-load', action='store_true',
+                        help='โหลดทุกอย่างในหน้าเว็บ (ไม่บล็อกรูป ฟอนต์ stylesheet และโดเมนภายนอก)')
+    parser.add_argument('--profile-dir', default='tcas_browser_profile',
+                        help='ไดเรกทอรี persistent context ของ browser ที่ใช้ซ้ำข้ามรอบ')
+    parser.add_argument('--no-profile', action='store_true',
+                        help='เปิด browser context ใหม่ทุกครั้ง (ไม่ใช้ --profile-dir)')
+    parser.add_argument('--retries', type=int, default=3,
+                        help='จำนวนครั้งที่ลองดึงแต่ละหน้า (รอแบบ exponential backoff ระหว่างครั้ง)')
+    parser.add_argument('--requeue-rounds', type=int, default=1,
+                        help='หลักสูตรที่ยังดึงไม่สำเร็จจะถูกย้ายไปลองใหม่ท้ายคิวได้อีกกี่รอบ')
+    parser.add_argument('--breaker-threshold', type=int, default=5,
+                        help='ผิดพลาดติดกันกี่ครั้งจึงพักการดึงทั้งหมด')
+    parser.add_argument('--breaker-cooldown', type=float, default=30,
+                        help='เวลาพักการดึงเมื่อผิดพลาดติดกัน (วินาที)')
+    parser.add_argument('--metrics-log', default=None,
+                        help='ไฟล์ log เวลาแต่ละขั้นตอนแบบ JSON Lines ค่าเริ่มต้น TCAS_metrics_<เวลา>.jsonl')
+    parser.add_argument('--selector-cache', default='tcas_selectors.json',
+                        help='ไฟล์จำ selector ช่องค้นหาที่ใช้ได้ของแต่ละ layout')
+    parser.add_argument('--no-selector-cache', action='store_true',
+                        help='ไม่จำ selector ช่องค้นหา (ตรวจใหม่ทุกครั้ง)')
+    parser.add_argument('--role', choices=['single', 'coordinator', 'worker'], default='single',
+                        help='single: ทำทุกอย่างใน process เดียว / coordinator: ค้นหาแล้วใส่งานลง --queue '
+                             'และรวมผล / worker: ยืมงานจาก --queue มาดึง (เปิดได้หลายตัว หลายเครื่อง)')
+    parser.add_argument('--queue', default='tcas_queue.sqlite',
+                        help='ไฟล์คิวงานที่ coordinator และ worker ใช้ร่วมกัน (วางบนดิสก์ที่แชร์กันถ้าหลายเครื่อง)')
+    parser.add_argument('--workers', type=int, default=2,
+                        help='จำนวน worker process ที่ coordinator เปิดบนเครื่องนี้ (0 = รอ worker จากภายนอก)')
+    parser.add_argument('--lease-seconds', type=float, default=300,
+                        help='เวลาที่ worker ถืองานได้โดยไม่ต่ออายุ ก่อนงานถูกคืนเข้าคิว')
+    parser.add_argument('--worker-id', default=None,
+                        help='ชื่อ worker (ค่าเริ่มต้น <hostname>-<pid>)')
+    parser.add_argument('--history', default='tcas_history.sqlite',
+                        help='ฐานข้อมูลประวัติค่าใช้จ่าย เพิ่มผลของทุกรอบเพื่อเทียบข้ามรอบ (tuition_history.py)')
+    parser.add_argument('--no-history', action='store_true', help='ไม่บันทึกรอบนี้ลงประวัติ')
+    parser.add_argument('--formats', default='xlsx',
+                        help=f"รูปแบบไฟล์ผลลัพธ์ คั่นด้วยจุลภาค ({', '.join(EXPORT_FORMATS)})")
+    return parser.parse_args(argv)
+
+# ตัวเลือกที่ coordinator ส่งต่อให้ worker process ที่เปิดบนเครื่องเดียวกัน
+WORKER_FORWARDED_OPTIONS = ('concurrency', 'interval', 'fetch_mode', 'http_base_url', 'http_api_url',
+                            'cache', 'cache_ttl',
+                            'cache_max_mb', 'search_config', 'profile_dir', 'retries', 'requeue_rounds',
+                            'breaker_threshold', 'breaker_cooldown', 'queue', 'lease_seconds')
+WORKER_FORWARDED_FLAGS = ('no_cache', 'offline', 'headed', 'full_load', 'no_profile')
+
+def worker_command(args):
+    """คำสั่งเปิด worker process ด้วยตัวเลือกเดียวกับ coordinator"""
+    command = [sys.executable, os.path.abspath(__file__), '--role', 'worker']
+    for name in WORKER_FORWARDED_OPTIONS:
+        value = getattr(args, name)
+        if value is not None:
+            command += ['--' + name.replace('_', '-'), str(value)]
+    for name in WORKER_FORWARDED_FLAGS:
+        if getattr(args, name):
+            command.append('--' + name.replace('_', '-'))
+    return command
+
+def open_cache(args):
+    """PageCache ตามตัวเลือก (None เมื่อใช้ --no-cache)"""
+    if args.no_cache:
+        return None
+    return PageCache(args.cache, ttl=args.cache_ttl * 3600,
+                     max_bytes=int(args.cache_max_mb * 1024 * 1024), offline=args.offline)
+
+async def run_worker(args, search_terms):
+    """โหมด worker: ดึงหลักสูตรจากคิวจนหมด ผลลัพธ์ส่งกลับเข้าคิวให้ coordinator รวม"""
+    cache = open_cache(args)
+    worker_id = args.worker_id or f"{socket.gethostname()}-{os.getpid()}"
+    metrics = Metrics(args.metrics_log or f"TCAS_metrics_{worker_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    metrics.log('run_start', argv=vars(args))
+    work_queue = WorkQueue(args.queue, lease_seconds=args.lease_seconds, max_attempts=args.retries)
+    scraper = TCASSimpleScraper(concurrency=args.concurrency, request_interval=args.interval,
+                                fetch_mode=args.fetch_mode, http_base_url=args.http_base_url,
+                                http_api_url=args.http_api_url,
+                                cache=cache,
+                                search_terms=search_terms,
+                                browser_session=BrowserSession(
+                                    headless=not args.headed, lean=not args.full_load,
+                                    # Chromium ใช้ profile เดียวกันพร้อมกันหลาย process ไม่ได้
+                                    profile_dir=None if args.no_profile else f"{args.profile_dir}_{worker_id}"),
+                                metrics=metrics,
+                                retry_policy=RetryPolicy(max_attempts=args.retries),
+                                circuit_breaker=CircuitBreaker(failure_threshold=args.breaker_threshold,
+                                                               cooldown=args.breaker_cooldown),
+                                work_queue=work_queue,
+                                worker_id=worker_id)
+    try:
+        await scraper.run_worker()
+    except KeyboardInterrupt:
+        print("\n⏹️ หยุดการทำงานโดยผู้ใช้")
+    finally:
+        work_queue.close()
+        # ปิด cache เพื่อเขียนเวลาใช้งานที่ค้างอยู่ (LRU)
+        if cache:
+            cache.close()
+        metrics.print_report()
+        metrics.close()
 
-async def main():
+async def main(argv=None):
     """ฟังก์ชันหลัก"""
+    args = parse_args(argv)
+    search_terms = load_search_terms(args.search_config)
     print("🎯 TCAS Simple Scraper - แยกประเภทหลักสูตรชัดเจน")
     print("📋 เป้าหมาย: ชื่อหลักสูตร + มหาวิทยาลัย + วิทยาเขต + ค่าใช้จ่าย")
     print("🔍 ค้นหา:")
-    print("   💻 วิศวกรรม คอมพิวเตอร์ (ไม่รวมปัญญาประดิษฐ์)")
-    print("   🤖 วิศวกรรมปัญญาประดิษฐ์ (เฉพาะ AI)")
+    for search_term in search_terms:
+        note = f" ({search_term.description})" if search_term.description else ""
+        print(f"   {search_term.emoji} {search_term.term}{note}")
     print("="*70)
     
-    scraper = TCASSimpleScraper()
+    if args.role == 'worker':
+        await run_worker(args, search_terms)
+        return
+    
+    work_queue = None
+    if args.role == 'coordinator':
+        work_queue = WorkQueue(args.queue, lease_seconds=args.lease_seconds, max_attempts=args.retries)
+        if not args.resume:
+            work_queue.clear()
+    
+    if args.resume:
+        checkpoint = CrawlCheckpoint.load(args.checkpoint)
+        if not checkpoint.programs:
+            print(f"⚠️ ไม่พบ checkpoint ที่ใช้ได้ใน {args.checkpoint} - เริ่มใหม่ทั้งหมด")
+    else:
+        checkpoint = CrawlCheckpoint(args.checkpoint)
+    
+    sink_path = args.sink or checkpoint.sink_path or \
+        f"TCAS_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    if args.resume and sink_path.endswith('.parquet'):
+        print("❌ ไฟล์ Parquet เขียนต่อไม่ได้ ใช้ --sink เป็น .jsonl/.csv/.sqlite เพื่อทำงานต่อ")
+        return
+    if args.resume:
+        # แถวที่อยู่ใน sink แล้วถือว่าเสร็จ แม้ checkpoint จะบันทึกไม่ทันก่อนหยุด
+        checkpoint.completed.update(row['URL'] for row in read_rows(sink_path))
+    checkpoint.sink_path = sink_path
+    
+    sink = open_sink(sink_path, flush_every=args.flush_every, fsync=args.fsync)
+    print(f"💾 บันทึกผลลัพธ์ระหว่างทำงานที่: {sink_path}")
+    
+    metrics = Metrics(args.metrics_log or f"TCAS_metrics_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    metrics.log('run_start', argv=vars(args))
+    
+    cache = open_cache(args)
+    scraper = TCASSimpleScraper(concurrency=args.concurrency, request_interval=args.interval,
+                                fetch_mode=args.fetch_mode, http_base_url=args.http_base_url,
+                                http_api_url=args.http_api_url,
+                                cache=cache,
+                                state=CrawlState(args.state, refresh_after=args.refresh_after * 3600)
+                                if args.incremental else None,
+                                sink=sink,
+                                checkpoint=checkpoint,
+                                search_terms=search_terms,
+                                browser_session=BrowserSession(
+                                    headless=not args.headed, lean=not args.full_load,
+                                    profile_dir=None if args.no_profile else args.profile_dir),
+                                metrics=metrics,
+                                retry_policy=RetryPolicy(max_attempts=args.retries),
+                                circuit_breaker=CircuitBreaker(failure_threshold=args.breaker_threshold,
+                                                               cooldown=args.breaker_cooldown),
+                                requeue_rounds=args.requeue_rounds,
+                                selector_cache=None if args.no_selector_cache
+                                else SelectorCache(args.selector_cache),
+                                work_queue=work_queue,
+                                worker_id=args.worker_id,
+                                worker_command=worker_command(args),
+                                local_workers=args.workers)
     
     try:
-        # เริ่มการ scraping
-        found_count = await scraper.run_simple_scraping()
+        # เริ่มการ scraping (ปิด sink เสมอ เพื่อให้ผลที่ได้ถูกเขียนลงไฟล์แม้หยุดกลางคัน)
+        try:
+            found_count = await scraper.run_simple_scraping()
+        finally:
+            sink.close()
+        
+        # ผลลัพธ์ทั้งหมดอยู่ใน sink (รวมที่ดึงไว้ก่อนหน้าถ้าทำงานต่อจาก checkpoint)
+        rows = None
+        if args.resume or not scraper.keep_rows:
+            rows = read_rows(sink_path)
+            found_count = len(rows)
+        
+        if checkpoint.failed:
+            print(f"\n⚠️ ดึงไม่สำเร็จ {len(checkpoint.failed)} หลักสูตร - ใช้ --resume เพื่อลองใหม่")
         
         if found_count > 0:
             print(f"\n🎉 เสร็จสิ้น! ดึงข้อมูลได้ {found_count} หลักสูตร")
             
-            # บันทึกเป็น Excel
-            scraper.save_to_excel()
+            # บันทึกเป็น Excel จากไฟล์ผลลัพธ์
+            scraper.save_to_excel(rows=rows, formats=[f.strip() for f in args.formats.split(',') if f.strip()])
+            scraper.save_delta()
+            
+            if not args.no_history:
+                history = TuitionHistory(args.history)
+                try:
+                    with metrics.timer('history_append'):
+                        history.append_cycle(scraper.programs_data if rows is None else rows,
+                                             source=os.path.abspath(sink_path), carried=scraper.carried_urls)
+                finally:
+                    history.close()
+                print(f"🗂️ เพิ่มรอบนี้ในประวัติค่าใช้จ่าย: {args.history}")
             
             print("\n✅ ไฟล์ Excel พร้อมใช้งาน!")
             print("📁 ไฟล์จะแยก Sheet เป็น:")
             print("   📄 รวมทั้งหมด")
-            print("   💻 วิศวกรรมคอมพิวเตอร์")
-            print("   🤖 วิศวกรรมปัญญาประดิษฐ์")
+            for _, sheet_name in scraper.category_sheets:
+                print(f"   {sheet_name}")
             
         else:
             print("\n❌ ไม่มีข้อมูลที่ดึงได้")
@@ -578,6 +1525,16 @@ async def main():
     
     except Exception as e:
         print(f"\n❌ เกิดข้อผิดพลาด: {str(e)}")
+    
+    finally:
+        # ปิด cache เพื่อเขียนเวลาใช้งานที่ค้างอยู่ (LRU) แล้วรายงานเวลาแต่ละขั้นตอน แม้หยุดกลางคัน
+        if cache:
+            cache.close()
+        metrics.print_report()
+        metrics.close()
+
+def run(argv=None):
+    asyncio.run(main(argv))
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
\ No newline at end of file
@@ -0,0 +1,71 @@
+import json
+import os
+
+# ไฟล์ตั้งค่าคำค้นหาเริ่มต้น (อยู่ข้างๆ sc.py)
+DEFAULT_CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'search_terms.json')
+
+DEFAULT_EMOJI = '📚'
+
+
+class SearchTerm:
+    """คำค้นหาหนึ่งคำ พร้อมเงื่อนไขกรองชื่อหลักสูตรและประเภทที่ใช้ในผลลัพธ์
+
+    term: คำที่พิมพ์ในช่องค้นหา
+    category: ชื่อประเภทหลักสูตร (คอลัมน์ 'ประเภทหลักสูตร') หลายคำค้นใช้ประเภทเดียวกันได้
+    sheet: ชื่อ sheet ใน Excel ของประเภทนี้
+    include_any: ต้องมีคำใดคำหนึ่งในชื่อหลักสูตร (ว่าง = รับทั้งหมด)
+    exclude_any: ตัดออกถ้ามีคำใดคำหนึ่งในชื่อหลักสูตร
+    """
+
+    def __init__(self, term, category=None, sheet=None, emoji=DEFAULT_EMOJI,
+                 include_any=None, exclude_any=None, description=''):
+        self.term = term
+        self.category = category or term
+        self.emoji = emoji or DEFAULT_EMOJI
+        self.sheet = sheet or f"{self.emoji} {self.category}"
+        self.include_any = [word.lower() for word in include_any or []]
+        self.exclude_any = [word.lower() for word in exclude_any or []]
+        self.description = description
+
+    @classmethod
+    def from_dict(cls, data):
+        if not data.get('term'):
+            raise ValueError(f"คำค้นหาต้องมี 'term': {data}")
+        return cls(data['term'], category=data.get('category'), sheet=data.get('sheet'),
+                   emoji=data.get('emoji'), include_any=data.get('include_any'),
+                   exclude_any=data.get('exclude_any'), description=data.get('description', ''))
+
+    def matches(self, title):
+        """ชื่อหลักสูตรผ่านเงื่อนไขของคำค้นนี้หรือไม่ (ไม่สนตัวพิมพ์เล็ก-ใหญ่)"""
+        title_lower = title.lower()
+        if self.include_any and not any(word in title_lower for word in self.include_any):
+            return False
+        return not any(word in title_lower for word in self.exclude_any)
+
+
+def load_search_terms(path=None):
+    """อ่านรายการคำค้นหาจากไฟล์ JSON ({"search_terms": [{...}, ...]})"""
+    path = path or DEFAULT_CONFIG_PATH
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    entries = data['search_terms'] if isinstance(data, dict) else data
+    terms = [SearchTerm.from_dict(entry) for entry in entries]
+    if not terms:
+        raise ValueError(f"ไม่มีคำค้นหาในไฟล์ {path}")
+    return terms
+
+
+def category_sheets(search_terms):
+    """รายการ (ประเภท, ชื่อ sheet) ตามลำดับในไฟล์ตั้งค่า (ไม่ซ้ำประเภท)"""
+    sheets = {}
+    for search_term in search_terms:
+        sheets.setdefault(search_term.category, search_term.sheet)
+    return list(sheets.items())
+
+
+def category_emojis(search_terms):
+    """emoji ของแต่ละประเภทหลักสูตร"""
+    emojis = {}
+    for search_term in search_terms:
+        emojis.setdefault(search_term.category, search_term.emoji)
+    return emojis
@@ -0,0 +1,50 @@
+import hashlib
+import json
+import os
+import time
+
+
+def layout_fingerprint(host, signature):
+    """key ของ layout หน้าเว็บ: host + hash ของโครงสร้างช่อง input บนหน้า"""
+    digest = hashlib.sha1(signature.encode('utf-8')).hexdigest()[:16]
+    return f"{host}:{digest}"
+
+
+class SelectorCache:
+    """จำวิธีหาช่องค้นหาที่ใช้ได้ (selector ของ input และปุ่มที่ต้องกดก่อน) แยกตาม layout ของหน้า
+
+    เก็บเป็นไฟล์ JSON เขียนแบบ atomic เหมือน CrawlCheckpoint
+    """
+
+    def __init__(self, path='tcas_selectors.json'):
+        self.path = path
+        self.entries = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.entries = json.load(f)
+
+    def get(self, key):
+        """strategy ที่เคยใช้ได้ ({'input': ..., 'button': ...}) หรือ None"""
+        return self.entries.get(key)
+
+    def put(self, key, strategy):
+        entry = self.entries.get(key)
+        if entry and entry.get('input') == strategy.get('input') and entry.get('button') == strategy.get('button'):
+            entry['hits'] = entry.get('hits', 0) + 1
+        else:
+            entry = dict(strategy, hits=0)
+            self.entries[key] = entry
+        entry['updated_at'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        self.save()
+
+    def forget(self, key):
+        if self.entries.pop(key, None) is not None:
+            self.save()
+
+    def save(self):
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
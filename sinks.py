@@ -0,0 +1,255 @@
+import csv
+import json
+import os
+import sqlite3
+
+# คอลัมน์ของแถวผลลัพธ์ (ลำดับเดียวกับไฟล์ Excel)
+COLUMNS = [
+    'ชื่อหลักสูตร',
+    'มหาวิทยาลัย',
+    'วิทยาเขต',
+    'ค่าใช้จ่าย (บาท/ภาค)',
+    'ค่าใช้จ่าย (ข้อความเต็ม)',
+    'URL',
+    'ประเภทหลักสูตร',
+    'รหัสมหาวิทยาลัย',
+    'รหัสวิทยาเขต',
+]
+TUITION_COLUMN = 'ค่าใช้จ่าย (บาท/ภาค)'
+
+
+class ResultSink:
+    """ที่เก็บผลลัพธ์แบบเขียนต่อท้ายทีละแถว ระหว่างที่ scraper ทำงาน
+
+    flush_every: เขียนข้อมูลลงไฟล์ทุกๆ กี่แถว
+    fsync: เรียก os.fsync ทุกครั้งที่ flush (ข้อมูลไม่หายแม้เครื่องดับ แต่ช้ากว่า)
+    """
+
+    def __init__(self, path, flush_every=1, fsync=False):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self.fsync = fsync
+        self.count = 0
+        self._unflushed = 0
+
+    def write(self, row):
+        self._write(row)
+        self.count += 1
+        self._unflushed += 1
+        if self._unflushed >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        self._flush()
+        self._unflushed = 0
+
+    def close(self):
+        self.flush()
+        self._close()
+
+    def read_rows(self):
+        """อ่านแถวทั้งหมดที่เขียนไว้ (รวมจากรอบก่อนหน้าในไฟล์เดียวกัน)"""
+        self.flush()
+        return read_rows(self.path)
+
+    def _write(self, row):
+        raise NotImplementedError
+
+    def _flush(self):
+        pass
+
+    def _close(self):
+        pass
+
+
+def trim_partial_line(path, chunk_size=65536):
+    """ตัดบรรทัดสุดท้ายที่เขียนไม่ครบ (โปรแกรมหยุดระหว่างเขียน) ออกจากไฟล์ คืนจำนวน byte ที่ตัด
+
+    ถ้าไม่ตัด แถวถัดไปที่เขียนต่อท้ายจะติดกับเศษบรรทัดนั้นและถูกข้ามตอนอ่านทั้งบรรทัด
+    """
+    with open(path, 'rb+') as f:
+        end = f.seek(0, os.SEEK_END)
+        keep = 0
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            index = f.read(position - start).rfind(b'\n')
+            if index >= 0:
+                keep = start + index + 1
+                break
+            position = start
+        if keep < end:
+            f.truncate(keep)
+        return end - keep
+
+
+class _FileSink(ResultSink):
+    """sink ที่เป็นไฟล์ข้อความเปิดแบบต่อท้าย (ไฟล์เดิมถูกตัดบรรทัดสุดท้ายที่เขียนไม่ครบออกก่อน)"""
+
+    def __init__(self, path, flush_every=1, fsync=False):
+        super().__init__(path, flush_every, fsync)
+        if os.path.exists(path):
+            trim_partial_line(path)
+        self._is_new = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, 'a', newline='', encoding='utf-8')
+
+    def _flush(self):
+        self._file.flush()
+        if self.fsync:
+            os.fsync(self._file.fileno())
+
+    def _close(self):
+        self._file.close()
+
+
+class JSONLSink(_FileSink):
+    """หนึ่งบรรทัดต่อหนึ่งแถว (JSON)"""
+
+    def _write(self, row):
+        self._file.write(json.dumps(row, ensure_ascii=False) + '\n')
+
+
+class CSVSink(_FileSink):
+    """CSV ตามคอลัมน์ของไฟล์ Excel"""
+
+    def __init__(self, path, flush_every=1, fsync=False):
+        super().__init__(path, flush_every, fsync)
+        fieldnames = COLUMNS
+        if not self._is_new:
+            # เขียนต่อไฟล์เดิมตามหัวตารางเดิม (ไฟล์จากเวอร์ชันก่อนอาจมีคอลัมน์น้อยกว่า)
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                fieldnames = next(csv.reader(f), None) or COLUMNS
+        self._writer = csv.DictWriter(self._file, fieldnames=fieldnames, extrasaction='ignore')
+        if self._is_new:
+            self._writer.writeheader()
+
+    def _write(self, row):
+        self._writer.writerow(row)
+
+
+class SQLiteSink(ResultSink):
+    """ตาราง results ใน SQLite (commit ทุก flush_every แถว)"""
+
+    def __init__(self, path, flush_every=1, fsync=False):
+        super().__init__(path, flush_every, fsync)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+        columns = ', '.join(f'"{column}"' for column in COLUMNS)
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS results ({columns})')
+        # ตารางจากเวอร์ชันก่อนอาจยังไม่มีคอลัมน์ใหม่
+        existing = {info[1] for info in self._conn.execute('PRAGMA table_info(results)')}
+        for column in COLUMNS:
+            if column not in existing:
+                self._conn.execute(f'ALTER TABLE results ADD COLUMN "{column}"')
+        self._insert = f"INSERT INTO results ({columns}) VALUES ({', '.join('?' for _ in COLUMNS)})"
+
+    def _write(self, row):
+        self._conn.execute(self._insert, [row.get(column) for column in COLUMNS])
+
+    def _flush(self):
+        self._conn.commit()
+
+    def _close(self):
+        self._conn.close()
+
+
+class ParquetSink(ResultSink):
+    """Parquet โดยเขียนหนึ่ง row group ทุก flush_every แถว (ต้องติดตั้ง pyarrow)
+
+    หมายเหตุ: ไฟล์ Parquet จะอ่านได้เมื่อปิด sink แล้วเท่านั้น และเขียนทับไฟล์เดิม
+    ถ้าต้องการให้ข้อมูลไม่หายเมื่อโปรแกรมหยุดกลางคัน ให้ใช้ JSONL/CSV/SQLite
+    """
+
+    def __init__(self, path, flush_every=500, fsync=False):
+        super().__init__(path, flush_every, fsync)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("ParquetSink ต้องใช้ pyarrow: pip install pyarrow")
+        self._pa = pa
+        self._schema = pa.schema([
+            (column, pa.int64() if column == TUITION_COLUMN else pa.string()) for column in COLUMNS
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema)
+        self._buffer = []
+
+    def _write(self, row):
+        self._buffer.append(row)
+
+    def _flush(self):
+        if self._buffer:
+            table = self._pa.Table.from_pylist(
+                [{column: row.get(column) for column in COLUMNS} for row in self._buffer],
+                schema=self._schema)
+            self._writer.write_table(table)
+            self._buffer = []
+
+    def _close(self):
+        self._writer.close()
+
+    def read_rows(self):
+        raise RuntimeError("อ่าน ParquetSink ได้หลังจากปิด sink แล้วเท่านั้น")
+
+
+SINK_TYPES = {
+    '.jsonl': JSONLSink,
+    '.csv': CSVSink,
+    '.sqlite': SQLiteSink,
+    '.db': SQLiteSink,
+    '.parquet': ParquetSink,
+}
+
+
+def open_sink(path, flush_every=None, fsync=False):
+    """เปิด sink ตามนามสกุลไฟล์ (.jsonl / .csv / .sqlite / .db / .parquet)"""
+    extension = os.path.splitext(path)[1].lower()
+    sink_class = SINK_TYPES.get(extension)
+    if sink_class is None:
+        raise ValueError(f"ไม่รู้จักชนิดไฟล์ sink: {path} (รองรับ {', '.join(SINK_TYPES)})")
+    if flush_every is None:
+        return sink_class(path, fsync=fsync)
+    return sink_class(path, flush_every=flush_every, fsync=fsync)
+
+
+def read_rows(path):
+    """อ่านแถวทั้งหมดจากไฟล์ sink"""
+    extension = os.path.splitext(path)[1].lower()
+    if not os.path.exists(path):
+        return []
+
+    if extension == '.jsonl':
+        rows = []
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    rows.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # บรรทัดสุดท้ายอาจเขียนไม่ครบถ้าโปรแกรมหยุดกลางคัน
+                    continue
+        return rows
+
+    if extension == '.csv':
+        # utf-8-sig อ่านได้ทั้งไฟล์ที่มีและไม่มี BOM (ไฟล์ CSV สำหรับเปิดใน Excel มี BOM)
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.DictReader(f))
+        for row in rows:
+            row[TUITION_COLUMN] = int(row[TUITION_COLUMN] or 0)
+        return rows
+
+    if extension in ('.sqlite', '.db'):
+        conn = sqlite3.connect(path)
+        try:
+            cursor = conn.execute('SELECT * FROM results')
+            names = [d[0] for d in cursor.description]
+            return [dict(zip(names, values)) for values in cursor]
+        finally:
+            conn.close()
+
+    if extension == '.parquet':
+        import pyarrow.parquet as pq
+        return pq.read_table(path).to_pylist()
+
+    raise ValueError(f"ไม่รู้จักชนิดไฟล์ sink: {path}")
@@ -0,0 +1,39 @@
+import argparse
+import importlib
+import os
+import sys
+
+# คำสั่งย่อย -> (module, ฟังก์ชันที่รับ argv, คำสั่งย่อยของ module นั้นที่ใส่หน้า argv, คำอธิบาย)
+# import module ของคำสั่งที่เรียกเท่านั้น คำสั่งที่ไม่ต้องใช้ browser จึงไม่ต้องรอ import playwright/pandas
+COMMANDS = {
+    'crawl': ('sc', 'run', [], 'ค้นหาและดึงข้อมูลหลักสูตรจากเว็บ (ตัวเลือกเดิมของ sc.py)'),
+    'extract': ('extract_offline', 'main', [], 'ดึงข้อมูลใหม่จากหน้าที่บันทึกไว้ (ไม่ต้องเปิด browser)'),
+    'export': ('export', 'main', [], 'ส่งออกไฟล์ผลลัพธ์เป็น Excel/CSV/Parquet พร้อมสรุปสถิติ'),
+    'summary': ('report', 'main', [], 'สรุปสถิติค่าใช้จ่ายแยกตามประเภท มหาวิทยาลัย วิทยาเขต'),
+    'query': ('tuition_query', 'main', ['query'], 'ค้นหาค่าใช้จ่ายครั้งเดียวแล้วแสดงผล'),
+    'serve': ('tuition_query', 'main', ['serve'], 'เปิด HTTP API ค้นหาค่าใช้จ่าย'),
+    'history': ('tuition_history', 'main', [], 'ประวัติค่าใช้จ่ายข้ามรอบการดึงข้อมูล'),
+}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='tcas.py', description='TCAS - เปรียบเทียบค่าใช้จ่ายหลักสูตร',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='คำสั่ง:\n' + '\n'.join(f'  {name:<9} {description}'
+                                       for name, (_, _, _, description) in COMMANDS.items()) +
+               '\n\nดูตัวเลือกของแต่ละคำสั่ง: tcas.py <คำสั่ง> --help')
+    parser.add_argument('command', choices=COMMANDS, metavar='command', help='คำสั่งย่อย (ดูด้านล่าง)')
+    parser.add_argument('args', nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    module_name, function, prefix, _ = COMMANDS[args.command]
+    # ให้ usage ของคำสั่งย่อยแสดงเป็น "tcas.py <คำสั่ง>"
+    # (ถ้า module มีคำสั่งย่อยชื่อเดียวกันอยู่แล้ว argparse จะต่อชื่อให้เอง)
+    prog = os.path.basename(sys.argv[0])
+    sys.argv[0] = prog if prefix else f"{prog} {args.command}"
+    getattr(importlib.import_module(module_name), function)(prefix + args.args)
+
+
+if __name__ == "__main__":
+    main()
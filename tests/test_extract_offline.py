@@ -0,0 +1,37 @@
+import contextlib
+import glob
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from extract_offline import main
+
+PAGE = "หลักสูตรวิศวกรรมศาสตรบัณฑิต\nมหาวิทยาลัยทดสอบ\nค่าใช้จ่าย 25,000 บาท ต่อภาคการศึกษา\n"
+
+
+def test_excel_includes_categories_from_folder_names(tmp_path, monkeypatch):
+    from openpyxl import load_workbook
+
+    pages = tmp_path / 'pages'
+    for folder in ('วิศวกรรม คอมพิวเตอร์', 'วิศวกรรมอาหาร'):
+        (pages / folder).mkdir(parents=True)
+        for index in range(2):
+            (pages / folder / f'หลักสูตร {index}.txt').write_text(PAGE, encoding='utf-8')
+    monkeypatch.chdir(tmp_path)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        main([str(pages), '--output', str(tmp_path / 'rows.csv'), '--excel', '--workers', '1'])
+
+    [path] = glob.glob(str(tmp_path / '*.xlsx'))
+    workbook = load_workbook(path, read_only=True)
+    try:
+        counts = {name: len(list(workbook[name].iter_rows())) - 1
+                  for name in workbook.sheetnames if name != 'สรุป'}
+    finally:
+        workbook.close()
+    assert counts['รวมทั้งหมด'] == 4
+    # ประเภทที่ไม่อยู่ใน search config ก็ได้ sheet ของตัวเอง ไม่หายไปจากไฟล์
+    assert counts['วิศวกรรมอาหาร'] == 2
+    assert sum(counts.values()) == 8
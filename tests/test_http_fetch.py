@@ -0,0 +1,28 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from http_fetch import HTTPProgramFetcher
+
+
+def test_close_closes_sessions_of_every_thread():
+    fetcher = HTTPProgramFetcher(base_url='http://127.0.0.1:1')
+    sessions = []
+    threads = [threading.Thread(target=lambda: sessions.append(fetcher.session)) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    sessions.append(fetcher.session)
+    assert len({id(session) for session in sessions}) == 4
+
+    closed = []
+    for session in sessions:
+        session.close = lambda session=session: closed.append(session)
+    fetcher.close()
+    assert len(closed) == 4
+
+    # ใช้ต่อหลังปิดได้ด้วย session ใหม่
+    assert fetcher.session not in sessions
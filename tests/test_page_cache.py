@@ -0,0 +1,71 @@
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from page_cache import PageCache
+
+
+def test_eviction_uses_total_size_shared_between_connections(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    # เหมือน coordinator กับ worker ที่เปิดไฟล์เดียวกันคนละ process
+    first = PageCache(path, max_bytes=10_000)
+    second = PageCache(path, max_bytes=10_000)
+    try:
+        for index in range(4):
+            first.put(f'https://example.test/a{index}', 'x' * 2000)
+        for index in range(4):
+            second.put(f'https://example.test/b{index}', 'x' * 2000)
+        # ทับรายการเดิมด้วยข้อความที่สั้นลง ขนาดรวมต้องลดตาม
+        second.put('https://example.test/b3', 'x' * 1000)
+
+        assert first.total_bytes() == second.total_bytes() <= 10_000
+        assert first.total_bytes() == sum(len(text) for _, text in first.items())
+        assert first.get('https://example.test/a0') is None
+        assert second.get('https://example.test/b3')['text'] == 'x' * 1000
+    finally:
+        first.close()
+        second.close()
+
+
+def test_reads_update_last_access_in_batches(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = PageCache(path, max_bytes=5000)
+    try:
+        for index in range(3):
+            cache.put(f'https://example.test/{index}', 'x' * 1500)
+        # อ่านรายการเก่าสุด: ยังไม่เขียนลงฐานข้อมูล แต่ต้องนับตอนเลือกรายการที่จะลบ
+        assert cache.get('https://example.test/0') is not None
+        assert cache._conn.in_transaction is False
+        cache.put('https://example.test/3', 'x' * 1500)
+        assert cache.get('https://example.test/0') is not None
+        assert cache.get('https://example.test/1') is None
+    finally:
+        cache.close()
+
+
+
+def test_close_saves_pending_access_times(tmp_path):
+    path = str(tmp_path / 'cache.sqlite')
+    cache = PageCache(path)
+    for index in range(10):
+        cache.put(f'https://example.test/{index}', 'x')
+    cache.close()
+    written_at = time.time()
+    time.sleep(0.01)
+
+    # อ่านน้อยกว่า ACCESS_FLUSH_EVERY ครั้ง แล้วปิด (เหมือนรอบ --offline ที่ไม่มี put)
+    cache = PageCache(path, offline=True)
+    for index in range(5):
+        assert cache.get_text(f'https://example.test/{index}') == 'x'
+    cache.close()
+
+    conn = sqlite3.connect(path)
+    try:
+        rows = dict(conn.execute('SELECT url, last_access FROM pages'))
+    finally:
+        conn.close()
+    recent = sorted(url for url, last_access in rows.items() if last_access > written_at)
+    assert recent == [f'https://example.test/{index}' for index in range(5)]
@@ -0,0 +1,105 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import Metrics
+from resilience import CircuitBreaker, RetryPolicy
+from sc import TCASSimpleScraper
+
+
+def _scraper(breaker):
+    return TCASSimpleScraper(request_interval=0, metrics=Metrics(), search_terms=[],
+                             retry_policy=RetryPolicy(max_attempts=1), circuit_breaker=breaker)
+
+
+def _fail_with(error_type):
+    async def action():
+        raise error_type('boom')
+    return action
+
+
+def test_permanent_errors_do_not_trip_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+    scraper = _scraper(breaker)
+
+    async def run():
+        for index in range(5):
+            with pytest.raises(ValueError):
+                await scraper._with_retries(f'https://example.test/{index}', _fail_with(ValueError), 'test')
+
+    asyncio.run(run())
+    assert breaker.state == 'closed'
+    assert breaker.failures == 0
+
+
+def test_transient_errors_trip_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+    scraper = _scraper(breaker)
+
+    async def run():
+        for index in range(3):
+            with pytest.raises(ConnectionError):
+                await scraper._with_retries(f'https://example.test/{index}', _fail_with(ConnectionError), 'test')
+
+    asyncio.run(run())
+    assert breaker.state == 'open'
+    assert breaker.trips == 1
+    assert scraper.metrics.counters['circuit_breaker_trips'] == 1
+
+
+def test_cancelled_probe_lets_another_caller_probe():
+    async def run():
+        breaker = CircuitBreaker(failure_threshold=1, cooldown=0.01)
+        breaker.record_failure()
+        assert breaker.state == 'open'
+        probe_started = asyncio.Event()
+
+        async def probe():
+            with await breaker.wait():
+                probe_started.set()
+                await asyncio.sleep(60)
+
+        async def other():
+            with await breaker.wait():
+                breaker.record_success()
+
+        probe_task = asyncio.create_task(probe())
+        await probe_started.wait()
+        assert breaker.state == 'half_open'
+        other_task = asyncio.create_task(other())
+        await asyncio.sleep(0.05)
+        assert not other_task.done()
+
+        probe_task.cancel()
+        await asyncio.wait_for(other_task, timeout=1)
+        assert breaker.state == 'closed'
+
+    asyncio.run(run())
+
+
+def test_breaker_states():
+    async def run():
+        breaker = CircuitBreaker(failure_threshold=2, cooldown=0.01)
+        breaker.record_failure()
+        assert breaker.state == 'closed'
+        breaker.record_failure()
+        assert breaker.state == 'open' and breaker.trips == 1
+
+        # หมดเวลาพัก: คำขอทดลองล้มเหลว -> open อีกรอบ
+        with await breaker.wait() as permit:
+            assert permit.probe and breaker.state == 'half_open'
+            breaker.record_failure()
+        assert breaker.state == 'open' and breaker.trips == 2
+
+        # คำขอทดลองสำเร็จ -> closed และคำขอถัดไปไม่ใช่คำขอทดลอง
+        with await breaker.wait():
+            breaker.record_success()
+        assert breaker.state == 'closed'
+        with await breaker.wait() as permit:
+            assert not permit.probe
+
+    asyncio.run(run())
@@ -0,0 +1,114 @@
+import asyncio
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench import load_program_fixtures, write_program_fixtures
+from checkpoint import CrawlCheckpoint
+from crawl_state import CrawlState
+from fixture_server import start_fixture_server
+from metrics import Metrics
+from page_cache import PageCache
+from sc import TCASSimpleScraper
+from search_config import SearchTerm
+from sinks import open_sink, read_rows
+
+
+def _scrape(base_url, cache, programs, **kwargs):
+    search_terms = sorted({program['search_term'] for program in programs})
+    scraper = TCASSimpleScraper(concurrency=4, request_interval=0, fetch_mode='http', http_base_url=base_url,
+                                cache=cache, search_terms=[SearchTerm(term) for term in search_terms],
+                                metrics=Metrics(), **kwargs)
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(scraper.run_simple_scraping())
+    return scraper
+
+
+def test_resume_with_incremental_does_not_duplicate_rows(tmp_path):
+    fixtures = tmp_path / 'fixtures'
+    write_program_fixtures(str(fixtures), 30)
+    programs, _ = load_program_fixtures(str(fixtures))
+    server, base_url = start_fixture_server(str(fixtures))
+    cache = PageCache(str(tmp_path / 'cache.sqlite'))
+    try:
+        for term in {program['search_term'] for program in programs}:
+            cache.put(f"search:{term}", json.dumps(
+                [program for program in programs if program['search_term'] == term], ensure_ascii=False))
+
+        # รอบแรกครบทุกหลักสูตร: state มีแถวของทุก URL
+        state_path = str(tmp_path / 'state.sqlite')
+        first_sink = open_sink(str(tmp_path / 'a.jsonl'))
+        state = CrawlState(state_path, refresh_after=0)
+        _scrape(base_url, cache, programs, sink=first_sink, state=state)
+        first_sink.close()
+        state.close()
+        first_rows = read_rows(str(tmp_path / 'a.jsonl'))
+        assert len(first_rows) == 30
+
+        # รอบที่สองถูกขัดจังหวะหลังดึงเสร็จ 10 หลักสูตร (แถวอยู่ใน sink และ checkpoint แล้ว)
+        sink_path = str(tmp_path / 'b.jsonl')
+        checkpoint = CrawlCheckpoint(str(tmp_path / 'checkpoint.json'))
+        checkpoint.sink_path = sink_path
+        checkpoint.set_frontier(programs)
+        interrupted = open_sink(sink_path)
+        for row in first_rows[:10]:
+            interrupted.write(row)
+            checkpoint.mark_done(row['URL'])
+        interrupted.close()
+        checkpoint.save(force=True)
+
+        resumed_at = time.time()
+        sink = open_sink(sink_path)
+        state = CrawlState(state_path, refresh_after=0)
+        scraper = _scrape(base_url, cache, programs, sink=sink, state=state,
+                          checkpoint=CrawlCheckpoint.load(checkpoint.path))
+        sink.close()
+        state.close()
+    finally:
+        cache.close()
+        server.shutdown()
+        server.server_close()
+
+    rows = read_rows(sink_path)
+    urls = [row['URL'] for row in rows]
+    assert len(urls) == 30
+    assert len(set(urls)) == 30
+    assert len(scraper.programs_data) == 30
+
+    # แถวที่เสร็จก่อนหยุดถูกบันทึกลง state ของรอบนี้ด้วย
+    records = CrawlState(state_path).previous
+    assert all(records[row['URL']]['last_fetched'] >= resumed_at for row in first_rows)
+
+
+def test_incremental_run_reports_carried_rows(tmp_path):
+    fixtures = tmp_path / 'fixtures'
+    write_program_fixtures(str(fixtures), 10)
+    programs, _ = load_program_fixtures(str(fixtures))
+    server, base_url = start_fixture_server(str(fixtures))
+    cache = PageCache(str(tmp_path / 'cache.sqlite'))
+    try:
+        for term in {program['search_term'] for program in programs}:
+            cache.put(f"search:{term}", json.dumps(
+                [program for program in programs if program['search_term'] == term], ensure_ascii=False))
+        state_path = str(tmp_path / 'state.sqlite')
+        state = CrawlState(state_path, refresh_after=3600)
+        first = _scrape(base_url, cache, programs, state=state)
+        state.close()
+
+        # รอบที่สองไม่มีหลักสูตรใดเก่าเกิน refresh_after: ทุกแถวมาจากรอบก่อน
+        state = CrawlState(state_path, refresh_after=3600)
+        second = _scrape(base_url, cache, programs, state=state)
+        state.close()
+    finally:
+        cache.close()
+        server.shutdown()
+        server.server_close()
+
+    assert first.carried_urls == set()
+    assert len(second.programs_data) == 10
+    assert second.carried_urls == {row['URL'] for row in second.programs_data}
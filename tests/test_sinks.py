@@ -0,0 +1,45 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sinks import open_sink, read_rows
+
+
+def _row(index):
+    return {'ชื่อหลักสูตร': f'หลักสูตร {index}', 'มหาวิทยาลัย': 'มหาวิทยาลัยทดสอบ', 'วิทยาเขต': '',
+            'ค่าใช้จ่าย (บาท/ภาค)': 1000 * index, 'ค่าใช้จ่าย (ข้อความเต็ม)': '', 'URL': f'https://example.test/{index}',
+            'ประเภทหลักสูตร': 'ทดสอบ', 'รหัสมหาวิทยาลัย': '', 'รหัสวิทยาเขต': ''}
+
+
+@pytest.mark.parametrize('extension', ['jsonl', 'csv'])
+def test_resume_drops_partial_last_line(tmp_path, extension):
+    path = str(tmp_path / f'results.{extension}')
+    sink = open_sink(path)
+    for index in range(3):
+        sink.write(_row(index))
+    sink.close()
+    # โปรแกรมหยุดระหว่างเขียนแถวที่สี่
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"ชื่อหลักสูตร": "หลักสู' if extension == 'jsonl' else 'หลักสูตร 3,มหาวิทยา')
+
+    sink = open_sink(path)
+    sink.write(_row(4))
+    sink.close()
+
+    urls = [row['URL'] for row in read_rows(path)]
+    assert urls == [f'https://example.test/{index}' for index in (0, 1, 2, 4)]
+
+
+def test_resume_of_partial_first_line_starts_a_new_file(tmp_path):
+    path = str(tmp_path / 'results.csv')
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('ชื่อหลัก')
+
+    sink = open_sink(path)
+    sink.write(_row(1))
+    sink.close()
+
+    assert [row['URL'] for row in read_rows(path)] == ['https://example.test/1']
@@ -0,0 +1,45 @@
+import json
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tcas
+
+
+def test_query_runs_without_repeating_subcommand(tmp_path, capsys):
+    path = str(tmp_path / 'results.jsonl')
+    with open(path, 'w', encoding='utf-8') as f:
+        for index, amount in enumerate([14000, 30000, 45000]):
+            f.write(json.dumps({'ชื่อหลักสูตร': f'หลักสูตร {index}', 'มหาวิทยาลัย': 'มหาวิทยาลัยทดสอบ',
+                                'ค่าใช้จ่าย (บาท/ภาค)': amount, 'URL': f'https://example.test/{index}'},
+                               ensure_ascii=False) + '\n')
+
+    tcas.main(['query', '--source', path, '--max', '30000', '--top', '5', '--json'])
+    output = capsys.readouterr().out
+    printed = json.loads(output[:output.rindex(']') + 1])
+    assert [row['ค่าใช้จ่าย (บาท/ภาค)'] for row in printed] == [14000, 30000]
+
+
+def test_command_receives_remaining_argv(monkeypatch):
+    calls = []
+    command = types.ModuleType('fake_report')
+    command.main = calls.append
+    monkeypatch.setitem(sys.modules, 'fake_report', command)
+    monkeypatch.setitem(tcas.COMMANDS, 'summary', ('fake_report', 'main', [], ''))
+    monkeypatch.setattr(sys, 'argv', ['tcas.py'])
+
+    tcas.main(['summary', 'results.jsonl', '--json', 'out.json'])
+    assert calls == [['results.jsonl', '--json', 'out.json']]
+    assert sys.argv[0] == 'tcas.py summary'
+
+
+def test_extract_does_not_import_scraper():
+    import subprocess
+    code = ("import sys, tcas\n"
+            "try:\n    tcas.main(['extract', '--help'])\nexcept SystemExit:\n    pass\n"
+            "print('sc' in sys.modules)")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    output = subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True, text=True).stdout
+    assert output.strip().endswith('False')
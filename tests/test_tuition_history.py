@@ -0,0 +1,74 @@
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sinks import TUITION_COLUMN
+from tuition_history import TuitionHistory
+
+
+def _row(index, tuition, **extra):
+    row = {
+        'ชื่อหลักสูตร': f'วิศวกรรมคอมพิวเตอร์ {index}',
+        'มหาวิทยาลัย': 'มหาวิทยาลัยเกษตรศาสตร์',
+        'วิทยาเขต': 'บางเขน' if index % 2 else '',
+        'ค่าใช้จ่าย (ข้อความเต็ม)': f'{tuition:,} บาท/ภาคการศึกษา',
+        'URL': f'https://example.test/{index}',
+        'ประเภทหลักสูตร': 'วิศวกรรม คอมพิวเตอร์',
+        'รหัสมหาวิทยาลัย': 'ku',
+        TUITION_COLUMN: tuition,
+    }
+    row.update(extra)
+    return row
+
+
+def test_texts_round_trip_through_dictionary(tmp_path):
+    path = str(tmp_path / 'history.sqlite')
+    history = TuitionHistory(path)
+    history.append_cycle([_row(1, 20000), _row(2, 30000)], label='a', scraped_at=1)
+    history.close()
+
+    # เปิดใหม่เพื่อให้ใช้รหัสข้อความที่อ่านจากฐานข้อมูล
+    history = TuitionHistory(path)
+    history.append_cycle([_row(1, 25000), _row(2, 30000), _row(3, 41000)], label='b', scraped_at=2)
+    changes = list(history.changes('a', 'b'))
+    assert [(change['URL'], change['ค่าใช้จ่ายเดิม'], change['ค่าใช้จ่ายใหม่']) for change in changes] == \
+        [('https://example.test/1', 20000, 25000)]
+    assert changes[0]['ชื่อหลักสูตร'] == 'วิศวกรรมคอมพิวเตอร์ 1'
+    assert changes[0]['วิทยาเขต'] == 'บางเขน'
+    assert [point['ค่าใช้จ่าย (ข้อความเต็ม)'] for point in history.program_history('https://example.test/2')] == \
+        ['30,000 บาท/ภาคการศึกษา'] * 2
+    assert [point['count'] for point in history.trend(university='ku')['ku']] == [2, 3]
+    assert history._conn.execute('SELECT COUNT(*) FROM texts WHERE value = ?',
+                                 ('มหาวิทยาลัยเกษตรศาสตร์',)).fetchone()[0] == 1
+    history.close()
+
+
+def test_carried_rows_are_marked(tmp_path):
+    history = TuitionHistory(str(tmp_path / 'history.sqlite'))
+    history.append_cycle([_row(1, 20000), _row(2, 30000)], label='a', scraped_at=1)
+    # รอบ incremental: ดึงใหม่เฉพาะหลักสูตร 1 ส่วนหลักสูตร 2 ใช้แถวจากรอบก่อน
+    history.append_cycle([_row(1, 22000), _row(2, 30000)], label='b', scraped_at=2,
+                         carried={'https://example.test/2'})
+
+    assert [point['carried'] for point in history.program_history('https://example.test/1')] == [False, False]
+    assert [point['carried'] for point in history.program_history('https://example.test/2')] == [False, True]
+    assert [cycle['rows'] for cycle in history.cycles()] == [2, 2]
+    history.close()
+
+
+def test_history_without_carried_column_is_migrated(tmp_path):
+    path = str(tmp_path / 'history.sqlite')
+    history = TuitionHistory(path)
+    history.append_cycle([_row(1, 20000)], label='a', scraped_at=1)
+    history.close()
+    conn = sqlite3.connect(path)
+    conn.execute('ALTER TABLE observations DROP COLUMN carried')
+    conn.commit()
+    conn.close()
+
+    history = TuitionHistory(path)
+    history.append_cycle([_row(1, 20000)], label='b', scraped_at=2, carried={'https://example.test/1'})
+    assert [point['carried'] for point in history.program_history('https://example.test/1')] == [False, True]
+    history.close()
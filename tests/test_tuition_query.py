@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkpoint import CrawlCheckpoint
+from tuition_query import TuitionQueryService, main, run_query
+
+TUITIONS = [0, 14000, 21500, 28000, 30000, 35500, 43500, 71500]
+
+
+def _write_results(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        for index, amount in enumerate(TUITIONS):
+            f.write(json.dumps({
+                'ชื่อหลักสูตร': f'หลักสูตร {index}',
+                'มหาวิทยาลัย': 'มหาวิทยาลัยทดสอบ',
+                'วิทยาเขต': '',
+                'ค่าใช้จ่าย (บาท/ภาค)': amount,
+                'ค่าใช้จ่าย (ข้อความเต็ม)': f'{amount} บาท',
+                'URL': f'https://example.test/{index}',
+                'ประเภทหลักสูตร': 'วิศวกรรม คอมพิวเตอร์',
+            }, ensure_ascii=False) + '\n')
+
+
+def test_top_respects_tuition_range(tmp_path, capsys):
+    path = str(tmp_path / 'results.jsonl')
+    _write_results(path)
+    service = TuitionQueryService(path)
+
+    cheapest = service.top(k=5, max_tuition=30000)
+    assert [row['ค่าใช้จ่าย (บาท/ภาค)'] for row in cheapest] == [14000, 21500, 28000, 30000]
+    expensive = service.top(k=2, cheapest=False, min_tuition=20000, max_tuition=40000)
+    assert [row['ค่าใช้จ่าย (บาท/ภาค)'] for row in expensive] == [35500, 30000]
+
+    over_http = run_query(service, '/top', {'k': '5', 'max': '30000'})
+    assert [row['ค่าใช้จ่าย (บาท/ภาค)'] for row in over_http] == [14000, 21500, 28000, 30000]
+
+    main(['--source', path, 'query', '--max', '30000', '--top', '5', '--json'])
+    output = capsys.readouterr().out
+    printed = json.loads(output[:output.rindex(']') + 1])
+    assert max(row['ค่าใช้จ่าย (บาท/ภาค)'] for row in printed) <= 30000
+
+
+def test_glob_source_skips_output_still_being_written(tmp_path):
+    done_path = str(tmp_path / 'TCAS_results_1.jsonl')
+    running_path = str(tmp_path / 'TCAS_results_2.jsonl')
+    _write_results(done_path)
+    with open(running_path, 'w', encoding='utf-8') as f:
+        f.write('{"ชื่อหลักสูตร": "ครึ่ง')
+    os.utime(done_path, (1, 1))
+
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'tcas_checkpoint.json'))
+    checkpoint.sink_path = running_path
+    checkpoint.save(force=True)
+    service = TuitionQueryService(str(tmp_path / 'TCAS_results_*.jsonl'))
+    assert service.path == done_path
+    assert service.top(k=1)
+
+    checkpoint.finished = True
+    checkpoint.save(force=True)
+    assert service.refresh(force=True)
+    assert service.path == running_path
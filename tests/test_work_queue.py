@@ -0,0 +1,68 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from work_queue import WorkQueue
+
+
+def _programs(count):
+    return [{'url': f'https://example.test/{index}', 'title': f'หลักสูตร {index}', 'search_term': ''}
+            for index in range(count)]
+
+
+def test_results_since_returns_only_new_results_in_completion_order(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'))
+    try:
+        queue.enqueue(_programs(4))
+        for index in (2, 0):
+            queue.complete(f'https://example.test/{index}', {'URL': f'https://example.test/{index}'})
+
+        first = queue.results_since(0)
+        assert [url for _, url, _, _ in first] == ['https://example.test/2', 'https://example.test/0']
+
+        queue.complete('https://example.test/3', {'URL': 'https://example.test/3'})
+        # ทำซ้ำงานที่เสร็จแล้วไม่ได้ลำดับใหม่
+        assert not queue.complete('https://example.test/2', {'URL': 'again'})
+        second = queue.results_since(first[-1][0])
+        assert [(url, row['URL']) for _, url, row, _ in second] == \
+            [('https://example.test/3', 'https://example.test/3')]
+        assert queue.results_since(second[-1][0]) == []
+    finally:
+        queue.close()
+
+
+def test_expired_lease_is_reclaimed_by_another_worker(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), lease_seconds=10, max_attempts=3)
+    try:
+        queue.enqueue(_programs(2))
+        assert queue.lease('a', now=100)['url'] == 'https://example.test/0'
+        assert queue.lease('a', now=100)['url'] == 'https://example.test/1'
+        # ต่ออายุเฉพาะงานแรก งานที่สองหมดอายุและถูกคืนเข้าคิว
+        queue.renew('a', ['https://example.test/0'], now=105)
+        assert queue.reclaim_expired(now=111) == 1
+        assert queue.counts() == {'pending': 1, 'leased': 1, 'done': 0, 'failed': 0}
+
+        assert queue.lease('b', now=112)['url'] == 'https://example.test/1'
+        # worker เดิมที่ lease หมดไปแล้วทำให้งานของ worker ใหม่ล้มเหลวไม่ได้
+        queue.fail('https://example.test/1', 'a', error='timeout')
+        assert queue.counts()['leased'] == 2
+        assert queue.complete('https://example.test/1', {'URL': 'https://example.test/1'})
+        assert queue.lease('c', now=113) is None
+    finally:
+        queue.close()
+
+
+def test_lease_expiring_after_max_attempts_fails_the_item(tmp_path):
+    queue = WorkQueue(str(tmp_path / 'queue.sqlite'), lease_seconds=10, max_attempts=2)
+    try:
+        queue.enqueue(_programs(1))
+        queue.seal()
+        assert queue.lease('a', now=100) is not None
+        assert queue.lease('b', now=111) is not None
+        assert not queue.drained()
+        assert queue.reclaim_expired(now=122) == 1
+        assert queue.failed_urls() == ['https://example.test/0']
+        assert queue.drained()
+    finally:
+        queue.close()
@@ -0,0 +1,370 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import time
+from datetime import datetime
+
+from export import load_rows
+from sinks import TUITION_COLUMN
+
+NAME_COLUMN = 'ชื่อหลักสูตร'
+UNIVERSITY_COLUMN = 'มหาวิทยาลัย'
+CAMPUS_COLUMN = 'วิทยาเขต'
+TUITION_TEXT_COLUMN = 'ค่าใช้จ่าย (ข้อความเต็ม)'
+URL_COLUMN = 'URL'
+CATEGORY_COLUMN = 'ประเภทหลักสูตร'
+UNIVERSITY_ID_COLUMN = 'รหัสมหาวิทยาลัย'
+CAMPUS_ID_COLUMN = 'รหัสวิทยาเขต'
+
+# คอลัมน์ข้อความของแถว -> คอลัมน์ใน observations (เก็บเป็นรหัสใน texts)
+TEXT_FIELDS = {
+    'name_text': NAME_COLUMN,
+    'university_text': UNIVERSITY_COLUMN,
+    'campus_text': CAMPUS_COLUMN,
+    'category_text': CATEGORY_COLUMN,
+    'university_key': UNIVERSITY_ID_COLUMN,
+    'campus_key': CAMPUS_ID_COLUMN,
+    'tuition_text': TUITION_TEXT_COLUMN,
+}
+
+# เวลาที่อยู่ในชื่อไฟล์ผลลัพธ์ เช่น TCAS_วิศวกรรม_แยกประเภท_20250711_173000.xlsx
+_FILE_TIMESTAMP = re.compile(r'(\d{8}_\d{6})')
+
+
+class TuitionHistory:
+    """ประวัติค่าใช้จ่ายทุกรอบการดึงข้อมูล (SQLite แบบเขียนต่อท้ายอย่างเดียว)
+
+    แต่ละรอบ (cycle) เก็บหนึ่งแถวต่อหลักสูตร คีย์คือ (URL, รอบ)
+    ข้อความที่ซ้ำกันทุกรอบ (ชื่อหลักสูตร มหาวิทยาลัย วิทยาเขต ฯลฯ) เก็บครั้งเดียวในตาราง texts
+    แถวของแต่ละรอบมีแต่รหัสตัวเลขกับค่าใช้จ่าย การเทียบรอบและดูแนวโน้มทำใน SQL ผ่าน index
+    แถวที่รอบ incremental ใช้ข้อมูลเดิมโดยไม่ได้ดึงหน้าใหม่ถูกทำเครื่องหมาย carried
+    โดยไม่ต้องโหลดประวัติทั้งหมดเข้าหน่วยความจำ
+    """
+
+    def __init__(self, path='tcas_history.sqlite'):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript(f'''
+            CREATE TABLE IF NOT EXISTS texts (
+                id INTEGER PRIMARY KEY,
+                value TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS programs (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS cycles (
+                id INTEGER PRIMARY KEY,
+                label TEXT NOT NULL UNIQUE,
+                scraped_at REAL NOT NULL,
+                source TEXT,
+                rows INTEGER NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS observations (
+                program_id INTEGER NOT NULL,
+                cycle_id INTEGER NOT NULL,
+                tuition INTEGER NOT NULL,
+                {', '.join(f'{field} INTEGER' for field in TEXT_FIELDS)},
+                carried INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (program_id, cycle_id)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_obs_cycle ON observations(cycle_id, program_id);
+            CREATE INDEX IF NOT EXISTS idx_obs_university_key
+                ON observations(university_key, cycle_id, tuition);
+            CREATE INDEX IF NOT EXISTS idx_obs_university_text
+                ON observations(university_text, cycle_id, tuition);
+        ''')
+        # ประวัติที่สร้างก่อนมีคอลัมน์ carried (แถวเดิมทั้งหมดถือว่าดึงใหม่ในรอบนั้น)
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(observations)')}
+        if 'carried' not in columns:
+            self._conn.execute('ALTER TABLE observations ADD COLUMN carried INTEGER NOT NULL DEFAULT 0')
+        self._texts = None
+        self._programs = None
+
+    def _load_dictionaries(self):
+        if self._texts is None:
+            self._texts = dict(self._conn.execute('SELECT value, id FROM texts'))
+            self._programs = dict(self._conn.execute('SELECT url, id FROM programs'))
+
+    def _text_id(self, value):
+        if value is None or value == '':
+            return None
+        value = str(value)
+        text_id = self._texts.get(value)
+        if text_id is None:
+            text_id = self._texts[value] = self._conn.execute(
+                'INSERT INTO texts (value) VALUES (?)', (value,)).lastrowid
+        return text_id
+
+    def _program_id(self, url):
+        program_id = self._programs.get(url)
+        if program_id is None:
+            program_id = self._programs[url] = self._conn.execute(
+                'INSERT INTO programs (url) VALUES (?)', (url,)).lastrowid
+        return program_id
+
+    def append_cycle(self, rows, label=None, scraped_at=None, source=None, carried=()):
+        """เพิ่มผลของหนึ่งรอบการดึงข้อมูล คืนค่า id ของรอบ หรือ None ถ้ามีรอบชื่อนี้อยู่แล้ว
+
+        URL ที่ซ้ำกันในรอบเดียวกันใช้แถวแรก
+        carried: URL ที่รอบนี้ใช้แถวจากรอบก่อนโดยไม่ได้ดึงใหม่ (โหมด incremental)
+        """
+        carried = set(carried)
+        scraped_at = scraped_at or time.time()
+        label = label or datetime.fromtimestamp(scraped_at).strftime('%Y%m%d_%H%M%S')
+        if self._conn.execute('SELECT 1 FROM cycles WHERE label = ?', (label,)).fetchone():
+            return None
+        self._load_dictionaries()
+        try:
+            with self._conn:
+                cycle_id = self._conn.execute(
+                    'INSERT INTO cycles (label, scraped_at, source, rows) VALUES (?, ?, ?, 0)',
+                    (label, scraped_at, source)).lastrowid
+                self._conn.executemany(
+                    f"INSERT OR IGNORE INTO observations "
+                    f"(program_id, cycle_id, tuition, {', '.join(TEXT_FIELDS)}, carried) "
+                    f"VALUES ({', '.join('?' for _ in range(4 + len(TEXT_FIELDS)))})",
+                    ([self._program_id(row[URL_COLUMN]), cycle_id, int(row.get(TUITION_COLUMN) or 0)] +
+                     [self._text_id(row.get(column)) for column in TEXT_FIELDS.values()] +
+                     [row[URL_COLUMN] in carried]
+                     for row in rows if row.get(URL_COLUMN)))
+                self._conn.execute(
+                    'UPDATE cycles SET rows = (SELECT COUNT(*) FROM observations WHERE cycle_id = ?) WHERE id = ?',
+                    (cycle_id, cycle_id))
+        except BaseException:
+            # รหัสข้อความที่เพิ่งสร้างถูก rollback ไปด้วย
+            self._texts = self._programs = None
+            raise
+        return cycle_id
+
+    def import_file(self, path, label=None):
+        """เพิ่มไฟล์ผลลัพธ์เก่า (.xlsx ที่ save_to_excel เขียน หรือไฟล์ sink) เป็นหนึ่งรอบ
+
+        เวลาของรอบมาจากชื่อไฟล์ (..._YYYYmmdd_HHMMSS) ถ้ามี ไม่เช่นนั้นใช้เวลาแก้ไขไฟล์
+        ชื่อรอบเริ่มต้นคือเวลานั้น
+        """
+        match = _FILE_TIMESTAMP.search(os.path.basename(path))
+        if match:
+            scraped_at = datetime.strptime(match.group(1), '%Y%m%d_%H%M%S').timestamp()
+        else:
+            scraped_at = os.path.getmtime(path)
+        rows = fill_institution_ids(load_rows(path))
+        return self.append_cycle(rows, label=label, scraped_at=scraped_at, source=os.path.abspath(path))
+
+    def cycles(self):
+        """รายการรอบทั้งหมด เรียงตามเวลา"""
+        return [
+            {'id': cycle_id, 'label': label, 'scraped_at': scraped_at, 'source': source, 'rows': rows}
+            for cycle_id, label, scraped_at, source, rows in self._conn.execute(
+                'SELECT id, label, scraped_at, source, rows FROM cycles ORDER BY scraped_at, id')
+        ]
+
+    def cycle_id(self, ref):
+        """id ของรอบจากชื่อรอบ หรือลำดับ (-1 = รอบล่าสุด, -2 = รอบก่อนหน้า)"""
+        row = self._conn.execute('SELECT id FROM cycles WHERE label = ?', (str(ref),)).fetchone()
+        if row:
+            return row[0]
+        try:
+            index = int(ref)
+        except (TypeError, ValueError):
+            raise KeyError(f"ไม่พบรอบ {ref}")
+        order = 'DESC' if index < 0 else 'ASC'
+        row = self._conn.execute(
+            f'SELECT id FROM cycles ORDER BY scraped_at {order}, id {order} LIMIT 1 OFFSET ?',
+            (-index - 1 if index < 0 else index,)).fetchone()
+        if row is None:
+            raise KeyError(f"ไม่พบรอบ {ref}")
+        return row[0]
+
+    def changes(self, from_cycle=-2, to_cycle=-1, min_change=1, university=None, category=None):
+        """หลักสูตรที่ค่าใช้จ่ายเปลี่ยนระหว่างสองรอบ (เฉพาะที่มีข้อมูลทั้งสองรอบ) เรียงจากเปลี่ยนมากไปน้อย
+
+        คืนค่าเป็น generator อ่านจากฐานข้อมูลทีละแถว
+        """
+        conditions, params = self._filters(university, category, alias='b')
+        cursor = self._conn.execute(f'''
+            SELECT p.url, name.value, univ.value, campus.value, a.tuition, b.tuition
+            FROM observations b
+            JOIN observations a ON a.program_id = b.program_id AND a.cycle_id = ?
+            JOIN programs p ON p.id = b.program_id
+            LEFT JOIN texts name ON name.id = b.name_text
+            LEFT JOIN texts univ ON univ.id = b.university_text
+            LEFT JOIN texts campus ON campus.id = b.campus_text
+            WHERE b.cycle_id = ? AND a.tuition > 0 AND b.tuition > 0
+              AND ABS(b.tuition - a.tuition) >= ?{conditions}
+            ORDER BY ABS(b.tuition - a.tuition) DESC, p.url
+        ''', [self.cycle_id(from_cycle), self.cycle_id(to_cycle), max(1, min_change)] + params)
+        for url, name, university_name, campus, old, new in cursor:
+            yield {
+                URL_COLUMN: url,
+                NAME_COLUMN: name or '',
+                UNIVERSITY_COLUMN: university_name or '',
+                CAMPUS_COLUMN: campus or '',
+                'ค่าใช้จ่ายเดิม': old,
+                'ค่าใช้จ่ายใหม่': new,
+                'เปลี่ยนแปลง': new - old,
+            }
+
+    def trend(self, university=None, category=None):
+        """สถิติค่าใช้จ่ายของแต่ละรอบ แยกตามมหาวิทยาลัย (รหัสมาตรฐาน หรือชื่อถ้าไม่มีรหัส)
+
+        university: รหัสหรือชื่อเต็มของมหาวิทยาลัย (None = ทุกมหาวิทยาลัย)
+        คืนค่า {มหาวิทยาลัย: [สถิติรอบที่ 1, รอบที่ 2, ...]} เรียงตามเวลา
+        """
+        conditions, params = self._filters(university, category, alias='o')
+        cursor = self._conn.execute(f'''
+            SELECT grouping.value, c.label, c.scraped_at, COUNT(*), SUM(o.tuition > 0),
+                   MIN(NULLIF(o.tuition, 0)), MAX(o.tuition), AVG(NULLIF(o.tuition, 0))
+            FROM observations o
+            JOIN cycles c ON c.id = o.cycle_id
+            JOIN texts grouping ON grouping.id = COALESCE(o.university_key, o.university_text)
+            WHERE 1{conditions}
+            GROUP BY COALESCE(o.university_key, o.university_text), o.cycle_id
+            ORDER BY grouping.value, c.scraped_at, c.id
+        ''', params)
+        series = {}
+        for key, label, scraped_at, count, with_tuition, low, high, mean in cursor:
+            series.setdefault(key, []).append({
+                'cycle': label,
+                'scraped_at': scraped_at,
+                'count': count,
+                'with_tuition': with_tuition,
+                'min': low or 0,
+                'max': high or 0,
+                'mean': round(mean) if mean else 0,
+            })
+        return series
+
+    def program_history(self, url):
+        """ค่าใช้จ่ายของหลักสูตรหนึ่งในทุกรอบที่พบ (carried = รอบนั้นใช้ข้อมูลเดิม ไม่ได้ดึงหน้าใหม่)"""
+        return [
+            {'cycle': label, 'scraped_at': scraped_at, TUITION_COLUMN: tuition, TUITION_TEXT_COLUMN: text or '',
+             'carried': bool(carried)}
+            for label, scraped_at, tuition, text, carried in self._conn.execute('''
+                SELECT c.label, c.scraped_at, o.tuition, t.value, o.carried
+                FROM programs p
+                JOIN observations o ON o.program_id = p.id
+                JOIN cycles c ON c.id = o.cycle_id
+                LEFT JOIN texts t ON t.id = o.tuition_text
+                WHERE p.url = ?
+                ORDER BY c.scraped_at, c.id
+            ''', (url,))
+        ]
+
+    def _filters(self, university, category, alias):
+        """เงื่อนไข SQL ของตัวกรอง (ข้อความที่ไม่เคยพบใช้รหัส -1 ซึ่งไม่ตรงกับแถวใด)"""
+        conditions = []
+        params = []
+        if university:
+            text_id = self._lookup_text(university)
+            # ใช้รหัสมาตรฐานถ้ามีแถวที่ใช้รหัสนี้ ไม่เช่นนั้นเทียบกับชื่อที่ดึงได้
+            column = 'university_key' if self._conn.execute(
+                'SELECT 1 FROM observations WHERE university_key = ? LIMIT 1', (text_id,)).fetchone() \
+                else 'university_text'
+            conditions.append(f'{alias}.{column} = ?')
+            params.append(text_id)
+        if category:
+            conditions.append(f'{alias}.category_text = ?')
+            params.append(self._lookup_text(category))
+        return ''.join(f' AND {condition}' for condition in conditions), params
+
+    def _lookup_text(self, value):
+        row = self._conn.execute('SELECT id FROM texts WHERE value = ?', (value,)).fetchone()
+        return row[0] if row else -1
+
+    def close(self):
+        self._conn.close()
+
+
+def fill_institution_ids(rows):
+    """เติมรหัสมหาวิทยาลัย/วิทยาเขตให้แถวจากไฟล์รุ่นก่อนที่ยังไม่มีรหัส"""
+    from institutions import default_registry
+    registry = default_registry()
+    for row in rows:
+        if not row.get(UNIVERSITY_ID_COLUMN):
+            university, campus = registry.resolve(row.get(UNIVERSITY_COLUMN) or '', row.get(CAMPUS_COLUMN) or '')
+            row[UNIVERSITY_ID_COLUMN] = university.id if university else ''
+            row[CAMPUS_ID_COLUMN] = campus.id if campus else ''
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ประวัติค่าใช้จ่ายข้ามรอบการดึงข้อมูล')
+    parser.add_argument('--history', default='tcas_history.sqlite', help='ไฟล์ฐานข้อมูลประวัติ')
+    sub = parser.add_subparsers(dest='command', required=True)
+    import_parser = sub.add_parser('import', help='เพิ่มไฟล์ผลลัพธ์เก่า (.xlsx หรือไฟล์ sink) เป็นรอบใหม่')
+    import_parser.add_argument('paths', nargs='+')
+    sub.add_parser('cycles', help='แสดงรอบทั้งหมด')
+    diff_parser = sub.add_parser('diff', help='หลักสูตรที่ค่าใช้จ่ายเปลี่ยนระหว่างสองรอบ')
+    diff_parser.add_argument('--from', dest='from_cycle', default='-2',
+                             help='ชื่อรอบ หรือลำดับ (-2 = รอบก่อนล่าสุด)')
+    diff_parser.add_argument('--to', dest='to_cycle', default='-1', help='ชื่อรอบ หรือลำดับ (-1 = รอบล่าสุด)')
+    diff_parser.add_argument('--min-change', type=int, default=1, help='แสดงเฉพาะที่เปลี่ยนอย่างน้อยกี่บาท')
+    trend_parser = sub.add_parser('trend', help='แนวโน้มค่าใช้จ่ายของแต่ละมหาวิทยาลัยตามรอบ')
+    program_parser = sub.add_parser('program', help='ค่าใช้จ่ายของหลักสูตรหนึ่งในทุกรอบ')
+    program_parser.add_argument('url')
+    for filtered in (diff_parser, trend_parser):
+        filtered.add_argument('--university', default=None, help='รหัสมหาวิทยาลัย (เช่น ku) หรือชื่อเต็ม')
+        filtered.add_argument('--category', default=None, help='ประเภทหลักสูตร')
+    for command_parser in (diff_parser, trend_parser, program_parser):
+        command_parser.add_argument('--json', action='store_true', help='แสดงผลเป็น JSON')
+    args = parser.parse_args(argv)
+
+    history = TuitionHistory(args.history)
+    try:
+        start = time.perf_counter()
+        if args.command == 'import':
+            for path in args.paths:
+                cycle_id = history.import_file(path)
+                if cycle_id is None:
+                    print(f"⏭️ ข้าม {path} (มีรอบนี้อยู่แล้ว)")
+                else:
+                    rows = next(cycle['rows'] for cycle in history.cycles() if cycle['id'] == cycle_id)
+                    print(f"✅ เพิ่ม {path}: {rows} หลักสูตร")
+            return
+
+        if args.command == 'cycles':
+            for cycle in history.cycles():
+                when = datetime.fromtimestamp(cycle['scraped_at']).strftime('%Y-%m-%d %H:%M')
+                print(f"   {cycle['label']:<20} {when}  {cycle['rows']:>6} หลักสูตร  {cycle['source'] or ''}")
+            return
+
+        if args.command == 'diff':
+            result = list(history.changes(args.from_cycle, args.to_cycle, min_change=args.min_change,
+                                          university=args.university, category=args.category))
+        elif args.command == 'trend':
+            result = history.trend(university=args.university, category=args.category)
+        else:
+            result = history.program_history(args.url)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        if args.json:
+            print(json.dumps(result, ensure_ascii=False, indent=2))
+        elif args.command == 'diff':
+            for change in result:
+                print(f"   {change['เปลี่ยนแปลง']:>+10,} บาท  {change['ค่าใช้จ่ายเดิม']:>10,} -> "
+                      f"{change['ค่าใช้จ่ายใหม่']:>10,}  {change[UNIVERSITY_COLUMN][:30]:<30} "
+                      f"{change[NAME_COLUMN][:50]}")
+            print(f"   ({len(result)} หลักสูตรที่ค่าใช้จ่ายเปลี่ยน)")
+        elif args.command == 'trend':
+            for key, points in result.items():
+                print(f"🏛️ {key}")
+                for point in points:
+                    print(f"   {point['cycle']:<20} {point['count']:>5} หลักสูตร  "
+                          f"{point['min']:>10,} - {point['max']:>10,}  เฉลี่ย {point['mean']:,} บาท")
+        else:
+            for point in result:
+                carried = '  (ใช้ข้อมูลรอบก่อน)' if point['carried'] else ''
+                print(f"   {point['cycle']:<20} {point[TUITION_COLUMN]:>10,} บาท  {point[TUITION_TEXT_COLUMN]}{carried}")
+        print(f"⏱️ {elapsed_ms:,.1f} ms")
+    except KeyError as e:
+        print(f"❌ {e.args[0]}")
+    finally:
+        history.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,469 @@
+import argparse
+import bisect
+import glob
+import heapq
+import json
+import os
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+from checkpoint import unfinished_sinks
+from sinks import TUITION_COLUMN, read_rows
+
+NAME_COLUMN = 'ชื่อหลักสูตร'
+UNIVERSITY_COLUMN = 'มหาวิทยาลัย'
+CAMPUS_COLUMN = 'วิทยาเขต'
+TUITION_TEXT_COLUMN = 'ค่าใช้จ่าย (ข้อความเต็ม)'
+URL_COLUMN = 'URL'
+CATEGORY_COLUMN = 'ประเภทหลักสูตร'
+UNIVERSITY_ID_COLUMN = 'รหัสมหาวิทยาลัย'
+CAMPUS_ID_COLUMN = 'รหัสวิทยาเขต'
+
+# คอลัมน์ที่ใช้กรองและจัดกลุ่มได้ (ชื่อพารามิเตอร์ -> คอลัมน์)
+FILTER_COLUMNS = {
+    'university': UNIVERSITY_COLUMN,
+    'campus': CAMPUS_COLUMN,
+    'category': CATEGORY_COLUMN,
+    'university_id': UNIVERSITY_ID_COLUMN,
+    'campus_id': CAMPUS_ID_COLUMN,
+}
+
+# ไฟล์ผลลัพธ์ที่ sc.py เขียน (ใช้ไฟล์ที่ดึงข้อมูลเสร็จแล้วที่ใหม่ที่สุด)
+DEFAULT_SOURCE = 'TCAS_results_*.jsonl'
+
+
+class TuitionIndex:
+    """ข้อมูลหลักสูตรแบบคอลัมน์ พร้อม index สำหรับค้นหาค่าใช้จ่าย
+
+    - ข้อความที่ซ้ำกันมาก (มหาวิทยาลัย วิทยาเขต ประเภท) เก็บเป็นรหัสตัวเลขใน array
+    - order: ตำแหน่งแถวเรียงตามค่าใช้จ่าย และ sorted_tuition สำหรับ bisect หาช่วงราคา
+    - postings: ตำแหน่งแถวของแต่ละมหาวิทยาลัย/วิทยาเขต/ประเภท เรียงตามค่าใช้จ่ายเช่นกัน
+    ค่าใช้จ่าย 0 หมายถึงไม่พบข้อมูลค่าใช้จ่าย
+    """
+
+    def __init__(self, rows):
+        self.size = len(rows)
+        self.names = [row.get(NAME_COLUMN) or '' for row in rows]
+        self.urls = [row.get(URL_COLUMN) or '' for row in rows]
+        self.tuition_texts = [row.get(TUITION_TEXT_COLUMN) or '' for row in rows]
+        self.tuition = array('q', (int(row.get(TUITION_COLUMN) or 0) for row in rows))
+
+        self.values = {}
+        self.codes = {}
+        for field, column in FILTER_COLUMNS.items():
+            lookup = {}
+            values = []
+            codes = array('I')
+            for row in rows:
+                value = row.get(column) or ''
+                code = lookup.get(value)
+                if code is None:
+                    code = lookup[value] = len(values)
+                    values.append(value)
+                codes.append(code)
+            self.values[field] = values
+            self.codes[field] = codes
+
+        tuition = self.tuition
+        self.order = array('I', sorted(range(self.size), key=lambda i: (tuition[i], i)))
+        self.sorted_tuition = array('q', (tuition[i] for i in self.order))
+
+        self.postings = {}
+        for field, values in self.values.items():
+            codes = self.codes[field]
+            postings = [array('I') for _ in values]
+            for position in self.order:
+                postings[codes[position]].append(position)
+            self.postings[field] = [(positions, array('q', (tuition[i] for i in positions)))
+                                    for positions in postings]
+        self._matches = {}
+
+    def match_codes(self, field, text):
+        """รหัสของค่าที่ตรงกับ text: ตรงทั้งคำก่อน ถ้าไม่มีใช้ค่าที่มี text เป็นส่วนหนึ่ง (ไม่สนตัวพิมพ์)"""
+        key = (field, text)
+        codes = self._matches.get(key)
+        if codes is None:
+            values = self.values[field]
+            if text in values:
+                codes = frozenset([values.index(text)])
+            else:
+                folded = text.casefold()
+                codes = frozenset(code for code, value in enumerate(values) if folded in value.casefold())
+            self._matches[key] = codes
+        return codes
+
+    def select(self, min_tuition=None, max_tuition=None, include_unknown=False, descending=False,
+               limit=None, **filters):
+        """ตำแหน่งแถวที่ค่าใช้จ่ายอยู่ในช่วง [min_tuition, max_tuition] และตรงกับตัวกรอง เรียงตามค่าใช้จ่าย
+
+        filters: university / campus / category (ข้อความบางส่วนของชื่อก็ได้)
+        """
+        low = min_tuition if min_tuition is not None else 0
+        if not include_unknown:
+            low = max(low, 1)
+        high = max_tuition
+
+        wanted = {}
+        for field, text in filters.items():
+            if field not in FILTER_COLUMNS:
+                raise ValueError(f"ไม่รู้จักตัวกรอง: {field} (ใช้ได้ {', '.join(FILTER_COLUMNS)})")
+            if text:
+                wanted[field] = self.match_codes(field, text)
+
+        if wanted:
+            # เริ่มจาก index ของตัวกรองที่ได้แถวน้อยที่สุด แล้วตรวจตัวกรองอื่นด้วยรหัสใน array
+            field = min(wanted, key=lambda f: sum(len(self.postings[f][code][0]) for code in wanted[f]))
+            sources = [self.postings[field][code] for code in sorted(wanted.pop(field))]
+        else:
+            sources = [(self.order, self.sorted_tuition)]
+
+        slices = []
+        for positions, tuition in sources:
+            start = bisect.bisect_left(tuition, low)
+            end = bisect.bisect_right(tuition, high) if high is not None else len(tuition)
+            if start < end:
+                part = positions[start:end]
+                slices.append(part[::-1] if descending else part)
+        if len(slices) == 1:
+            candidates = slices[0]
+        else:
+            tuition = self.tuition
+            candidates = heapq.merge(*slices, key=lambda i: (tuition[i], i), reverse=descending)
+
+        checks = [(self.codes[field], codes) for field, codes in wanted.items()]
+        result = []
+        for position in candidates:
+            if all(codes[position] in allowed for codes, allowed in checks):
+                result.append(position)
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def row(self, position):
+        return {
+            NAME_COLUMN: self.names[position],
+            UNIVERSITY_COLUMN: self.values['university'][self.codes['university'][position]],
+            CAMPUS_COLUMN: self.values['campus'][self.codes['campus'][position]],
+            TUITION_COLUMN: self.tuition[position],
+            TUITION_TEXT_COLUMN: self.tuition_texts[position],
+            URL_COLUMN: self.urls[position],
+            CATEGORY_COLUMN: self.values['category'][self.codes['category'][position]],
+            UNIVERSITY_ID_COLUMN: self.values['university_id'][self.codes['university_id'][position]],
+            CAMPUS_ID_COLUMN: self.values['campus_id'][self.codes['campus_id'][position]],
+        }
+
+    def group(self, by, positions):
+        """สถิติค่าใช้จ่ายของแถว positions แยกตาม by (university / campus / category)"""
+        if by not in FILTER_COLUMNS:
+            raise ValueError(f"จัดกลุ่มได้เฉพาะ {', '.join(FILTER_COLUMNS)}")
+        codes = self.codes[by]
+        groups = {}
+        for position in positions:
+            stats = groups.get(codes[position])
+            if stats is None:
+                stats = groups[codes[position]] = [0, 0, 0, None, None]
+            stats[0] += 1
+            amount = self.tuition[position]
+            if amount > 0:
+                stats[1] += 1
+                stats[2] += amount
+                # positions เรียงตามค่าใช้จ่าย ค่าแรกที่พบคือต่ำสุด
+                if stats[3] is None:
+                    stats[3] = amount
+                stats[4] = amount
+        return [
+            {
+                by: self.values[by][code],
+                'count': count,
+                'with_tuition': known,
+                'min': low or 0,
+                'max': high or 0,
+                'mean': round(total / known) if known else 0,
+            }
+            for code, (count, known, total, low, high) in sorted(
+                groups.items(), key=lambda item: self.values[by][item[0]])
+        ]
+
+
+class _LRUCache:
+    """cache ผลการค้นหาแบบ LRU (ลบรายการที่ไม่ได้ใช้นานที่สุดเมื่อเต็ม)"""
+
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        if key in self._entries:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class TuitionQueryService:
+    """ค้นหาค่าใช้จ่ายจากไฟล์ผลลัพธ์ล่าสุด (sink ของ sc.py) ผ่าน TuitionIndex
+
+    source: ไฟล์ผลลัพธ์ หรือ glob pattern (ใช้ไฟล์ที่แก้ไขล่าสุด โดยข้ามไฟล์ที่ checkpoint ยังไม่จบงาน
+            ถ้าทุกไฟล์ยังไม่จบจะใช้ไฟล์ล่าสุด)
+    ตรวจทุก check_interval วินาทีว่ามีผลการดึงข้อมูลใหม่หรือไม่ ถ้ามีจะสร้าง index ใหม่และล้าง cache
+    ผลลัพธ์ที่คืนถูกใช้ร่วมกับ cache ห้ามแก้ไข
+    """
+
+    def __init__(self, source=DEFAULT_SOURCE, cache_size=256, check_interval=1.0):
+        self.source = source
+        self.check_interval = check_interval
+        self.cache = _LRUCache(cache_size)
+        self.index = TuitionIndex([])
+        self.path = None
+        self.version = 0
+        self.loaded_at = None
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.refresh(force=True)
+
+    def _current_path(self):
+        if glob.has_magic(self.source):
+            paths = glob.glob(self.source)
+            if not paths:
+                return None
+            # ไฟล์ที่ scraper ยังเขียนอยู่มีข้อมูลไม่ครบ ใช้ผลของรอบที่เสร็จแล้วก่อน
+            unfinished = set()
+            for directory in {os.path.dirname(path) or '.' for path in paths}:
+                unfinished |= unfinished_sinks(directory)
+            finished = [path for path in paths if os.path.abspath(path) not in unfinished]
+            return max(finished or paths, key=os.path.getmtime)
+        return self.source if os.path.exists(self.source) else None
+
+    def refresh(self, force=False):
+        """โหลดข้อมูลใหม่ถ้าไฟล์เปลี่ยน คืนค่า True ถ้าโหลดใหม่"""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return False
+        self._next_check = now + self.check_interval
+        path = self._current_path()
+        signature = None
+        if path:
+            stat = os.stat(path)
+            signature = (path, stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature and not force:
+            return False
+
+        rows = read_rows(path) if path else []
+        self.index = TuitionIndex(rows)
+        self.path = path
+        self._signature = signature
+        self.version += 1
+        self.loaded_at = time.time()
+        self.cache.clear()
+        return True
+
+    def _cached(self, kind, params, compute):
+        with self._lock:
+            self.refresh()
+            key = (kind, tuple(sorted(params.items())))
+            result = self.cache.get(key)
+            if result is None:
+                result = compute()
+                self.cache.put(key, result)
+            return result
+
+    def range(self, min_tuition=None, max_tuition=None, limit=None, include_unknown=False, **filters):
+        """หลักสูตรที่ค่าใช้จ่ายอยู่ในช่วง เรียงจากถูกไปแพง"""
+        params = dict(filters, min_tuition=min_tuition, max_tuition=max_tuition, limit=limit,
+                      include_unknown=include_unknown)
+        return self._cached('range', params, lambda: [
+            self.index.row(position) for position in self.index.select(**params)])
+
+    def top(self, k=10, cheapest=True, min_tuition=None, max_tuition=None, **filters):
+        """k หลักสูตรที่ถูกที่สุด (cheapest=False = แพงที่สุด) จากหลักสูตรที่มีข้อมูลค่าใช้จ่ายในช่วงที่กำหนด"""
+        params = dict(filters, min_tuition=min_tuition, max_tuition=max_tuition, limit=k, descending=not cheapest)
+        return self._cached('top', params, lambda: [
+            self.index.row(position) for position in self.index.select(**params)])
+
+    def group(self, by='university', min_tuition=None, max_tuition=None, **filters):
+        """สถิติค่าใช้จ่าย (จำนวน ต่ำสุด สูงสุด เฉลี่ย) แยกตามมหาวิทยาลัย วิทยาเขต หรือประเภท
+
+        นับหลักสูตรที่ไม่มีข้อมูลค่าใช้จ่ายด้วยเฉพาะเมื่อไม่ได้ระบุช่วงค่าใช้จ่าย
+        """
+        params = dict(filters, min_tuition=min_tuition, max_tuition=max_tuition,
+                      include_unknown=min_tuition is None and max_tuition is None)
+        return self._cached(f'group:{by}', params, lambda: self.index.group(by, self.index.select(**params)))
+
+    def stats(self):
+        with self._lock:
+            self.refresh()
+            return {
+                'source': self.path,
+                'rows': self.index.size,
+                'version': self.version,
+                'loaded_at': self.loaded_at,
+                'universities': len(self.index.values['university']),
+                'campuses': len(self.index.values['campus']),
+                'categories': self.index.values['category'],
+                'cache_entries': len(self.cache),
+                'cache_hits': self.cache.hits,
+                'cache_misses': self.cache.misses,
+            }
+
+
+def _int_param(params, name):
+    value = params.get(name)
+    return int(value) if value not in (None, '') else None
+
+
+def _filter_params(params):
+    return {field: params[field] for field in FILTER_COLUMNS if params.get(field)}
+
+
+def run_query(service, path, params):
+    """เรียก service ตาม path ของ HTTP API (/range, /top, /group, /stats)"""
+    if path == '/range':
+        return service.range(min_tuition=_int_param(params, 'min'), max_tuition=_int_param(params, 'max'),
+                             limit=_int_param(params, 'limit'),
+                             include_unknown=params.get('include_unknown') in ('1', 'true'),
+                             **_filter_params(params))
+    if path == '/top':
+        return service.top(k=_int_param(params, 'k') or 10, cheapest=params.get('order') != 'expensive',
+                           min_tuition=_int_param(params, 'min'), max_tuition=_int_param(params, 'max'),
+                           **_filter_params(params))
+    if path == '/group':
+        return service.group(by=params.get('by') or 'university', min_tuition=_int_param(params, 'min'),
+                             max_tuition=_int_param(params, 'max'), **_filter_params(params))
+    if path == '/stats':
+        return service.stats()
+    raise LookupError(path)
+
+
+class QueryRequestHandler(BaseHTTPRequestHandler):
+    """GET /range?min=&max=&university=&campus=&category=&limit=
+    GET /top?k=10&order=cheapest|expensive&min=&max=&...   GET /group?by=university|campus|category&...   GET /stats
+    """
+
+    service = None
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        start = time.perf_counter()
+        try:
+            result = run_query(self.service, url.path.rstrip('/') or '/', params)
+        except LookupError:
+            return self._send(404, {'error': f"ไม่มี endpoint {url.path} (ใช้ /range /top /group /stats)"})
+        except ValueError as e:
+            return self._send(400, {'error': str(e)})
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        body = {'elapsed_us': round(elapsed_us, 1), 'result': result}
+        if isinstance(result, list):
+            body['count'] = len(result)
+        self._send(200, body)
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_query_server(service, host='127.0.0.1', port=0):
+    """เปิด HTTP API ใน thread แยก คืนค่า (server, base_url)"""
+    handler = type('BoundQueryRequestHandler', (QueryRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+def print_rows(rows):
+    for row in rows:
+        amount = f"{row[TUITION_COLUMN]:,}" if row[TUITION_COLUMN] else '-'
+        print(f"   {amount:>10} บาท  {row[UNIVERSITY_COLUMN][:30]:<30} {row[CAMPUS_COLUMN][:15]:<15} "
+              f"{row[NAME_COLUMN][:50]}")
+    print(f"   ({len(rows)} หลักสูตร)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='ค้นหาและเปรียบเทียบค่าใช้จ่ายจากผลการดึงข้อมูล')
+    parser.add_argument('--source', default=DEFAULT_SOURCE,
+                        help='ไฟล์ผลลัพธ์ (.jsonl/.csv/.sqlite/.parquet) หรือ glob (ใช้ไฟล์ล่าสุดที่ดึงข้อมูลเสร็จแล้ว)')
+    # --source ใส่หลังคำสั่งย่อยได้ด้วย (เช่น tcas.py query --source ...)
+    source = argparse.ArgumentParser(add_help=False)
+    source.add_argument('--source', default=argparse.SUPPRESS, help=argparse.SUPPRESS)
+    sub = parser.add_subparsers(dest='command', required=True)
+    serve_parser = sub.add_parser('serve', parents=[source], help='เปิด HTTP API')
+    serve_parser.add_argument('--host', default='127.0.0.1')
+    serve_parser.add_argument('--port', type=int, default=8766)
+    serve_parser.add_argument('--cache-size', type=int, default=256, help='จำนวนผลการค้นหาที่เก็บใน cache')
+    query_parser = sub.add_parser('query', parents=[source], help='ค้นหาครั้งเดียวแล้วแสดงผล')
+    query_parser.add_argument('--min', type=int, default=None, help='ค่าใช้จ่ายต่ำสุด (บาท/ภาค)')
+    query_parser.add_argument('--max', type=int, default=None, help='ค่าใช้จ่ายสูงสุด (บาท/ภาค)')
+    for field in FILTER_COLUMNS:
+        query_parser.add_argument(f"--{field.replace('_', '-')}", dest=field, default=None,
+                                  help=f'กรองตาม{FILTER_COLUMNS[field]} (บางส่วนของชื่อก็ได้)')
+    query_parser.add_argument('--top', type=int, default=None, help='แสดง N หลักสูตรที่ถูกที่สุด')
+    query_parser.add_argument('--expensive', action='store_true', help='ใช้กับ --top: แพงที่สุดแทน')
+    query_parser.add_argument('--group-by', choices=list(FILTER_COLUMNS), default=None,
+                              help='สรุปสถิติค่าใช้จ่ายแยกกลุ่ม')
+    query_parser.add_argument('--json', action='store_true', help='แสดงผลเป็น JSON')
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        service = TuitionQueryService(args.source, cache_size=args.cache_size)
+        server, base_url = start_query_server(service, host=args.host, port=args.port)
+        print(f"🔎 {service.index.size:,} หลักสูตรจาก {service.path or '(ยังไม่มีไฟล์)'}")
+        print(f"🌐 API ที่ {base_url}/range /top /group /stats (Ctrl+C เพื่อหยุด)")
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            server.shutdown()
+        return
+
+    service = TuitionQueryService(args.source)
+    filters = {field: getattr(args, field) for field in FILTER_COLUMNS if getattr(args, field)}
+    start = time.perf_counter()
+    if args.group_by:
+        result = service.group(by=args.group_by, min_tuition=args.min, max_tuition=args.max, **filters)
+    elif args.top:
+        result = service.top(k=args.top, cheapest=not args.expensive, min_tuition=args.min, max_tuition=args.max,
+                             **filters)
+    else:
+        result = service.range(min_tuition=args.min, max_tuition=args.max, **filters)
+    elapsed_us = (time.perf_counter() - start) * 1e6
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    elif args.group_by:
+        for stats in result:
+            print(f"   {stats[args.group_by][:35]:<35} {stats['count']:>5} หลักสูตร  "
+                  f"{stats['min']:>10,} - {stats['max']:>10,}  เฉลี่ย {stats['mean']:,} บาท")
+    else:
+        print_rows(result)
+    print(f"⏱️ {elapsed_us:,.0f} µs ({service.index.size:,} หลักสูตรจาก {service.path})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import json
+import sqlite3
+import time
+
+
+class WorkQueue:
+    """คิวงานหลักสูตรที่ใช้ร่วมกันหลาย process (SQLite บนดิสก์)
+
+    coordinator ใส่หลักสูตรที่ค้นพบลงคิว worker แต่ละตัวยืมงาน (lease) ไปทีละรายการ
+    พร้อมเวลาหมดอายุ lease_seconds ถ้า worker หายไป (process ตาย เครื่องดับ) งานจะกลับเข้าคิวเอง
+    เมื่อหมดเวลา งานที่ถูกยืมแล้วหายเกิน max_attempts ครั้งถือว่าล้มเหลว
+
+    สถานะของงาน: pending -> leased -> done / failed
+    ใช้ร่วมกันข้ามเครื่องได้ผ่านไดเรกทอรีที่แชร์กัน ถ้าระบบไฟล์นั้นรองรับ file lock ของ SQLite
+    """
+
+    def __init__(self, path='tcas_queue.sqlite', lease_seconds=300, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        # autocommit ทุกคำสั่ง ส่วนการยืมงานใช้ BEGIN IMMEDIATE เพื่อไม่ให้สอง worker ได้งานเดียวกัน
+        self._conn = sqlite3.connect(path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('''
+            CREATE TABLE IF NOT EXISTS items (
+                url TEXT PRIMARY KEY,
+                position INTEGER NOT NULL,
+                program_json TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                row_json TEXT,
+                page_hash TEXT,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                done_seq INTEGER
+            )
+        ''')
+        # คิวที่สร้างก่อนมีคอลัมน์ done_seq (ลำดับที่งานเสร็จ ใช้อ่านเฉพาะผลใหม่)
+        columns = {row[1] for row in self._conn.execute('PRAGMA table_info(items)')}
+        if 'done_seq' not in columns:
+            self._conn.execute('ALTER TABLE items ADD COLUMN done_seq INTEGER')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_items_status ON items(status, position)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS idx_items_done_seq ON items(done_seq)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)')
+
+    def enqueue(self, programs):
+        """ใส่หลักสูตรลงคิว (URL ที่มีอยู่แล้วไม่ถูกเพิ่มซ้ำ) คืนจำนวนที่เพิ่มจริง"""
+        now = time.time()
+        before = self._conn.total_changes
+        self._conn.execute('BEGIN IMMEDIATE')
+        start = self._conn.execute('SELECT COALESCE(MAX(position) + 1, 0) FROM items').fetchone()[0]
+        self._conn.executemany(
+            'INSERT OR IGNORE INTO items (url, position, program_json, updated_at) VALUES (?, ?, ?, ?)',
+            [(p['url'], start + i, json.dumps(p, ensure_ascii=False), now) for i, p in enumerate(programs)])
+        self._conn.execute('COMMIT')
+        return self._conn.total_changes - before
+
+    def clear(self):
+        """ล้างคิวสำหรับรอบใหม่"""
+        self._conn.execute('BEGIN IMMEDIATE')
+        self._conn.execute('DELETE FROM items')
+        self._conn.execute("DELETE FROM meta WHERE key = 'sealed'")
+        self._conn.execute('COMMIT')
+
+    def seal(self):
+        """coordinator ใส่งานครบแล้ว worker ที่ไม่มีงานเหลือหยุดได้"""
+        self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('sealed', ?)", (str(time.time()),))
+
+    def sealed(self):
+        return self._conn.execute("SELECT 1 FROM meta WHERE key = 'sealed'").fetchone() is not None
+
+    def reclaim_expired(self, now=None):
+        """คืนงานที่ lease หมดอายุกลับเข้าคิว (หรือ failed ถ้ายืมครบ max_attempts แล้ว) คืนจำนวนที่คืน"""
+        now = now or time.time()
+        self._conn.execute('BEGIN IMMEDIATE')
+        reclaimed = self._reclaim(now)
+        self._conn.execute('COMMIT')
+        return reclaimed
+
+    def _reclaim(self, now):
+        before = self._conn.total_changes
+        self._conn.execute(
+            "UPDATE items SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "worker = NULL, lease_until = NULL, error = COALESCE(error, 'lease expired'), updated_at = ? "
+            "WHERE status = 'leased' AND lease_until < ?",
+            (self.max_attempts, now, now))
+        return self._conn.total_changes - before
+
+    def lease(self, worker_id, now=None):
+        """ยืมงานถัดไปตามลำดับ คืนค่า program_info (dict) หรือ None ถ้าไม่มีงานว่าง"""
+        now = now or time.time()
+        self._conn.execute('BEGIN IMMEDIATE')
+        try:
+            self._reclaim(now)
+            row = self._conn.execute(
+                "SELECT url, program_json FROM items WHERE status = 'pending' "
+                "ORDER BY position LIMIT 1").fetchone()
+            if row is None:
+                self._conn.execute('COMMIT')
+                return None
+            self._conn.execute(
+                "UPDATE items SET status = 'leased', worker = ?, lease_until = ?, "
+                "attempts = attempts + 1, updated_at = ? WHERE url = ?",
+                (worker_id, now + self.lease_seconds, now, row[0]))
+            self._conn.execute('COMMIT')
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        return json.loads(row[1])
+
+    def renew(self, worker_id, urls, now=None):
+        """ต่ออายุ lease ของงานที่ worker นี้ยังถืออยู่ (เรียกเป็นระยะระหว่างดึงหน้าที่ช้า)"""
+        now = now or time.time()
+        self._conn.executemany(
+            "UPDATE items SET lease_until = ? WHERE url = ? AND status = 'leased' AND worker = ?",
+            [(now + self.lease_seconds, url, worker_id) for url in urls])
+
+    def complete(self, url, row, page_hash=None):
+        """บันทึกผลของงาน (ถ้ามี worker อื่นทำเสร็จก่อนแล้วจะไม่เขียนทับ) คืน True ถ้าบันทึก
+
+        งานที่เสร็จได้ done_seq เพิ่มขึ้นทีละหนึ่ง (คำสั่งเดียว จึงไม่ซ้ำกันแม้หลาย worker เขียนพร้อมกัน)
+        """
+        cursor = self._conn.execute(
+            "UPDATE items SET status = 'done', row_json = ?, page_hash = ?, worker = NULL, "
+            "lease_until = NULL, error = NULL, updated_at = ?, "
+            "done_seq = (SELECT COALESCE(MAX(done_seq), 0) + 1 FROM items) "
+            "WHERE url = ? AND status != 'done'",
+            (json.dumps(row, ensure_ascii=False), page_hash, time.time(), url))
+        return cursor.rowcount > 0
+
+    def fail(self, url, worker_id, error=None, retryable=True):
+        """งานล้มเหลว: คืนเข้าคิวถ้ายังลองได้ ไม่เช่นนั้นเป็น failed (ไม่มีผลถ้า lease ไม่ใช่ของ worker นี้แล้ว)"""
+        self._conn.execute(
+            "UPDATE items SET status = CASE WHEN ? AND attempts < ? THEN 'pending' ELSE 'failed' END, "
+            "worker = NULL, lease_until = NULL, error = ?, updated_at = ? "
+            "WHERE url = ? AND status = 'leased' AND worker = ?",
+            (bool(retryable), self.max_attempts, error, time.time(), url, worker_id))
+
+    def counts(self):
+        """จำนวนงานแยกตามสถานะ"""
+        counts = {'pending': 0, 'leased': 0, 'done': 0, 'failed': 0}
+        for status, count in self._conn.execute('SELECT status, COUNT(*) FROM items GROUP BY status'):
+            counts[status] = count
+        return counts
+
+    def drained(self):
+        """ใส่งานครบแล้ว และไม่มีงานรอหรือกำลังทำอยู่"""
+        counts = self.counts()
+        return self.sealed() and counts['pending'] == 0 and counts['leased'] == 0
+
+    def results(self):
+        """ผลของงานที่เสร็จแล้ว {url: (row, page_hash)}"""
+        return {
+            url: (json.loads(row_json), page_hash)
+            for url, row_json, page_hash in self._conn.execute(
+                "SELECT url, row_json, page_hash FROM items WHERE status = 'done' ORDER BY position")
+        }
+
+    def results_since(self, done_seq=0):
+        """ผลของงานที่เสร็จหลัง done_seq ตามลำดับที่เสร็จ เป็น list ของ (done_seq, url, row, page_hash)"""
+        return [
+            (seq, url, json.loads(row_json), page_hash)
+            for seq, url, row_json, page_hash in self._conn.execute(
+                "SELECT done_seq, url, row_json, page_hash FROM items "
+                "WHERE status = 'done' AND done_seq > ? ORDER BY done_seq", (done_seq,))
+        ]
+
+    def failed_urls(self):
+        return [url for (url,) in self._conn.execute(
+            "SELECT url FROM items WHERE status = 'failed' ORDER BY position")]
+
+    def close(self):
+        self._conn.close()